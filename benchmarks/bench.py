@@ -0,0 +1,609 @@
+"""Benchmark harness with scaling curves and regression baselines.
+
+Each benchmark is timed over a matrix of problem sizes (pilot diameter and hex cell size for the geometry code, batch
+size for the calculators). Results are written as JSON and can be compared against a stored baseline; any case whose
+median time grew by more than the threshold is reported as a regression.
+
+Usage:
+    python -m benchmarks.bench run --out benchmarks/baselines/current.json
+    python -m benchmarks.bench run --quick --baseline benchmarks/baselines/reference.json --threshold 0.25
+    python -m benchmarks.bench compare current.json reference.json
+
+Sizes whose median time exceeds --budget seconds stop the scaling curve of that benchmark; larger sizes are recorded
+as skipped so the quadratic parts of the plate generator don't stall a run.
+
+The 'cold_start' benchmark imports modules in a fresh interpreter and fails the run if a headless entry point pulls in
+a heavy dependency (Cantera, ezdxf, matplotlib) it does not need; tests/test_cold_start.py runs the same probes:
+    python -m benchmarks.bench cold-start
+
+The 'mechanisms' report times the construction and a jet calculation of every mechanism of calculations.gas.MECHANISMS;
+their accuracy against gri30 is checked by tests/test_mechanisms.py:
+    python -m benchmarks.bench mechanisms
+"""
+import argparse
+import dataclasses
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from input_parameters.parameters import GeometryParams, OperatingParams
+
+# Problem size matrices in mm
+PILOT_DIAMETERS = [30, 60, 120, 200, 300]
+CELL_SIZES = [3.0, 2.0, 1.0, 0.5]
+BATCH_SIZES = [1, 10, 100]
+
+QUICK_PILOT_DIAMETERS = [30, 60]
+QUICK_CELL_SIZES = [2.0, 1.0]
+QUICK_BATCH_SIZES = [1, 5]
+
+
+def scaled_geometry(pilot_diameter_mm, cell_size_mm):
+    """Geometry with the pilot scaled to the given diameter and hex cell size, fuel tubes scaled with the cell"""
+    pilot_id = pilot_diameter_mm * 1e-3
+    cell = cell_size_mm * 1e-3
+    return GeometryParams(
+        pilot_fuel_ID=0.625 * cell,
+        pilot_fuel_OD=cell,
+        pilot_air_ID=cell,
+        pilot_burner_ID=pilot_id,
+        pilot_burner_OD=pilot_id + 2e-3,
+        pilot_hex_cell_size=cell,
+        pilot_hex_wall_th=0.1e-3,
+        coflow_ID=pilot_id + 2e-3,
+        coflow_OD=max(154.0e-3, pilot_id + 20e-3),
+    )
+
+
+def _time_call(func, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+# Benchmark setups. Each takes a size dict and returns a zero-argument callable that performs the timed work;
+# everything done before returning is setup and not timed.
+
+def _setup_grid(size):
+    from geometry.grid_generator import HexagonalGridGenerator
+    geom = scaled_geometry(size['pilot_diameter_mm'], size['cell_size_mm'])
+    grid = HexagonalGridGenerator(center_distance=geom.pilot_hex_cell_size + geom.pilot_hex_wall_th,
+                                  boundary=geom.pilot_burner_ID * 1.2)
+    return grid.generate_coordinates
+
+
+def _honeycomb_grid(size):
+    from geometry.honeycomb_generator import HexGrid
+    return HexGrid(scaled_geometry(size['pilot_diameter_mm'], size['cell_size_mm']))
+
+
+def _plate_grid(size):
+    from geometry.plate_generator import HexGrid
+    return HexGrid(scaled_geometry(size['pilot_diameter_mm'], size['cell_size_mm']))
+
+
+def _fuel_holes(hex_grid):
+    from geometry.geometry_utils import cubic_to_cartesian
+    positions = [cubic_to_cartesian(q, r, s, hex_grid.center_distance / math.sqrt(3))
+                 for q, r, s in hex_grid.check_fuel_positions()]
+    return hex_grid.generate_fuel_holes(positions)
+
+
+def _setup_honeycomb_air_holes(size):
+    hex_grid = _honeycomb_grid(size)
+    central_jet = hex_grid.generate_central_jet()
+    return lambda: hex_grid.generate_air_holes([], central_jet)
+
+
+def _setup_plate_air_holes(size):
+    hex_grid = _plate_grid(size)
+    fuel_holes = _fuel_holes(hex_grid)
+    central_jet = hex_grid.generate_central_jet()
+    return lambda: hex_grid.generate_air_holes(fuel_holes, central_jet)
+
+
+def _setup_honeycomb_statistics(size):
+    hex_grid = _honeycomb_grid(size)
+    air_holes = hex_grid.generate_air_holes([], hex_grid.generate_central_jet())
+    fuel_holes = _fuel_holes(hex_grid)
+    return lambda: hex_grid.calculate_hole_statistics(air_holes, fuel_holes)
+
+
+def _setup_plate_statistics(size):
+    hex_grid = _plate_grid(size)
+    fuel_holes = _fuel_holes(hex_grid)
+    air_holes = hex_grid.generate_air_holes(fuel_holes, hex_grid.generate_central_jet())
+    return lambda: hex_grid.calculate_hole_statistics(air_holes, fuel_holes)
+
+
+def _setup_honeycomb_dxf(size):
+    hex_grid = _honeycomb_grid(size)
+    central_jet = hex_grid.generate_central_jet()
+    air_holes = hex_grid.generate_air_holes([], central_jet)
+    fuel_holes = _fuel_holes(hex_grid)
+    filename = os.path.join(tempfile.gettempdir(), 'burner_benchmark.dxf')
+    return lambda: hex_grid.export_to_dxf(air_holes, fuel_holes, central_jet, filename)
+
+
+def _setup_plate_dxf(size):
+    hex_grid = _plate_grid(size)
+    fuel_holes = _fuel_holes(hex_grid)
+    central_jet = hex_grid.generate_central_jet()
+    air_holes = hex_grid.generate_air_holes(fuel_holes, central_jet)
+    filename = os.path.join(tempfile.gettempdir(), 'burner_benchmark.dxf')
+    return lambda: hex_grid.export_to_dxf(air_holes, fuel_holes, central_jet, filename)
+
+
+def _setup_flow_distribution(size):
+    from calculations.flow_network import pilot_flow_distribution
+    geom = scaled_geometry(size['pilot_diameter_mm'], size['cell_size_mm'])
+    return lambda: pilot_flow_distribution('Honeycomb', geom)
+
+
+def _setup_mixing_uniformity(size):
+    from geometry.lattice import mixing_uniformity
+    geom = scaled_geometry(size['pilot_diameter_mm'], size['cell_size_mm'])
+    return lambda: mixing_uniformity('Honeycomb', geom, radius=2)
+
+
+def _setup_fast_statistics(size):
+    from geometry.fast_statistics import _cached_statistics, hole_statistics
+    geom = scaled_geometry(size['pilot_diameter_mm'], size['cell_size_mm'])
+
+    def run():
+        _cached_statistics.cache_clear()
+        return hole_statistics('Honeycomb', geom)
+    return run
+
+
+def _setup_score_patterns(size):
+    from geometry.fuel_patterns import modular_patterns, ring_patterns, score_patterns
+    geom = scaled_geometry(size['pilot_diameter_mm'], size['cell_size_mm'])
+    patterns = [*modular_patterns(periods=(2, 3, 4)), *ring_patterns()]
+    return lambda: score_patterns(patterns, 'Honeycomb', geom)
+
+
+def _operating_batch(batch_size):
+    # Spread the jet velocity so consecutive cases are not identical
+    base = OperatingParams()
+    return [dataclasses.replace(base, jet_velocity=base.jet_velocity * (1 + 0.01 * i)) for i in range(batch_size)]
+
+
+def _setup_jet_burner(size):
+    from calculations.jet_burner import JetBurner
+    geom = GeometryParams()
+    cases = _operating_batch(size['batch_size'])
+    return lambda: [JetBurner(geom, op).get_jet_burner_properties() for op in cases]
+
+
+def _setup_pilot_burner(size):
+    from calculations.pilot_burner import PilotBurner
+    geom = GeometryParams()
+    cases = _operating_batch(size['batch_size'])
+    return lambda: [PilotBurner(geom, op).get_pilot_burner_properties('Honeycomb') for op in cases]
+
+
+def _setup_coflow(size):
+    from calculations.n2_co_flow import CoFlow
+    geom = GeometryParams()
+    cases = _operating_batch(size['batch_size'])
+    return lambda: [CoFlow(geom, op).calculate_flows() for op in cases]
+
+
+def _setup_mixed_temperature(size):
+    from calculations.mixed_temperature import MixedTemperature
+    geom = GeometryParams()
+    cases = _operating_batch(size['batch_size'])
+    return lambda: [MixedTemperature(geom, op).calculate_mixed_temperature('Honeycomb') for op in cases]
+
+
+def _setup_evaluate_batch(size):
+    # The batched models for the same cases as the scalar calculators above
+    from calculations.vectorized import evaluate_batch, nominal_parameters
+    cases = _operating_batch(size['batch_size'])
+    parameters = nominal_parameters(GeometryParams(), cases[0])
+    parameters['jet_velocity'] = [op.jet_velocity for op in cases]
+    evaluate_batch(parameters)  # Build the property tables outside the timed call
+    return lambda: evaluate_batch(parameters)
+
+
+def _setup_evaluate_array(size):
+    # One burner array with a module per case
+    from calculations.burner_array import evaluate_array, uniform_array
+    from sweep.runner import Case
+    cases = _operating_batch(size['batch_size'])
+    parameters = uniform_array(Case(), len(cases), jet_velocity=[op.jet_velocity for op in cases])
+    evaluate_array(parameters)  # Build the property tables outside the timed call
+    return lambda: evaluate_array(parameters)
+
+
+def _setup_mixing_zone(size):
+    # Warm-started PSR/PFR solves of the cases on one prebuilt network
+    from calculations.burner_array import array_parameters
+    from calculations.reactor_network import MixingZone, batch_inlet_streams
+    from sweep.runner import Case
+    cases = [Case(operating=op) for op in _operating_batch(size['batch_size'])]
+    streams = batch_inlet_streams(array_parameters(cases))
+    area = math.pi / 4 * GeometryParams().coflow_OD ** 2
+    zone = MixingZone()
+
+    def run():
+        zone.reset()
+        return [zone.solve(case_streams, case.operating.jet_pressure, area)
+                for case, case_streams in zip(cases, streams)]
+    return run
+
+
+def _setup_nox_table(size):
+    # Interpolated NOx of a sweep from an in-memory table, its lattice nodes run once during setup
+    from calculations.burner_array import array_parameters
+    from calculations.emissions import NOxTable, batch_emissions
+    from sweep.runner import Case
+    parameters = array_parameters([Case(operating=op) for op in _operating_batch(size['batch_size'])])
+    table = NOxTable()
+    batch_emissions(parameters, table=table)
+    return lambda: batch_emissions(parameters, table=table)
+
+
+def _setup_ignition_map(size):
+    # Uncached ignition delays of a (phi, T) map on one reused reactor in this process
+    import numpy as np
+    from calculations.ignition import IgnitionDelayCache
+    n = max(1, int(math.sqrt(size['batch_size'])))
+    phi, temperature = np.meshgrid(np.linspace(0.3, 1.0, n), np.linspace(1000.0, 1400.0, n))
+    return lambda: IgnitionDelayCache()(phi, temperature, 5e5, workers=0)
+
+
+def _setup_compressible_jet(size):
+    # Fanno flow of jets spanning unchoked to choked velocities
+    import numpy as np
+    from calculations.compressible import CompressibleParams, jet_flow
+    op = OperatingParams()
+    velocity = np.linspace(50.0, 600.0, size['batch_size'])
+    area = math.pi / 4 * GeometryParams().jet_ID ** 2
+    params = CompressibleParams('fanno', pipe_length=0.3)
+    return lambda: jet_flow(op.jet_equivalence_ratio, op.jet_pressure, op.jet_temperature, velocity, area, params)
+
+
+def _setup_pressure_drops(size):
+    # Supply pressure drops of a sweep over every hole of the honeycomb pattern
+    from calculations.burner_array import array_parameters
+    from calculations.pressure_drop import batch_pressure_drops, pilot_holes
+    from sweep.runner import Case
+    parameters = array_parameters([Case(operating=op) for op in _operating_batch(size['batch_size'])])
+    holes = pilot_holes('Honeycomb', GeometryParams())
+    return lambda: batch_pressure_drops(parameters, holes)
+
+
+def _setup_schedule(size):
+    # Jet velocity ramp with a pilot equivalence ratio step, streamed over one step per case
+    import numpy as np
+    from sweep.runner import Case
+    from sweep.schedule import Profile, run_schedule
+    profiles = {'jet_velocity': Profile([0.0, 1.0], [20.0, 120.0]),
+                'pilot_equivalence_ratio': Profile([0.0, 0.5], [0.8, 0.4], kind='step')}
+    times = np.linspace(0.0, 1.0, size['batch_size'])
+    list(run_schedule(Case(), profiles, times))  # Build the property tables outside the timed call
+    return lambda: list(run_schedule(Case(), profiles, times))
+
+
+def _setup_radial_profiles(size):
+    # Turbulent jet and co-flow profiles of a sweep on a fine radial grid
+    from calculations.burner_array import array_parameters
+    from calculations.radial_profiles import ProfileParams, batch_profiles
+    from calculations.vectorized import table_bounds
+    from sweep.runner import Case
+    parameters = array_parameters([Case(operating=op) for op in _operating_batch(size['batch_size'])])
+    bounds = table_bounds(parameters)
+    params = ProfileParams('turbulent', points=1000, grid='cosine')
+    batch_profiles(parameters, params, bounds)  # Build the property tables outside the timed call
+    return lambda: batch_profiles(parameters, params, bounds)
+
+
+GEOMETRY_BENCHMARKS = {
+    'grid.generate_coordinates': _setup_grid,
+    'honeycomb.generate_air_holes': _setup_honeycomb_air_holes,
+    'plate.generate_air_holes': _setup_plate_air_holes,
+    'honeycomb.calculate_hole_statistics': _setup_honeycomb_statistics,
+    'plate.calculate_hole_statistics': _setup_plate_statistics,
+    'honeycomb.export_to_dxf': _setup_honeycomb_dxf,
+    'plate.export_to_dxf': _setup_plate_dxf,
+    'flow_network.pilot_flow_distribution': _setup_flow_distribution,
+    'lattice.mixing_uniformity': _setup_mixing_uniformity,
+    'fuel_patterns.score_patterns': _setup_score_patterns,
+    'fast_statistics.hole_statistics': _setup_fast_statistics,
+}
+
+CALCULATOR_BENCHMARKS = {
+    'JetBurner': _setup_jet_burner,
+    'PilotBurner': _setup_pilot_burner,
+    'CoFlow': _setup_coflow,
+    'MixedTemperature': _setup_mixed_temperature,
+    'evaluate_batch': _setup_evaluate_batch,
+    'burner_array.evaluate_array': _setup_evaluate_array,
+    'reactor_network.MixingZone': _setup_mixing_zone,
+    'emissions.NOxTable': _setup_nox_table,
+    'ignition.IgnitionDelayCache': _setup_ignition_map,
+    'compressible.jet_flow': _setup_compressible_jet,
+    'pressure_drop.batch_pressure_drops': _setup_pressure_drops,
+    'schedule.run_schedule': _setup_schedule,
+    'radial_profiles.batch_profiles': _setup_radial_profiles,
+}
+
+
+HEAVY_MODULES = ('cantera', 'shapely', 'ezdxf', 'matplotlib')
+
+# Cold start probes: code run in a fresh interpreter and the heavy modules it must not import
+COLD_START_PROBES = {
+    'import geometry': ('import geometry.honeycomb_generator, geometry.plate_generator',
+                        ('cantera', 'shapely', 'ezdxf', 'matplotlib')),
+    'import calculations': ('import calculations.mixed_temperature', ('cantera', 'shapely', 'ezdxf', 'matplotlib')),
+    'import gui': ('import gui.gui_main', ('cantera', 'shapely', 'ezdxf', 'matplotlib')),
+    'honeycomb stats': ('from geometry.honeycomb_generator import honeycomb_generator; honeycomb_generator()',
+                        ('cantera', 'ezdxf', 'matplotlib')),
+    'plate stats': ('from geometry.plate_generator import plate_generator; plate_generator()',
+                    ('cantera', 'ezdxf', 'matplotlib')),
+}
+
+_COLD_START_TEMPLATE = '''
+import json, sys, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+'''
+
+
+def measure_cold_start(probe, repeats=3):
+    """Run a cold start probe in fresh interpreters; return the timings and the heavy modules it imported"""
+    code, _ = COLD_START_PROBES[probe]
+    script = _COLD_START_TEMPLATE.format(code=code, heavy=HEAVY_MODULES)
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    times, loaded = [], set()
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', script], cwd=root, check=True, capture_output=True, text=True)
+        result = json.loads(output.stdout.strip().splitlines()[-1])
+        times.append(result['seconds'])
+        loaded.update(result['loaded'])
+    return times, sorted(loaded)
+
+
+def run_cold_start(repeats=3, log=print):
+    """Time every cold start probe; entries list unexpected heavy imports under 'violations'"""
+    entries = []
+    for probe, (_, forbidden) in COLD_START_PROBES.items():
+        times, loaded = measure_cold_start(probe, repeats)
+        entry = {
+            'size': {'probe': probe},
+            'key': _size_key({'probe': probe}),
+            'median_s': statistics.median(times),
+            'min_s': min(times),
+            'repeats': repeats,
+            'loaded': loaded,
+            'violations': [module for module in loaded if module in forbidden],
+        }
+        entries.append(entry)
+        log(f'{"cold_start":38} {entry["key"]:40} median {entry["median_s"] * 1e3:10.2f} ms  loaded {loaded}')
+    return entries
+
+
+def _jet_flame(mechanism):
+    # Jet flows and flame of the default case, without cached flame states
+    from calculations.fuels import clear_caches
+    from calculations.jet_burner import JetBurner
+    clear_caches()
+    jet = JetBurner(GeometryParams(), OperatingParams(), mechanism=mechanism)
+    jet.calculate_flame_properties(jet.calculate_flows()['mass_flow_h2'])
+
+
+def mechanism_timings(mechanisms=None, repeats=3, log=print):
+    """Size, construction and jet calculation time of each mechanism"""
+    from calculations.gas import MECHANISMS, new_solution
+
+    entries = []
+    for mechanism in mechanisms or list(MECHANISMS):
+        gas = new_solution(mechanism)
+        entry = {
+            'mechanism': mechanism,
+            'species': gas.n_species,
+            'reactions': gas.n_reactions,
+            'construct_s': statistics.median(_time_call(lambda: new_solution(mechanism), repeats)),
+            'jet_s': statistics.median(_time_call(lambda: _jet_flame(mechanism), repeats)),
+        }
+        entries.append(entry)
+        log(f'{mechanism:12} {entry["species"]:4d} species {entry["reactions"]:4d} reactions  '
+            f'construct {entry["construct_s"] * 1e3:7.2f} ms  jet {entry["jet_s"] * 1e3:7.2f} ms')
+    return entries
+
+
+def size_matrix(name, quick=False):
+    """Problem sizes of a benchmark, ordered from small to large"""
+    if name in CALCULATOR_BENCHMARKS:
+        return [{'batch_size': n} for n in (QUICK_BATCH_SIZES if quick else BATCH_SIZES)]
+    diameters = QUICK_PILOT_DIAMETERS if quick else PILOT_DIAMETERS
+    cells = QUICK_CELL_SIZES if quick else CELL_SIZES
+    return [{'pilot_diameter_mm': d, 'cell_size_mm': c} for d in diameters for c in cells]
+
+
+def _size_key(size):
+    return ','.join(f'{key}={size[key]}' for key in sorted(size))
+
+
+def _hole_count(size):
+    # Rough number of lattice cells, used to order sizes and to check the scaling curve
+    if 'batch_size' in size:
+        return size['batch_size']
+    return (size['pilot_diameter_mm'] / size['cell_size_mm']) ** 2
+
+
+def run_benchmarks(names=None, quick=False, repeats=3, budget=30.0, log=print):
+    """Run the selected benchmarks and return the result document"""
+    registry = {**GEOMETRY_BENCHMARKS, **CALCULATOR_BENCHMARKS}
+    names = names or ['cold_start', *registry]
+
+    results = {}
+    for name in names:
+        if name == 'cold_start':
+            results[name] = run_cold_start(repeats, log)
+            continue
+
+        setup = registry[name]
+        entries = []
+        over_budget = False
+        for size in sorted(size_matrix(name, quick), key=_hole_count):
+            entry = {'size': size, 'key': _size_key(size)}
+            if over_budget:
+                entry['skipped'] = True
+                entries.append(entry)
+                continue
+
+            func = setup(size)
+            times = _time_call(func, repeats)
+            entry.update({
+                'median_s': statistics.median(times),
+                'min_s': min(times),
+                'repeats': repeats,
+            })
+            entries.append(entry)
+            log(f'{name:38} {entry["key"]:40} median {entry["median_s"] * 1e3:10.2f} ms')
+
+            if entry['median_s'] > budget:
+                over_budget = True
+        results[name] = entries
+
+    return {'meta': environment_info(), 'results': results}
+
+
+def environment_info():
+    versions = {}
+    for module in ('numpy', 'cantera', 'shapely', 'ezdxf'):
+        try:
+            versions[module] = __import__(module).__version__
+        except ImportError:
+            versions[module] = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'versions': versions,
+    }
+
+
+def compare(current, baseline, threshold=0.2):
+    """Return the cases whose median time grew by more than `threshold` (relative) against the baseline"""
+    regressions = []
+    for name, entries in current['results'].items():
+        reference = {entry['key']: entry for entry in baseline.get('results', {}).get(name, [])}
+        for entry in entries:
+            ref = reference.get(entry['key'])
+            if entry.get('skipped') or ref is None or ref.get('skipped'):
+                continue
+            ratio = entry['median_s'] / ref['median_s'] if ref['median_s'] > 0 else math.inf
+            if ratio > 1 + threshold:
+                regressions.append({
+                    'benchmark': name,
+                    'size': entry['key'],
+                    'baseline_s': ref['median_s'],
+                    'current_s': entry['median_s'],
+                    'ratio': ratio,
+                })
+    return regressions
+
+
+def save(document, filename):
+    with open(filename, 'w') as f:
+        json.dump(document, f, indent=2)
+
+
+def load(filename):
+    with open(filename) as f:
+        return json.load(f)
+
+
+def _report(regressions, threshold):
+    if not regressions:
+        print(f'No regressions beyond {threshold:.0%}')
+        return 0
+    print(f'{len(regressions)} regression(s) beyond {threshold:.0%}:')
+    for reg in regressions:
+        print(f'  {reg["benchmark"]:38} {reg["size"]:40} '
+              f'{reg["baseline_s"] * 1e3:10.2f} ms -> {reg["current_s"] * 1e3:10.2f} ms ({reg["ratio"]:.2f}x)')
+    return 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the burner geometry and calculators.')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run = sub.add_parser('run', help='Run the benchmarks')
+    run.add_argument('--only', nargs='*', help='Benchmark names to run (default: all)')
+    run.add_argument('--quick', action='store_true', help='Use the reduced size matrix')
+    run.add_argument('--repeats', type=int, default=3)
+    run.add_argument('--budget', type=float, default=30.0,
+                     help='Stop a scaling curve once a size takes longer than this many seconds')
+    run.add_argument('--out', help='Write results to this JSON file')
+    run.add_argument('--baseline', help='Compare against this baseline JSON file')
+    run.add_argument('--threshold', type=float, default=0.2, help='Relative slowdown flagged as regression')
+
+    cmp = sub.add_parser('compare', help='Compare two result files')
+    cmp.add_argument('current')
+    cmp.add_argument('baseline')
+    cmp.add_argument('--threshold', type=float, default=0.2)
+
+    cold = sub.add_parser('cold-start', help='Time cold imports and check that no heavy module is loaded eagerly')
+    cold.add_argument('--repeats', type=int, default=3)
+
+    mech = sub.add_parser('mechanisms', help='Time the construction and a jet calculation of every mechanism')
+    mech.add_argument('--only', nargs='*', help='Mechanism names to time (default: all)')
+    mech.add_argument('--repeats', type=int, default=3)
+
+    sub.add_parser('list', help='List benchmark names')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'list':
+        for name in ['cold_start', *GEOMETRY_BENCHMARKS, *CALCULATOR_BENCHMARKS]:
+            print(name)
+        return 0
+
+    if args.command == 'cold-start':
+        violations = [entry for entry in run_cold_start(args.repeats) if entry['violations']]
+        for entry in violations:
+            print(f'{entry["size"]["probe"]} imported {", ".join(entry["violations"])}')
+        return 1 if violations else 0
+
+    if args.command == 'mechanisms':
+        mechanism_timings(args.only, args.repeats)
+        return 0
+
+    if args.command == 'compare':
+        return _report(compare(load(args.current), load(args.baseline), args.threshold), args.threshold)
+
+    document = run_benchmarks(args.only, args.quick, args.repeats, args.budget)
+    if args.out:
+        save(document, args.out)
+
+    status = 0
+    for entry in document['results'].get('cold_start', []):
+        if entry['violations']:
+            print(f'{entry["size"]["probe"]} imported {", ".join(entry["violations"])}')
+            status = 1
+    if args.baseline:
+        status |= _report(compare(document, load(args.baseline), args.threshold), args.threshold)
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""Arrays of burner modules fed from shared manifolds.
+
+A rig of N modules is evaluated as one batch of calculations.vectorized, one row per module, so the cost hardly grows
+with N and no Cantera objects are built per module. All jet, pilot and co-flow streams of all modules are then mixed
+in one enthalpy balance, as MixedTemperature does for a single module:
+
+    modules = [Case(operating=dataclasses.replace(op, jet_velocity=v)) for v in velocities]
+    result = evaluate_array(array_parameters(modules))
+    result.print_summary()
+
+Modules are anything with `geometry`, `operating` and `geometry_config` attributes (e.g. sweep.runner.Case). For N
+identical modules with a few parameters varying from module to module, `uniform_array` builds the parameters without
+a module list.
+"""
+import dataclasses
+
+import numpy as np
+
+from calculations.vectorized import (BATCH_PARAMETERS, FUEL, STREAMS, evaluate_batch, flame_mass_fractions,
+                                     mix_batch_streams, table_bounds)
+from calculations.mixed_temperature import MixingResults
+from calculations.results import JetBurnerTable, PilotBurnerTable, CoFlowTable
+from calculations.thermo import get_thermo
+from calculations.gas import DEFAULT_MECHANISM
+from geometry.fast_statistics import hole_statistics
+
+
+def _module_parameters(geometry, operating, geometry_config):
+    stats = hole_statistics(geometry_config, geometry)
+    values = {**dataclasses.asdict(geometry), **dataclasses.asdict(operating),
+              'air_hole_area': stats['air_hole_area'], 'fuel_hole_area': stats['fuel_hole_area']}
+    return {name: values[name] for name in BATCH_PARAMETERS}
+
+
+def array_parameters(modules):
+    """Batch parameters (see calculations.vectorized.nominal_parameters) of a list of modules, one row per module"""
+    rows = [_module_parameters(module.geometry, module.operating, module.geometry_config) for module in modules]
+    return {name: np.array([row[name] for row in rows], dtype=float) for name in BATCH_PARAMETERS}
+
+
+def uniform_array(module, n, **variations):
+    """Batch parameters of `n` copies of `module`, with per-module arrays (or scalars) for the `variations`"""
+    unknown = set(variations) - set(BATCH_PARAMETERS)
+    if unknown:
+        raise ValueError(f'Unsupported module parameters {sorted(unknown)}; choose from {BATCH_PARAMETERS}')
+    nominal = _module_parameters(module.geometry, module.operating, module.geometry_config)
+    return {name: np.broadcast_to(np.asarray(variations.get(name, nominal[name]), dtype=float), (n,)).copy()
+            for name in BATCH_PARAMETERS}
+
+
+@dataclasses.dataclass
+class ArrayResult:
+    """Per-module results and totals of a burner array
+
+    Attributes:
+    ----------
+    modules: dict
+        Stream name -> ResultTable with one row per module; 'mixing' mixes the streams of each module on its own.
+    totals: dict
+        Mass flows [kg/s] and flame powers [W] summed over all modules.
+    mixing: MixingResults
+        All streams of all modules mixed in one mass, species and enthalpy balance, leaving through the co-flow exits
+        of all modules.
+    """
+    modules: dict
+    totals: dict
+    mixing: object
+
+    def print_summary(self):
+        print(f'{len(self.modules["jet"])} modules')
+        for name, value in self.totals.items():
+            print(f'{name:24}: {value:.5e}')
+        print(f'{"mixed_temp":24}: {self.mixing.mixed_temp:.5e}')
+        spread = self.modules['mixing'].mixed_temp
+        print(f'{"module mixed_temp":24}: {spread.min():.5e} .. {spread.max():.5e}')
+
+
+def evaluate_array(parameters, bounds=None, fuel=FUEL, mechanism=DEFAULT_MECHANISM):
+    """Evaluate every module of the array and mix all of their streams.
+
+    Args:
+        parameters: Batch parameters, one row per module (`array_parameters` / `uniform_array`)
+        bounds: Property table bounds (calculations.vectorized.table_bounds), to reuse tables between calls
+        fuel: Fuel of the jet and pilot manifolds, H2 or a blend (calculations.fuels)
+        mechanism: Kinetic mechanism of the property tables (calculations.gas.MECHANISMS)
+    """
+    p = {name: np.asarray(parameters[name], dtype=float) for name in BATCH_PARAMETERS}
+    bounds = bounds or table_bounds(p, fuel, mechanism)
+    modules = evaluate_batch(p, streams=STREAMS, bounds=bounds, fuel=fuel, mechanism=mechanism)
+    jet, pilot, coflow = modules['jet'], modules['pilot'], modules['coflow']
+    jet_Y = flame_mass_fractions(p['jet_equivalence_ratio'], p['jet_temperature'], p['jet_pressure'], bounds, fuel,
+                                 mechanism)
+    pilot_Y = flame_mass_fractions(pilot.equivalence_ratio, p['pilot_temperature'], p['pilot_pressure'], bounds,
+                                   fuel, mechanism)
+
+    # One stream per type for the whole array: summed mass flows, mass weighted enthalpies and compositions
+    def combined(flow, values):
+        total = flow.sum()
+        return np.array([total]), (flow @ values / total)[None]
+
+    jet_flow, jet_h = combined(jet.mass_flow_total, jet.flame_enthalpy_mass)
+    pilot_flow, pilot_h = combined(pilot.mass_flow_total, pilot.flame_enthalpy_mass)
+    coflow_flow, coflow_h = combined(coflow.mass_flow, coflow.enthalpy)
+    _, jet_T = combined(jet.mass_flow_total, jet.flame_temperature)
+    _, jet_Y = combined(jet.mass_flow_total, jet_Y)
+    _, pilot_Y = combined(pilot.mass_flow_total, pilot_Y)
+    total_flow = jet.mass_flow_total + pilot.mass_flow_total + coflow.mass_flow
+    _, pressure = combined(total_flow, p['jet_pressure'])
+    mix = mix_batch_streams(
+        JetBurnerTable.from_columns(mass_flow_total=jet_flow, flame_enthalpy_mass=jet_h, flame_temperature=jet_T),
+        PilotBurnerTable.from_columns(mass_flow_total=pilot_flow, flame_enthalpy_mass=pilot_h),
+        CoFlowTable.from_columns(mass_flow=coflow_flow, enthalpy=coflow_h),
+        jet_Y, pilot_Y, pressure, area=np.array([np.pi / 4 * np.sum(p['coflow_OD'] ** 2)]), mechanism=mechanism,
+    )
+    species = get_thermo(mechanism=mechanism).species_names
+    mixing = MixingResults(
+        jet_mass_flow=float(jet_flow[0]),
+        pilot_mass_flow=float(pilot_flow[0]),
+        coflow_mass_flow=float(coflow_flow[0]),
+        total_mass_flow=float(mix['mass_flow'][0]),
+        mixed_temp=float(mix['temperature'][0]),
+        mixed_enthalpy=float(mix['enthalpy'][0]),
+        mixed_cp=float(mix['cp'][0]),
+        species_mass_fracs={name: y for name, y in zip(species, mix['mass_fractions'][0].tolist()) if y > 0},
+        mixed_velocity=float(mix['velocity'][0]),
+    )
+
+    totals = {
+        'jet_mass_flow': float(jet_flow[0]),
+        'pilot_mass_flow': float(pilot_flow[0]),
+        'coflow_mass_flow': float(coflow_flow[0]),
+        'total_mass_flow': float(jet_flow[0] + pilot_flow[0] + coflow_flow[0]),
+        'mass_flow_h2': float(jet.mass_flow_h2.sum() + pilot.mass_flow_h2.sum()),
+        'jet_flame_power': float(jet.flame_power.sum()),
+        'pilot_flame_power': float(pilot.flame_power.sum()),
+        'flame_power': float(jet.flame_power.sum() + pilot.flame_power.sum()),
+    }
+    return ArrayResult(modules=modules, totals=totals, mixing=mixing)
@@ -0,0 +1,202 @@
+"""Compressible flow of the premixed jet through its pipe.
+
+The incompressible jet model takes the jet velocity at the supply state (jet_pressure, jet_temperature). Here that
+state is the stagnation state of the supply, and the mixture expands to the jet velocity:
+
+* 'isentropic': isentropic expansion of the real mixture (NASA polynomial cp(T), calculations.thermo). The static
+  temperature follows from h0 - V^2/2, the static pressure from s(T, P) = s0, so density and mass flow drop with the
+  Mach number. Velocities above the speed of sound at the sonic state are not reachable: the flow is choked and the
+  mass flow is the critical one.
+* 'fanno': the isentropic inlet state followed by adiabatic flow with wall friction over the pipe length (Fanno
+  flow, with the ratio of specific heats at the inlet). A pipe longer than the choking length of the inlet Mach
+  number chokes at its exit and lowers the inlet Mach number to the one whose choking length is the pipe length.
+
+Every function works on arrays of operating points with vectorized Newton iterations over the cached mixture thermo,
+so a sweep evaluates all of its jets at once:
+
+    flow = jet_flow(phi, pressure, temperature, velocity, flow_area, CompressibleParams('fanno', pipe_length=0.2))
+    flow['mass_flow'], flow['choked']
+"""
+import dataclasses
+
+import numpy as np
+
+from calculations.fuels import HYDROGEN, OXIDIZER, blend_composition
+from calculations.gas import DEFAULT_MECHANISM
+
+MODELS = ('isentropic', 'fanno')
+
+
+@dataclasses.dataclass(frozen=True)
+class CompressibleParams:
+    """Compressible jet model
+
+    Attributes:
+    ----------
+    model: str
+        'isentropic' or 'fanno'.
+    pipe_length: float
+        Length of the jet pipe [m], required by 'fanno'.
+    friction_factor: float
+        Darcy friction factor of the pipe wall for 'fanno'.
+    tol: float
+        Relative tolerance of the Newton iterations.
+    max_iter: int
+        Iteration limit of the Newton iterations.
+    """
+    model: str = 'isentropic'
+    pipe_length: float = None
+    friction_factor: float = 0.02
+    tol: float = 1e-10
+    max_iter: int = 100
+
+    def __post_init__(self):
+        if self.model not in MODELS:
+            raise ValueError(f"Unknown compressible model '{self.model}'; choose from {MODELS}")
+        if self.model == 'fanno' and not self.pipe_length:
+            raise ValueError("The 'fanno' model requires the pipe_length")
+
+
+def _mixture(phi, fuel, mechanism):
+    # Cached thermo of the fresh mixture and its mass fractions (..., K)
+    from calculations.vectorized import _premixed
+    thermo, fuel_Y, oxidizer_Y, stoich_ratio = _premixed(blend_composition(fuel), OXIDIZER, mechanism)
+    oxidizer_per_fuel = stoich_ratio / np.asarray(phi, dtype=float)[..., None]
+    return thermo, (fuel_Y + oxidizer_per_fuel * oxidizer_Y) / (1.0 + oxidizer_per_fuel)
+
+
+def _entropy_std(thermo, T, Y):
+    # Specific entropy at the reference pressure, without the (constant) mixing term [J/kg/K]
+    return np.sum(Y * thermo.s_R(T) * thermo.gas_constant / thermo.molecular_weights, axis=-1)
+
+
+def _gamma(thermo, T, Y, R):
+    cp = thermo.cp_mass(T, Y)
+    return cp / (cp - R)
+
+
+def static_temperature(thermo, T0, Y, mach=1.0, tol=1e-10, max_iter=100):
+    """Static temperature at which the isentropic expansion from T0 reaches the Mach number (vectorized Newton)"""
+    R = thermo.gas_constant / thermo.mean_molecular_weight(Y)
+    h0 = thermo.enthalpy_mass(T0, Y)
+    m2 = np.asarray(mach, dtype=float) ** 2
+    T = np.asarray(T0, dtype=float) / (1.0 + (_gamma(thermo, T0, Y, R) - 1.0) / 2.0 * m2)
+    for _ in range(max_iter):
+        # Kinetic energy of the expansion equals M^2 gamma R T / 2
+        gamma = _gamma(thermo, T, Y, R)
+        residual = 2.0 * (h0 - thermo.enthalpy_mass(T, Y)) - m2 * gamma * R * T
+        step = residual / (2.0 * thermo.cp_mass(T, Y) + m2 * gamma * R)
+        T = T + step
+        if np.all(np.abs(step) < tol * T):
+            break
+    return T
+
+
+def fanno_length(mach, gamma):
+    """Dimensionless choking length f L*/D of Fanno flow at the Mach number"""
+    m2 = mach ** 2
+    return (1.0 - m2) / (gamma * m2) + (gamma + 1.0) / (2.0 * gamma) * np.log(
+        (gamma + 1.0) * m2 / (2.0 + (gamma - 1.0) * m2))
+
+
+def fanno_mach(length, gamma, tol=1e-10, max_iter=100):
+    """Subsonic Mach number whose choking length f L*/D is `length` (vectorized Newton)"""
+    length, gamma = np.broadcast_arrays(np.asarray(length, dtype=float), np.asarray(gamma, dtype=float))
+    # Start left of the root, where the leading term 1/(gamma M^2) dominates; Newton then rises monotonically
+    mach = np.clip(0.5 / np.sqrt(gamma * length + 1.0), 1e-6, 1.0)
+    for _ in range(max_iter):
+        m2 = mach ** 2
+        derivative = -2.0 * (1.0 - m2) / (gamma * mach ** 3 * (1.0 + (gamma - 1.0) / 2.0 * m2))
+        step = (fanno_length(mach, gamma) - length) / np.minimum(derivative, -1e-12)
+        mach = np.clip(mach - step, 1e-6, 1.0)
+        if np.all(np.abs(step) < tol * mach):
+            break
+    return mach
+
+
+def _fanno_ratios(mach, gamma):
+    # Static temperature, pressure and velocity relative to the sonic (choked) state of Fanno flow
+    factor = (gamma + 1.0) / (2.0 + (gamma - 1.0) * mach ** 2)
+    return factor, np.sqrt(factor) / mach, mach * np.sqrt(factor)
+
+
+def jet_flow(phi, pressure, temperature, velocity, flow_area, params=None, mechanism=DEFAULT_MECHANISM,
+             fuel=HYDROGEN):
+    """Compressible jet flow for arrays of operating points.
+
+    Args:
+        phi: Equivalence ratio of the premixed fuel/air jet
+        pressure, temperature: Stagnation state of the supply [Pa, K]
+        velocity: Requested jet velocity at the pipe inlet [m/s]
+        flow_area: Pipe flow area [m^2]
+        params: CompressibleParams (default isentropic)
+        mechanism: Cantera mechanism of the species data
+        fuel: Fuel composition, H2 or a blend (calculations.fuels)
+
+    Returns {name: array}: 'mass_flow', the inlet 'velocity', 'temperature', 'pressure', 'density' and 'mach' (reduced
+    to the choked values where the flow chokes), 'exit_velocity', 'exit_temperature', 'exit_pressure', 'exit_mach'
+    ('fanno'; equal to the inlet for 'isentropic') and the boolean 'choked'.
+    """
+    params = params or CompressibleParams()
+    phi, P0, T0, velocity, flow_area = np.broadcast_arrays(
+        *(np.asarray(value, dtype=float) for value in (phi, pressure, temperature, velocity, flow_area)))
+    thermo, Y = _mixture(phi, fuel, mechanism)
+    R = thermo.gas_constant / thermo.mean_molecular_weight(Y)
+    h0 = thermo.enthalpy_mass(T0, Y)
+    s0 = _entropy_std(thermo, T0, Y)
+
+    def expand(T):
+        # Isentropic static state at temperature T
+        P = P0 * np.exp((_entropy_std(thermo, T, Y) - s0) / R)
+        return P, P / (R * T), np.sqrt(_gamma(thermo, T, Y, R) * R * T)
+
+    # Isentropic inlet, limited by the sonic state
+    T_sonic = static_temperature(thermo, T0, Y, 1.0, params.tol, params.max_iter)
+    sonic_velocity = np.sqrt(2.0 * (h0 - thermo.enthalpy_mass(T_sonic, Y)))
+    choked = velocity >= sonic_velocity
+    V = np.minimum(velocity, sonic_velocity)
+    T = np.where(choked, T_sonic, thermo.temperature_from_enthalpy(h0 - V ** 2 / 2, Y, T0=T0, tol=params.tol))
+    P, rho, a = expand(T)
+    mach = V / a
+
+    if params.model == 'isentropic':
+        exit_T, exit_P, exit_V, exit_mach = T, P, V, mach
+    else:
+        gamma = _gamma(thermo, T, Y, R)
+        length = params.friction_factor * params.pipe_length / (2.0 * np.sqrt(flow_area / np.pi))
+        # A pipe longer than the choking length of the inlet Mach number lowers the inlet Mach number to match it
+        friction_choked = fanno_length(mach, gamma) <= length
+        choked = choked | friction_choked
+        # The ratio of specific heats of the limited inlet depends on its Mach number; iterate to the fixed point so
+        # the limit does not depend on the requested velocity
+        for _ in range(params.max_iter):
+            limit_mach = np.where(friction_choked, fanno_mach(length, gamma, params.tol, params.max_iter), mach)
+            T = np.where(friction_choked, static_temperature(thermo, T0, Y, limit_mach, params.tol, params.max_iter),
+                         T)
+            gamma, previous = _gamma(thermo, T, Y, R), mach
+            mach = limit_mach
+            if np.all(np.abs(mach - previous) <= params.tol * mach):
+                break
+        P, rho, a = expand(T)
+        V = mach * a
+
+        exit_mach = np.where(choked & friction_choked, 1.0,
+                             fanno_mach(np.maximum(fanno_length(mach, gamma) - length, 0.0), gamma,
+                                        params.tol, params.max_iter))
+        inlet_ratios, exit_ratios = _fanno_ratios(mach, gamma), _fanno_ratios(exit_mach, gamma)
+        exit_T, exit_P, exit_V = (value * exit_ratio / inlet_ratio for value, inlet_ratio, exit_ratio
+                                  in zip((T, P, V), inlet_ratios, exit_ratios))
+
+    return {
+        'mass_flow': rho * V * flow_area,
+        'velocity': V,
+        'temperature': T,
+        'pressure': P,
+        'density': rho,
+        'mach': mach,
+        'exit_velocity': exit_V,
+        'exit_temperature': exit_T,
+        'exit_pressure': exit_P,
+        'exit_mach': exit_mach,
+        'choked': choked,
+    }
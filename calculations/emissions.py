@@ -0,0 +1,289 @@
+"""NO and NO2 emission estimates of the jet and pilot flames from a persistent table of reactor runs.
+
+The flame of a fresh fuel/air mixture at (phi, T_in, P) is modelled as a stirred reactor followed by a plug flow
+reactor (calculations.reactor_network). Each run gives the NO and NO2 history over the post-flame residence time, so
+one run fills the residence time axis of a table node. Nodes lie on a fixed lattice in (phi, T_in, P) per fuel (H2 or
+a blend, calculations.fuels); a query interpolates
+between the corners of its lattice cell and runs the reactors only for corners that are not in the table yet. The
+table is stored as .npz and reloaded by the next session, so after the first queries of a range, estimates cost an
+interpolation:
+
+    table = default_table()
+    no_ppm = table(phi, temperature, pressure, residence_time)['NO']
+
+The default table lives in data/nox_table.npz, or in the file named by the BURNER_EMISSIONS_CACHE environment
+variable. Tables built with different NOxTableParams are not reused.
+"""
+import dataclasses
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from calculations.fuels import blend_composition
+from calculations.gas import DEFAULT_MECHANISM, new_solution
+from utils import instrumentation
+
+FUEL = 'H2:1.0'
+OXIDIZER = 'O2:1.0, N2:3.76'
+RESIDENCE_TIME = 10e-3  # Default post-flame residence time [s]
+DEFAULT_CACHE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'nox_table.npz')
+
+# Tabulated quantities: mole fractions in ppm and mass fractions
+QUANTITIES = ('NO', 'NO2', 'Y_NO', 'Y_NO2')
+
+
+@dataclasses.dataclass(frozen=True)
+class NOxTableParams:
+    """Lattice and reactor settings of a NOx table
+
+    Attributes:
+    ----------
+    phi_step, temperature_step, pressure_step: float
+        Lattice spacing of the nodes in equivalence ratio, inlet temperature [K] and pressure [Pa].
+    max_residence_time: float
+        Longest tabulated post-flame residence time [s].
+    residence_points: int
+        Number of points of the residence time axis, evenly spaced from 0.
+    psr_residence_time: float
+        Residence time of the flame (stirred reactor) [s].
+    mechanism: str
+        Cantera mechanism of the reactor runs; must contain NO and NO2.
+    """
+    phi_step: float = 0.05
+    temperature_step: float = 50.0
+    pressure_step: float = 1e5
+    max_residence_time: float = 50e-3
+    residence_points: int = 26
+    psr_residence_time: float = 0.5e-3
+    mechanism: str = DEFAULT_MECHANISM
+
+    @property
+    def residence_times(self):
+        return np.linspace(0.0, self.max_residence_time, self.residence_points)
+
+    @property
+    def steps(self):
+        return np.array([self.phi_step, self.temperature_step, self.pressure_step])
+
+
+def _zone(params):
+    from calculations.reactor_network import MixingZone, MixingZoneParams
+    return MixingZone(n_streams=1, mechanism=params.mechanism, params=MixingZoneParams(
+        psr_residence_time=params.psr_residence_time, pfr_residence_time=params.max_residence_time,
+        pfr_points=params.residence_points, start_from_equilibrium=True))
+
+
+def _run_nodes(params, nodes, fuel):
+    # NO/NO2 histories (n, len(QUANTITIES), residence_points) of the lattice nodes (n, 3) of one fuel
+    from calculations.reactor_network import InletStream
+
+    zone = _zone(params)
+    gas = new_solution(params.mechanism)
+    no, no2 = gas.species_index('NO'), gas.species_index('NO2')
+    values = np.empty((len(nodes), len(QUANTITIES), params.residence_points))
+    for n, (phi, temperature, pressure) in enumerate(np.asarray(nodes) * params.steps):
+        instrumentation.count('nox_reactor_runs')
+        gas.TP = temperature, pressure
+        gas.set_equivalence_ratio(phi, fuel, OXIDIZER)
+        stream = InletStream(1.0, temperature, dict(zip(gas.species_names, gas.Y)))
+        # Every node starts from its own equilibrium: a warm start from a neighbour could miss a blow-out
+        zone.reset()
+        result = zone.solve([stream], pressure, 1.0)
+        molecular_weight = 1.0 / (result.mass_fractions / gas.molecular_weights).sum(axis=1)
+        for q, (k, scale) in enumerate([(no, 1e6), (no2, 1e6), (no, 0), (no2, 0)]):
+            Y = result.mass_fractions[:, k]
+            values[n, q] = Y * molecular_weight / gas.molecular_weights[k] * scale if scale else Y
+    return values
+
+
+class NOxTable:
+    def __init__(self, params=None, path=None):
+        """Table of reactor runs on the lattice of `params`, loaded from `path` if it holds a matching table.
+
+        Args:
+            params: NOxTableParams
+            path: .npz file the table is loaded from and saved to; None keeps it in memory only
+        """
+        self.params = params or NOxTableParams()
+        self.path = path
+        self.nodes = {}  # (fuel, lattice index i, j, k) -> row of self.values
+        self.values = np.empty((0, len(QUANTITIES), self.params.residence_points))
+        if path and os.path.exists(path):
+            self._load(path)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def _load(self, path):
+        with np.load(path) as archive:
+            if json.loads(str(archive['params'])) != dataclasses.asdict(self.params):
+                return
+            self.values = archive['values']
+            # Tables written before fuels were tabulated only hold H2 nodes
+            fuels = archive['fuels'].tolist() if 'fuels' in archive.files else [blend_composition(FUEL)] * len(
+                self.values)
+            self.nodes = {(fuel, *node): row for row, (fuel, node) in enumerate(zip(fuels, archive['nodes'].tolist()))}
+
+    def save(self, path=None):
+        """Write the table; written to a temporary file first so an interrupted save keeps the old table"""
+        path = path or self.path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        keys = sorted(self.nodes, key=self.nodes.get)
+        nodes = np.array([key[1:] for key in keys], dtype=np.int64).reshape(-1, 3)
+        fuels = np.array([key[0] for key in keys], dtype=str)
+        temporary = path + '.tmp.npz'
+        np.savez(temporary, params=json.dumps(dataclasses.asdict(self.params)), nodes=nodes, fuels=fuels,
+                 values=self.values)
+        os.replace(temporary, path)
+
+    def add_nodes(self, nodes, workers=0, fuel=FUEL):
+        """Run the reactors for the lattice nodes not yet in the table; returns the number of runs
+
+        Args:
+            nodes: Lattice indices (n, 3)
+            workers: Worker processes (None: one per CPU, 0: run in this process)
+            fuel: Fuel of the mixtures, H2 or a blend (calculations.fuels)
+        """
+        fuel = blend_composition(fuel)
+        missing = sorted({(fuel, *node) for node in np.asarray(nodes, dtype=np.int64).tolist()} - set(self.nodes))
+        if not missing:
+            return 0
+        indices = [node[1:] for node in missing]
+        if workers == 0 or len(missing) == 1:
+            values = _run_nodes(self.params, indices, fuel)
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                chunks = np.array_split(np.array(indices), min(len(missing), pool._max_workers))
+                values = np.concatenate(list(pool.map(_run_nodes, [self.params] * len(chunks), chunks,
+                                                      [fuel] * len(chunks))))
+        self.nodes.update({node: len(self.nodes) + i for i, node in enumerate(missing)})
+        self.values = np.concatenate([self.values, values])
+        if self.path:
+            self.save()
+        return len(missing)
+
+    def __call__(self, phi, temperature, pressure, residence_time=RESIDENCE_TIME, workers=0, fuel=FUEL):
+        """Interpolated {quantity: array} at the points, broadcast against each other.
+
+        'NO' and 'NO2' are mole fractions [ppm] of the wet flame products, 'Y_NO' and 'Y_NO2' mass fractions. Lattice
+        cells around the points that are not tabulated yet for `fuel` are filled by reactor runs first.
+        """
+        fuel = blend_composition(fuel)
+        phi, temperature, pressure, residence_time = np.broadcast_arrays(
+            *(np.asarray(value, dtype=float) for value in (phi, temperature, pressure, residence_time)))
+        shape = phi.shape
+        times = self.params.residence_times
+        if np.any(residence_time < 0) or np.any(residence_time > times[-1]):
+            raise ValueError(f'Residence times must lie within [0, {times[-1]}] s; raise max_residence_time')
+
+        x = np.stack([phi.ravel(), temperature.ravel(), pressure.ravel()], axis=1) / self.params.steps
+        lower = np.floor(x).astype(np.int64)
+        fraction = x - lower
+
+        # Corners of the lattice cell of every point, skipping those with zero weight
+        offsets = np.array([[(c >> d) & 1 for d in range(3)] for c in range(8)])
+        weights = np.prod(np.where(offsets, fraction[:, None, :], 1.0 - fraction[:, None, :]), axis=2)
+        corners = lower[:, None, :] + offsets
+        used = weights > 0
+        self.add_nodes(corners[used], workers, fuel)
+
+        rows = np.zeros(weights.shape, dtype=np.intp)
+        rows[used] = [self.nodes[(fuel, *node)] for node in corners[used].tolist()]
+        values = np.einsum('pc,pcqt->pqt', weights, self.values[rows])
+
+        # Linear in residence time
+        position = residence_time.ravel() / times[-1] * (len(times) - 1) if times[-1] > 0 else np.zeros(len(x))
+        i = np.clip(np.floor(position).astype(np.intp), 0, max(len(times) - 2, 0))
+        w = np.clip(position - i, 0.0, 1.0)
+        upper = np.minimum(i + 1, len(times) - 1)
+        points = np.arange(len(x))
+        result = (1 - w)[:, None] * values[points, :, i] + w[:, None] * values[points, :, upper]
+        return {name: result[:, q].reshape(shape) for q, name in enumerate(QUANTITIES)}
+
+
+_default_table = None
+
+
+def default_table():
+    """The table cached at BURNER_EMISSIONS_CACHE (default data/nox_table.npz), loaded once per process"""
+    global _default_table
+    if _default_table is None:
+        _default_table = NOxTable(path=os.environ.get('BURNER_EMISSIONS_CACHE') or DEFAULT_CACHE)
+    return _default_table
+
+
+@dataclasses.dataclass
+class EmissionResults:
+    """NO and NO2 of the jet and pilot flames
+
+    Attributes:
+    ----------
+    residence_time: float
+        Post-flame residence time of the estimate [s].
+    jet_NO, jet_NO2, pilot_NO, pilot_NO2: float
+        Mole fractions in the flame products [ppm, wet].
+    jet_NOx_mass_flow, pilot_NOx_mass_flow: float
+        NO + NO2 mass flows leaving the flames [kg/s].
+    """
+    residence_time: float
+    jet_NO: float
+    jet_NO2: float
+    pilot_NO: float
+    pilot_NO2: float
+    jet_NOx_mass_flow: float
+    pilot_NOx_mass_flow: float
+
+    def print_properties(self):
+        max_length = max(len(field) for field in self.__dataclass_fields__)  # type: ignore
+        for field in self.__dataclass_fields__:  # type: ignore
+            print(f"{field:{max_length}}: {getattr(self, field):.5e}")
+
+
+def flame_emissions(jet_results, pilot_results, operating, residence_time=RESIDENCE_TIME, table=None, fuel=FUEL):
+    """Emission estimate of the jet and pilot flames of one case from the calculator results of `fuel`"""
+    if table is None:
+        table = default_table()
+    jet_phi = operating.jet_equivalence_ratio
+    values = table([jet_phi, pilot_results.equivalence_ratio],
+                   [operating.jet_temperature, operating.pilot_temperature],
+                   [operating.jet_pressure, operating.pilot_pressure], residence_time, fuel=fuel)
+    nox = values['Y_NO'] + values['Y_NO2']
+    return EmissionResults(
+        residence_time=residence_time,
+        jet_NO=float(values['NO'][0]),
+        jet_NO2=float(values['NO2'][0]),
+        pilot_NO=float(values['NO'][1]),
+        pilot_NO2=float(values['NO2'][1]),
+        jet_NOx_mass_flow=float(nox[0] * jet_results.mass_flow_total),
+        pilot_NOx_mass_flow=float(nox[1] * pilot_results.mass_flow_total),
+    )
+
+
+def batch_emissions(parameters, residence_time=RESIDENCE_TIME, table=None, bounds=None, workers=0, fuel=FUEL):
+    """Emission estimates of the jet and pilot flames for a batch of parameters (calculations.vectorized) burning
+    `fuel`, as {EmissionResults field: array}. Missing lattice nodes of a large sweep are run on `workers` processes.
+    """
+    from calculations.vectorized import BATCH_PARAMETERS, evaluate_batch, table_bounds
+
+    if table is None:
+        table = default_table()
+    mechanism = table.params.mechanism
+    p = {name: np.asarray(parameters[name], dtype=float) for name in BATCH_PARAMETERS}
+    bounds = bounds or table_bounds(p, fuel, mechanism)
+    streams = evaluate_batch(p, streams=('jet', 'pilot'), bounds=bounds, fuel=fuel, mechanism=mechanism)
+    jet, pilot = streams['jet'], streams['pilot']
+    jet_values = table(p['jet_equivalence_ratio'], p['jet_temperature'], p['jet_pressure'], residence_time, workers,
+                       fuel)
+    pilot_values = table(pilot.equivalence_ratio, p['pilot_temperature'], p['pilot_pressure'], residence_time, workers,
+                         fuel)
+    return {
+        'residence_time': np.broadcast_to(residence_time, np.shape(jet_values['NO'])).astype(float),
+        'jet_NO': jet_values['NO'],
+        'jet_NO2': jet_values['NO2'],
+        'pilot_NO': pilot_values['NO'],
+        'pilot_NO2': pilot_values['NO2'],
+        'jet_NOx_mass_flow': (jet_values['Y_NO'] + jet_values['Y_NO2']) * jet.mass_flow_total,
+        'pilot_NOx_mass_flow': (pilot_values['Y_NO'] + pilot_values['Y_NO2']) * pilot.mass_flow_total,
+    }
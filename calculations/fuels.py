@@ -0,0 +1,133 @@
+"""Fuel blends of hydrogen with methane or ammonia.
+
+Fuels are Cantera mole fraction compositions ('H2:0.7, CH4:0.3' or {'H2': 0.7, 'CH4': 0.3}). `blend_composition`
+normalizes a fuel and rounds its mole fractions to BLEND_RESOLUTION, giving one canonical string per blend. The
+per-fuel caches here and in calculations.vectorized / calculations.property_tables are keyed on that string, so all
+cases of a blend sweep that fall on the same quantized blend share heating value, stoichiometry, property tables and
+equilibrium flame states:
+
+    fuel = h2_blend('NH3', 0.3)          # 'H2:0.7, NH3:0.3'
+    jet = JetBurner(geometry, operating, fuel=fuel)
+    lower_heating_value(fuel)            # [J/kg], from the thermo data of the mechanism
+"""
+import functools
+import math
+
+from calculations.gas import DEFAULT_MECHANISM, new_solution, equilibrate
+from utils.lazy import lazy_import
+
+ct = lazy_import('cantera')
+
+HYDROGEN = 'H2:1.0'
+OXIDIZER = 'O2:1.0, N2:3.76'
+AIR = 'O2:0.21, N2:0.79'
+BLEND_RESOLUTION = 1e-3  # Mole fraction resolution of the blend cache keys
+REFERENCE_TEMPERATURE = 298.15  # Reference temperature of the heating values [K]
+
+
+def blend_composition(fuel, resolution=BLEND_RESOLUTION):
+    """Canonical 'A:x, B:y' composition of a fuel: normalized, rounded to `resolution`, sorted by species"""
+    if isinstance(fuel, str):
+        fuel = {name.strip(): float(value) if value.strip() else 1.0
+                for name, _, value in (item.partition(':') for item in fuel.split(',') if item.strip())}
+    total = sum(fuel.values())
+    if total <= 0 or any(value < 0 for value in fuel.values()):
+        raise ValueError(f"Invalid fuel composition '{fuel}'")
+    digits = max(0, -math.floor(math.log10(resolution)))
+    rounded = {name: round(round(value / total / resolution) * resolution, digits) for name, value in fuel.items()}
+    return ', '.join(f'{name}:{value:g}' for name, value in sorted(rounded.items()) if value > 0)
+
+
+def h2_blend(species, fraction):
+    """Canonical composition of H2 blended with `fraction` (mole fraction) of `species`, e.g. 'CH4' or 'NH3'"""
+    if not 0.0 <= fraction <= 1.0:
+        raise ValueError(f'Blend fraction must lie within [0, 1], got {fraction}')
+    return blend_composition({'H2': 1.0 - fraction, species: fraction})
+
+
+def fuel_species(fuel):
+    """Species of a fuel, in canonical order"""
+    return tuple(item.split(':')[0] for item in blend_composition(fuel).split(', '))
+
+
+def main_species(fuel):
+    """Species with the largest mole fraction of a fuel, used for its diffusivity (Lewis number)"""
+    composition = blend_composition(fuel)
+    return max((item.split(':') for item in composition.split(', ')), key=lambda item: float(item[1]))[0]
+
+
+@functools.lru_cache(maxsize=None)
+def _lower_heating_value(fuel, mechanism):
+    gas = new_solution(mechanism)
+    gas.TPX = REFERENCE_TEMPERATURE, ct.one_atm, fuel
+    fuel_enthalpy = gas.enthalpy_mole
+    molecular_weight = gas.mean_molecular_weight
+    atoms = {element: sum(x * gas.n_atoms(k, element) for k, x in enumerate(gas.X) if x > 0)
+             if element in gas.element_names else 0.0 for element in ('C', 'H', 'O', 'N')}
+
+    # Complete combustion per kmol of fuel: C -> CO2, H -> H2O (vapour), N -> N2
+    h = dict(zip(gas.species_names, gas.standard_enthalpies_RT * ct.gas_constant * REFERENCE_TEMPERATURE))
+    products = {'CO2': atoms['C'], 'H2O': atoms['H'] / 2, 'N2': atoms['N'] / 2}
+    oxygen = atoms['C'] + atoms['H'] / 4 - atoms['O'] / 2
+    released = fuel_enthalpy + oxygen * h['O2'] - sum(n * h[name] for name, n in products.items() if n > 0)
+    return released / molecular_weight
+
+
+def lower_heating_value(fuel=HYDROGEN, mechanism=DEFAULT_MECHANISM):
+    """Lower heating value [J/kg of fuel] at REFERENCE_TEMPERATURE from the thermo data of the mechanism"""
+    return _lower_heating_value(blend_composition(fuel), mechanism)
+
+
+@functools.lru_cache(maxsize=None)
+def _stoich_air_fuel_ratio(fuel, oxidizer, mechanism):
+    return new_solution(mechanism).stoich_air_fuel_ratio(fuel, oxidizer, basis='mole')
+
+
+def stoich_air_fuel_ratio(fuel=HYDROGEN, oxidizer=OXIDIZER, mechanism=DEFAULT_MECHANISM):
+    """Stoichiometric oxidizer/fuel mass ratio of the fuel and oxidizer given as mole fractions"""
+    return _stoich_air_fuel_ratio(blend_composition(fuel), oxidizer, mechanism)
+
+
+@functools.lru_cache(maxsize=4096)
+def _gas_properties(composition, temperature, pressure, mechanism):
+    gas = new_solution(mechanism)
+    gas.TPX = temperature, pressure, composition
+    return {'density': gas.density_mass, 'viscosity': gas.viscosity, 'enthalpy_mass': gas.enthalpy_mass}
+
+
+def gas_properties(composition, temperature, pressure, mechanism=DEFAULT_MECHANISM):
+    """Density [kg/m^3], viscosity [Pa s] and enthalpy [J/kg] of a fixed composition (a fuel, air or N2), cached per
+    (composition, T, P)"""
+    return dict(_gas_properties(blend_composition(composition), float(temperature), float(pressure), mechanism))
+
+
+@functools.lru_cache(maxsize=4096)
+def _flame_state(fuel, oxidizer, phi, temperature, pressure, mechanism):
+    flame = new_solution(mechanism)
+    flame.TP = temperature, pressure
+    flame.set_equivalence_ratio(phi, fuel, oxidizer)
+    equilibrate(flame, 'HP')
+    return {
+        'density': flame.density_mass,
+        'temperature': flame.T,
+        'enthalpy_mass': flame.enthalpy_mass,
+        'enthalpy_mole': flame.enthalpy_mole,
+        'mass_fractions': {name: y for name, y in zip(flame.species_names, flame.Y) if y > 0},
+    }
+
+
+def flame_state(fuel, phi, temperature, pressure, oxidizer=OXIDIZER, mechanism=DEFAULT_MECHANISM):
+    """Adiabatic equilibrium (HP) flame of the fresh mixture, cached per (blend, phi, T, P).
+
+    Returns {name: value} with 'density', 'temperature', 'enthalpy_mass', 'enthalpy_mole' and 'mass_fractions'
+    ({species: mass fraction}, a copy that may be modified).
+    """
+    state = _flame_state(blend_composition(fuel), oxidizer, float(phi), float(temperature), float(pressure),
+                         mechanism)
+    return {**state, 'mass_fractions': dict(state['mass_fractions'])}
+
+
+def clear_caches():
+    """Drop the cached heating values, stoichiometry, gas properties and flame states"""
+    for cached in (_lower_heating_value, _stoich_air_fuel_ratio, _gas_properties, _flame_state):
+        cached.cache_clear()
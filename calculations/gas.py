@@ -0,0 +1,108 @@
+"""Cantera access shared by the calculators.
+
+Mechanisms are given by file name, as Cantera takes them, or by one of the names in MECHANISMS. The burner only ever
+holds hydrogen, air and nitrogen, so besides the full GRI-Mech 3.0 ('gri30', 53 species) the registry offers Cantera's
+bundled hydrogen mechanism ('h2o2') and subsets of gri30 restricted to the species built from a few elements. Subsets
+keep the gri30 data of their species and every gri30 reaction among them, so they reproduce gri30 equilibria of
+hydrogen/air mixtures while construction, equilibrium and transport evaluations scale with the smaller species count:
+
+    gas = new_solution('gri30-hon')
+    jet = JetBurner(geometry, operating, mechanism='h2o2')
+"""
+import dataclasses
+import functools
+
+from utils import instrumentation
+from utils.lazy import lazy_import
+
+ct = lazy_import('cantera')
+
+DEFAULT_MECHANISM = 'gri30.yaml'
+
+
+@dataclasses.dataclass(frozen=True)
+class Mechanism:
+    """A mechanism file, or the subset of its species made of the given elements
+
+    Attributes:
+    ----------
+    source: str
+        Mechanism file.
+    elements: tuple
+        Elements the species of the subset may contain; None keeps the whole mechanism.
+    extra_species: tuple
+        Species kept in the subset in addition to those made of `elements` (e.g. inert N2).
+    """
+    source: str
+    elements: tuple = None
+    extra_species: tuple = ()
+
+
+MECHANISMS = {
+    'gri30': Mechanism('gri30.yaml'),
+    'h2o2': Mechanism('h2o2.yaml'),
+    # Hydrogen, oxygen and nitrogen chemistry of gri30, NOx included
+    'gri30-hon': Mechanism('gri30.yaml', elements=('H', 'O', 'N')),
+    # Hydrogen/oxygen chemistry of gri30 with inert nitrogen
+    'gri30-ho': Mechanism('gri30.yaml', elements=('H', 'O'), extra_species=('N2',)),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def _species_elements(source):
+    # {species name: elements} of a mechanism file, in file order
+    return {species.name: set(species.composition) for species in ct.Species.list_from_file(source)}
+
+
+def subset_species(mechanism):
+    """Species of a Mechanism (or registry name) subset, in the order of its source file"""
+    if isinstance(mechanism, str):
+        mechanism = MECHANISMS[mechanism]
+    species = _species_elements(mechanism.source)
+    if mechanism.elements is None:
+        return list(species)
+    return [name for name, elements in species.items()
+            if elements <= set(mechanism.elements) or name in mechanism.extra_species]
+
+
+@functools.lru_cache(maxsize=None)
+def _subset_yaml(mechanism):
+    # Phase definition taking the species and the reactions among them from the source file
+    species = subset_species(mechanism)
+    elements = []
+    for name in species:
+        elements.extend(e for e in sorted(_species_elements(mechanism.source)[name]) if e not in elements)
+    return f"""
+phases:
+- name: {mechanism.source.rsplit('.', 1)[0]}-subset
+  thermo: ideal-gas
+  elements: [{', '.join(elements)}]
+  species: [{{{mechanism.source}/species: [{', '.join(species)}]}}]
+  kinetics: gas
+  reactions: [{{{mechanism.source}/reactions: declared-species}}]
+  skip-undeclared-third-bodies: true
+  transport: mixture-averaged
+  state: {{T: 300.0, P: 1 atm}}
+"""
+
+
+def new_solution(mechanism=DEFAULT_MECHANISM):
+    """Construct a Cantera Solution, counting the construction for instrumentation
+
+    Args:
+        mechanism: Name from MECHANISMS, a Mechanism, or a mechanism file
+    """
+    instrumentation.count('cantera_solutions')
+    if isinstance(mechanism, str):
+        mechanism = MECHANISMS.get(mechanism, mechanism)
+    if isinstance(mechanism, str):
+        return ct.Solution(mechanism)
+    if mechanism.elements is None:
+        return ct.Solution(mechanism.source)
+    return ct.Solution(yaml=_subset_yaml(mechanism))
+
+
+def equilibrate(gas, mode):
+    """Equilibrate `gas` in place, counting the call for instrumentation"""
+    instrumentation.count('equilibrium_calls')
+    gas.equilibrate(mode)
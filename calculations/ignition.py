@@ -0,0 +1,226 @@
+"""Autoignition delay of the premixed jet mixture in hot surroundings.
+
+The jet carries premixed fuel/air (H2 or a blend, calculations.fuels) at up to 5 bar past the hot pilot. The ignition
+delay of the fresh jet mixture (phi, P) brought to a surrounding temperature T is the time to the steepest temperature
+rise of a constant pressure reactor integration; delays far shorter than the transit time of the mixture mean it may
+ignite before it leaves the nozzle. A mixture that does not ignite within IgnitionParams.max_time has an infinite delay:
+
+    delays = default_cache()(phi, temperature, pressure)          # broadcast arrays, reactors run over a pool
+    results = jet_ignition_delays(pilot_results, operating)
+
+Each worker process builds one reactor and reuses it for every point it integrates. Delays are kept per point in a
+persistent cache, data/ignition_delays.npz or the file named by the BURNER_IGNITION_CACHE environment variable, so a
+delay map over (phi, T, P) of a fuel only integrates the points no earlier session computed.
+"""
+import dataclasses
+import functools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from calculations.fuels import blend_composition
+from calculations.gas import DEFAULT_MECHANISM, new_solution
+from utils import instrumentation
+from utils.lazy import lazy_import
+
+ct = lazy_import('cantera')
+
+FUEL = 'H2:1.0'
+OXIDIZER = 'O2:1.0, N2:3.76'
+DEFAULT_CACHE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data',
+                             'ignition_delays.npz')
+
+# Resolution of the cache keys in equivalence ratio, temperature [K] and pressure [Pa]
+KEY_RESOLUTION = np.array([1e-4, 1e-2, 1.0])
+
+
+@dataclasses.dataclass(frozen=True)
+class IgnitionParams:
+    """Integration settings of the ignition delay
+
+    Attributes:
+    ----------
+    max_time: float
+        Integration time [s] after which a mixture counts as not igniting.
+    min_temperature_rise: float
+        Temperature rise [K] within max_time that counts as ignition.
+    mechanism: str
+        Cantera mechanism of the reactor.
+    """
+    max_time: float = 0.1
+    min_temperature_rise: float = 100.0
+    mechanism: str = DEFAULT_MECHANISM
+
+
+class IgnitionReactor:
+    def __init__(self, params=None):
+        """Constant pressure reactor, built once and re-initialized for every mixture
+
+        Args:
+            params: IgnitionParams
+        """
+        self.params = params or IgnitionParams()
+        self.gas = new_solution(self.params.mechanism)
+        self.reactor = ct.IdealGasConstPressureReactor(self.gas, clone=True)
+        self.net = ct.ReactorNet([self.reactor])
+
+    def delay(self, phi, temperature, pressure, fuel=FUEL):
+        """Ignition delay [s] of the fresh fuel/air mixture at (phi, temperature, pressure); inf without ignition"""
+        instrumentation.count('ignition_integrations')
+        gas = self.gas
+        gas.TP = temperature, pressure
+        gas.set_equivalence_ratio(phi, fuel, OXIDIZER)
+        # A reactor's phase is re-synchronized from the reactor on every access, so set it through one reference
+        phase = self.reactor.phase
+        phase.TPY = temperature, pressure, gas.Y
+        self.reactor.syncState()
+        self.net.initial_time = 0.0
+        self.net.reinitialize()
+
+        # Step until the temperature has levelled off after its steepest rise
+        t_previous, T_previous = 0.0, temperature
+        max_rate, delay = 0.0, np.inf
+        while t_previous < self.params.max_time:
+            t = self.net.step()
+            T = self.reactor.T
+            rate = (T - T_previous) / (t - t_previous)
+            if rate > max_rate:
+                max_rate, delay = rate, (t + t_previous) / 2
+            t_previous, T_previous = t, T
+            if T - temperature > self.params.min_temperature_rise and rate < 0.01 * max_rate:
+                break
+        return delay if T_previous - temperature > self.params.min_temperature_rise else np.inf
+
+
+@functools.lru_cache(maxsize=4)
+def _worker_reactor(params):
+    # One reactor per worker process (and per parameter set), reused for every chunk it receives
+    return IgnitionReactor(params)
+
+
+def _integrate_chunk(params, points, fuel):
+    reactor = _worker_reactor(params)
+    return [reactor.delay(phi, temperature, pressure, fuel) for phi, temperature, pressure in points]
+
+
+class IgnitionDelayCache:
+    def __init__(self, params=None, path=None):
+        """Ignition delays by (fuel, phi, T, P), loaded from `path` if it holds delays computed with the same `params`.
+
+        Args:
+            params: IgnitionParams
+            path: .npz file the cache is loaded from and saved to; None keeps it in memory only
+        """
+        self.params = params or IgnitionParams()
+        self.path = path
+        self.delays = {}  # (fuel, key of phi, T, P, see KEY_RESOLUTION) -> delay [s]
+        if path and os.path.exists(path):
+            self._load(path)
+
+    def __len__(self):
+        return len(self.delays)
+
+    def _load(self, path):
+        with np.load(path) as archive:
+            if json.loads(str(archive['params'])) != dataclasses.asdict(self.params):
+                return
+            keys = archive['keys'].tolist()
+            # Caches written before fuels were cached only hold H2 delays
+            fuels = archive['fuels'].tolist() if 'fuels' in archive.files else [blend_composition(FUEL)] * len(keys)
+            self.delays = {(fuel, *key): delay for fuel, key, delay in zip(fuels, keys, archive['delays'].tolist())}
+
+    def save(self, path=None):
+        """Write the cache; written to a temporary file first so an interrupted save keeps the old cache"""
+        path = path or self.path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        keys = np.array([key[1:] for key in self.delays], dtype=np.int64).reshape(-1, 3)
+        fuels = np.array([key[0] for key in self.delays], dtype=str)
+        temporary = path + '.tmp.npz'
+        np.savez(temporary, params=json.dumps(dataclasses.asdict(self.params)), keys=keys, fuels=fuels,
+                 delays=np.array(list(self.delays.values()), dtype=float))
+        os.replace(temporary, path)
+
+    def __call__(self, phi, temperature, pressure, workers=None, chunk_size=16, fuel=FUEL):
+        """Ignition delays [s] at the points, broadcast against each other.
+
+        Args:
+            phi, temperature, pressure: Equivalence ratio, temperature [K] and pressure [Pa] of the mixtures
+            workers: Worker processes for the points missing from the cache (None: one per CPU, 0: this process)
+            chunk_size: Points per worker task
+            fuel: Fuel of the mixtures, H2 or a blend (calculations.fuels)
+        """
+        fuel = blend_composition(fuel)
+        phi, temperature, pressure = np.broadcast_arrays(
+            *(np.asarray(value, dtype=float) for value in (phi, temperature, pressure)))
+        keys = np.rint(np.stack([phi.ravel(), temperature.ravel(), pressure.ravel()], axis=1) / KEY_RESOLUTION)
+        keys = [(fuel, *key) for key in keys.astype(np.int64).tolist()]
+
+        missing = sorted(set(keys) - set(self.delays))
+        if missing:
+            points = (np.array([key[1:] for key in missing]) * KEY_RESOLUTION).tolist()
+            chunks = [points[start:start + chunk_size] for start in range(0, len(points), chunk_size)]
+            if workers == 0 or len(chunks) <= 1:
+                results = [_integrate_chunk(self.params, chunk, fuel) for chunk in chunks]
+            else:
+                with ProcessPoolExecutor(workers) as pool:
+                    results = list(pool.map(_integrate_chunk, [self.params] * len(chunks), chunks,
+                                            [fuel] * len(chunks)))
+            self.delays.update(zip(missing, (delay for chunk in results for delay in chunk)))
+            if self.path:
+                self.save()
+        return np.array([self.delays[key] for key in keys]).reshape(phi.shape)
+
+
+_default_cache = None
+
+
+def default_cache():
+    """The cache at BURNER_IGNITION_CACHE (default data/ignition_delays.npz), loaded once per process"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = IgnitionDelayCache(path=os.environ.get('BURNER_IGNITION_CACHE') or DEFAULT_CACHE)
+    return _default_cache
+
+
+@dataclasses.dataclass
+class IgnitionResults:
+    """Ignition delays of the jet mixture at the surrounding temperatures
+
+    Attributes:
+    ----------
+    equivalence_ratio, pressure: float
+        Jet mixture and pressure [Pa] of the integrations.
+    temperatures: np.ndarray
+        Surrounding temperatures [K]; the first is the pilot flame temperature.
+    delays: np.ndarray
+        Ignition delay [s] at each temperature, inf where the mixture does not ignite.
+    """
+    equivalence_ratio: float
+    pressure: float
+    temperatures: np.ndarray
+    delays: np.ndarray
+
+    @property
+    def shortest_delay(self):
+        return float(self.delays.min())
+
+    def print_properties(self):
+        print(f"Jet mixture phi {self.equivalence_ratio:.3f} at {self.pressure:.5e} Pa")
+        for temperature, delay in zip(self.temperatures, self.delays):
+            print(f"{temperature:10.2f} K: {delay:.5e} s")
+
+
+def jet_ignition_delays(pilot_results, operating, temperatures=(), cache=None, workers=None, fuel=FUEL):
+    """Ignition delays of the `fuel` jet mixture at the pilot flame temperature and the given temperatures [K]"""
+    if cache is None:
+        cache = default_cache()
+    temperatures = np.concatenate([[pilot_results.flame_temperature], np.asarray(temperatures, dtype=float)])
+    delays = cache(operating.jet_equivalence_ratio, temperatures, operating.jet_pressure, workers=workers, fuel=fuel)
+    return IgnitionResults(
+        equivalence_ratio=operating.jet_equivalence_ratio,
+        pressure=operating.jet_pressure,
+        temperatures=temperatures,
+        delays=delays,
+    )
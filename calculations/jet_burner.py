@@ -1,13 +1,22 @@
-import cantera as ct
 import numpy as np
 from dataclasses import dataclass
 
+from calculations.fuels import HYDROGEN, OXIDIZER, AIR, blend_composition, fuel_species, main_species, flame_state, \
+    gas_properties, lower_heating_value
+from calculations.gas import DEFAULT_MECHANISM, new_solution
+from calculations.regime_map import (TURBULENCE_INTENSITY, FLAME_THICKNESS, karlovitz_number,
+                                     reference_flame_speed)
+from utils.instrumentation import instrumented
+from utils.lazy import lazy_import
+
+ct = lazy_import('cantera')
+
 
 @dataclass
 class JetBurnerProperties:
     """Storage class for central jet burner properties"""
 
-    # Unburnt mixture properties
+    # Unburnt mixture properties; the *_h2 fields refer to the fuel, H2 or a blend (calculations.fuels)
     # Mass flows
     mass_flow_total: float
     mass_flow_h2: float
@@ -44,6 +53,13 @@ class JetBurnerProperties:
     # Geometric properties
     flow_area: float
 
+    # Compressible jet model (calculations.compressible): inlet Mach number and choking; NaN and False if incompressible
+    mach_number: float = float('nan')
+    choked: bool = False
+
+    # Equilibrium product composition {species: mass fraction}; not stored in result tables
+    flame_species_mass_fracs: dict = None
+
     def print_properties(self):
         max_length = max(len(field) for field in self.__dataclass_fields__)  # type: ignore
         for field in self.__dataclass_fields__:  # type: ignore
@@ -55,12 +71,19 @@ class JetBurnerProperties:
 
 
 class JetBurner:
-    def __init__(self, geometry, operating):
+    def __init__(self, geometry, operating, turbulence_intensity=TURBULENCE_INTENSITY,
+                 flame_thickness=FLAME_THICKNESS, mechanism=DEFAULT_MECHANISM, compressible=None, fuel=HYDROGEN):
         """Initialize central jet calculations.
 
         Args:
             geometry: Geometry parameters containing jet dimensions
             operating: Operating parameters containing flow conditions
+            turbulence_intensity: u'/U used for the Karlovitz number
+            flame_thickness: Thermal flame thickness [m] used for the Karlovitz number
+            mechanism: Cantera mechanism (calculations.gas.MECHANISMS name or file)
+            compressible: calculations.compressible.CompressibleParams to treat the jet pressure and temperature as the
+                stagnation state of a compressible jet; None keeps the incompressible model
+            fuel: Fuel composition, H2 or a blend (calculations.fuels)
         """
         # Store geometry parameters
         self.pipe_ID = geometry.jet_ID  # Inner diameter of the jet pipe
@@ -72,71 +95,72 @@ class JetBurner:
         self.temperature = operating.jet_temperature
         self.velocity = operating.jet_velocity
 
+        # Turbulence and flame scales
+        self.turbulence_intensity = turbulence_intensity
+        self.flame_thickness = flame_thickness
+        self.mechanism = mechanism
+        self.compressible = compressible
+        self.fuel = blend_composition(fuel)
+
     def calculate_flows(self):
         """Calculate flow properties including standard flows"""
 
         # Initialize Cantera objects
-        gas = ct.Solution('gri30.yaml')
+        gas = new_solution(self.mechanism)
         gas.TP = self.temperature, self.pressure
-        gas.set_equivalence_ratio(self.phi, 'H2', 'O2:1.0, N2:3.76')
+        gas.set_equivalence_ratio(self.phi, self.fuel, OXIDIZER)
+        velocity, mach_number, choked = self.velocity, float('nan'), False
+        if self.compressible is not None:
+            # Static state of the expanded jet; choking may limit the velocity
+            from calculations.compressible import jet_flow
+            flow = jet_flow(self.phi, self.pressure, self.temperature, self.velocity, self.flow_area,
+                            self.compressible, self.mechanism, self.fuel)
+            gas.TP = float(flow['temperature']), float(flow['pressure'])
+            velocity, mach_number, choked = float(flow['velocity']), float(flow['mach']), bool(flow['choked'])
         mixture_density = gas.density_mass
 
-        # Store species indices for later use
-        h2_idx = gas.species_index('H2')
-        o2_idx = gas.species_index('O2')
-        n2_idx = gas.species_index('N2')
+        # Store species indices for later use; the Lewis number uses the diffusivity of the main fuel species
+        fuel_idx = [gas.species_index(name) for name in fuel_species(self.fuel)]
+        h2_idx = gas.species_index(main_species(self.fuel))
 
-        Y_h2 = gas.Y[h2_idx]
-        Y_o2 = gas.Y[o2_idx]
-        Y_n2 = gas.Y[n2_idx]
+        Y_h2 = gas.Y[fuel_idx].sum()
 
         # Calculate mass flows
-        mass_flow_total = self.velocity * self.flow_area * mixture_density
+        mass_flow_total = velocity * self.flow_area * mixture_density
         mass_flow_h2 = mass_flow_total * Y_h2
-        mass_flow_air = mass_flow_total * (Y_o2 + Y_n2)
+        mass_flow_air = mass_flow_total * (1.0 - Y_h2)
 
         # Calculate Real volumetric flow
         vol_flow_real_total = mass_flow_total / mixture_density
 
-        # Calculate Real densities at operating conditions
-        gas_h2 = ct.Solution('gri30.yaml')
-        gas_h2.TPX = self.temperature, self.pressure, 'H2:1.0'
-        rho_h2 = gas_h2.density_mass
-
-        gas_air = ct.Solution('gri30.yaml')
-        gas_air.TPX = self.temperature, self.pressure, 'O2:0.21, N2:0.79'
-        rho_air = gas_air.density_mass
+        # Calculate Real densities at operating conditions (cached per composition and state)
+        rho_h2 = gas_properties(self.fuel, self.temperature, self.pressure, self.mechanism)['density']
+        rho_air = gas_properties(AIR, self.temperature, self.pressure, self.mechanism)['density']
 
         # Calculate Standard volumetric flows at 15°C and 1 atm
-        gas_std_air = ct.Solution('gri30.yaml')
-        gas_std_air.TPX = 273.15 + 0, ct.one_atm, 'O2:0.21, N2:0.79'
-        std_density_air = gas_std_air.density_mass
-
-        gas_std_h2 = ct.Solution('gri30.yaml')
-        gas_std_h2.TPX = 273.15 + 0, ct.one_atm, 'H2:1.0'
-        std_density_h2 = gas_std_h2.density_mass
+        std_density_air = gas_properties(AIR, 273.15 + 0, ct.one_atm, self.mechanism)['density']
+        std_density_h2 = gas_properties(self.fuel, 273.15 + 0, ct.one_atm, self.mechanism)['density']
 
         vol_flow_std_h2 = mass_flow_h2 / std_density_h2
         vol_flow_std_air = mass_flow_air / std_density_air
         vol_flow_std_total = vol_flow_std_h2 + vol_flow_std_air
 
         # Dimensionless numbers
-        reynolds_number = self.velocity * self.pipe_ID * mixture_density / gas.viscosity
+        reynolds_number = velocity * self.pipe_ID * mixture_density / gas.viscosity
 
         thermal_diff = (gas.thermal_conductivity / (mixture_density * gas.cp_mass))
         mass_diff = gas.mix_diff_coeffs[h2_idx]
         lewis_number = thermal_diff / mass_diff
 
         # Karlovitz number
-        u_prime = 0.1 * self.velocity  # Assuming 10% turbulence intensity
-        l_0 = self.pipe_ID # Integral length scale
-        l_f = 0.5e-3  # Thermal thickness (approximate)
+        u_prime = self.turbulence_intensity * velocity
+        l_0 = self.pipe_ID  # Integral length scale
+        l_f = self.flame_thickness  # Thermal thickness
 
-        # Estimate laminar flame speed
-        sl_1atm = 0.24  # m/s at 1 atm reference
-        sl = sl_1atm * (self.pressure / ct.one_atm) ** (-0.5)  # Pressure scaling
+        # Estimate laminar flame speed (1 atm reference with pressure scaling)
+        sl = float(reference_flame_speed(self.pressure))
 
-        karlovitz_number = (u_prime / sl) ** (3 / 2) * (l_f / l_0) ** (1 / 2)
+        karlovitz = karlovitz_number(u_prime, sl, l_f, l_0)
 
         return {
             'flow_area': self.flow_area,
@@ -152,36 +176,40 @@ class JetBurner:
             'vol_flow_std_air': vol_flow_std_air,
             'reynolds_number': reynolds_number,
             'lewis_number': lewis_number,
-            'karlovitz_number': karlovitz_number,
+            'karlovitz_number': karlovitz,
+            'mach_number': mach_number,
+            'choked': choked,
 
         }
 
     def calculate_flame_properties(self, mass_flow_h2):
-        # Initialize Cantera objects
-        flame = ct.Solution('gri30.yaml')
-        flame.TP = self.temperature, self.pressure
-        flame.set_equivalence_ratio(self.phi, 'H2', 'O2:1.0, N2:3.76')
-
-        # Calculate equilibrium
-        flame.equilibrate('HP')
-
-        flame_density = flame.density_mass
-        flame_temperature = flame.T
-        flame_enthalpy_mass = flame.enthalpy_mass
-        flame_enthalpy_mole = flame.enthalpy_mole
+        # Equilibrium flame, shared by all cases with the same blend and inlet state
+        flame = flame_state(self.fuel, self.phi, self.temperature, self.pressure, mechanism=self.mechanism)
 
         # Calculate power output
-        LHV_H2 = 120.1e6  # Lower heating value of H2 [J/kg]
-        flame_power = mass_flow_h2 * LHV_H2
+        flame_power = mass_flow_h2 * lower_heating_value(self.fuel, self.mechanism)
 
         return {
-            'flame_density': flame_density,
-            'flame_temperature': flame_temperature,
-            'flame_enthalpy_mass': flame_enthalpy_mass,
-            'flame_enthalpy_mole': flame_enthalpy_mole,
+            'flame_density': flame['density'],
+            'flame_temperature': flame['temperature'],
+            'flame_enthalpy_mass': flame['enthalpy_mass'],
+            'flame_enthalpy_mole': flame['enthalpy_mole'],
             'flame_power': flame_power,
+            'flame_species_mass_fracs': flame['mass_fractions'],
         }
 
+    def radial_profile(self, params=None):
+        """Radially resolved jet pipe flow of the incompressible model (calculations.radial_profiles.RadialProfiles
+        with one case)
+
+        Args:
+            params: calculations.radial_profiles.ProfileParams (default: laminar or turbulent by Reynolds number)
+        """
+        from calculations.radial_profiles import jet_profiles
+        return jet_profiles(self.pipe_ID, self.phi, self.pressure, self.temperature, self.velocity, params,
+                            fuel=self.fuel, mechanism=self.mechanism)
+
+    @instrumented('jet_burner')
     def get_jet_burner_properties(self):
         flows = self.calculate_flows()
         flame_properties = self.calculate_flame_properties(mass_flow_h2=flows['mass_flow_h2'])
@@ -1,9 +1,15 @@
-import cantera as ct
 from dataclasses import dataclass
 
+import numpy as np
+
 from calculations.jet_burner import JetBurner as jb
 from calculations.pilot_burner import PilotBurner as pb
 from calculations.n2_co_flow import CoFlow as cf
+from calculations.fuels import HYDROGEN
+from calculations.gas import DEFAULT_MECHANISM
+from calculations.stream_mixing import mass_fraction_array, mix_streams
+from calculations.thermo import get_thermo
+from utils.instrumentation import instrumented
 
 
 @dataclass
@@ -33,62 +39,54 @@ class MixingResults:
 
 class MixedTemperature:
 
-    def __init__(self, geometry, operating):
+    def __init__(self, geometry, operating, mechanism=DEFAULT_MECHANISM, fuel=HYDROGEN):
         self.geom = geometry
         self.op = operating
-
-        self.jet = jb(geometry, operating)
-        self.pilot = pb(geometry, operating)
-        self.coflow = cf(geometry, operating)
-
-    def calculate_mixed_temperature(self, geometry_config):
-        """Calculate mixed temperature and enthalpy"""
-        jet_results = self.jet.get_jet_burner_properties()
-        pilot_results = self.pilot.get_pilot_burner_properties(geometry_config)
-        coflow_results = self.coflow.calculate_flows()
-
-        # Get mass flows
-        jet_mass_flow = jet_results.mass_flow_total
-        pilot_mass_flow = pilot_results.mass_flow_total
-        coflow_mass_flow = coflow_results.mass_flow
-        total_mass_flow = jet_mass_flow + pilot_mass_flow + coflow_mass_flow
-
-        # Get enthalpies
-        jet_h = jet_results.flame_enthalpy_mass
-        pilot_h = pilot_results.flame_enthalpy_mass
-        coflow_h = coflow_results.enthalpy
-
-        # Mass fractions for the mixed state
-        Y_jet = jet_mass_flow / total_mass_flow
-        Y_pilot = pilot_mass_flow / total_mass_flow
-        Y_coflow = coflow_mass_flow / total_mass_flow
-
-        # Mass weighted mixing of enthalpies
-        h_mix = Y_jet * jet_h + Y_pilot * pilot_h + Y_coflow * coflow_h
-
-        # Set mixture state with corrected N2 coflow
-        mix = ct.Solution('gri30.yaml')
-
-        mix.HPY = h_mix, self.op.jet_pressure, {
-            'H2': 0.0,  # Fully reacted
-            'O2': 0.21 * (Y_jet + Y_pilot),  # From jet and pilot
-            'N2': Y_jet * 0.79 + Y_pilot * 0.79 + Y_coflow * 1.0,  # Include pure N2 coflow
-            'H2O': (Y_jet + Y_pilot) * 0.21  # Combustion products
-        }
+        self.mechanism = mechanism
+
+        self.jet = jb(geometry, operating, mechanism=mechanism, fuel=fuel)
+        self.pilot = pb(geometry, operating, mechanism=mechanism, fuel=fuel)
+        self.coflow = cf(geometry, operating, mechanism=mechanism)
+
+    @instrumented('mixing')
+    def calculate_mixed_temperature(self, geometry_config, jet_results=None, pilot_results=None,
+                                    coflow_results=None):
+        """Mix the jet and pilot flame products with the N2 co-flow
+
+        Mass, species and enthalpy of the three streams are conserved (calculations.stream_mixing); the mixed stream
+        leaves through the co-flow outer diameter at the jet pressure. Stream results that were already calculated
+        for the same geometry and operating point can be passed in to avoid recomputing them; they must carry their
+        flame compositions, as returned by the calculators.
+        """
+        jet_results = jet_results or self.jet.get_jet_burner_properties()
+        pilot_results = pilot_results or self.pilot.get_pilot_burner_properties(geometry_config)
+        coflow_results = coflow_results or self.coflow.calculate_flows()
+        if jet_results.flame_species_mass_fracs is None or pilot_results.flame_species_mass_fracs is None:
+            raise ValueError('Mixing needs the flame compositions of the jet and pilot results')
+
+        # Jet and pilot equilibrium products, pure N2 co-flow
+        compositions = [jet_results.flame_species_mass_fracs, pilot_results.flame_species_mass_fracs, {'N2': 1.0}]
+        thermo = get_thermo(mechanism=self.mechanism)
+        mass_flows = np.array([jet_results.mass_flow_total, pilot_results.mass_flow_total, coflow_results.mass_flow])
+        enthalpies = np.array([jet_results.flame_enthalpy_mass, pilot_results.flame_enthalpy_mass,
+                               coflow_results.enthalpy])
+        mix = mix_streams(mass_flows, enthalpies, mass_fraction_array(compositions, thermo.species_names),
+                          self.op.jet_pressure, thermo, area=np.pi / 4 * self.geom.coflow_OD ** 2,
+                          T0=jet_results.flame_temperature)
 
         return MixingResults(
-            jet_mass_flow=jet_mass_flow,
-            pilot_mass_flow=pilot_mass_flow,
-            coflow_mass_flow=coflow_mass_flow,
-            total_mass_flow=total_mass_flow,
-            mixed_temp=mix.T,
-            mixed_enthalpy=mix.h,
-            mixed_cp=mix.cp,
-            species_mass_fracs=None,
-            mixed_velocity=None
+            jet_mass_flow=jet_results.mass_flow_total,
+            pilot_mass_flow=pilot_results.mass_flow_total,
+            coflow_mass_flow=coflow_results.mass_flow,
+            total_mass_flow=float(mix['mass_flow']),
+            mixed_temp=float(mix['temperature']),
+            mixed_enthalpy=float(mix['enthalpy']),
+            mixed_cp=float(mix['cp']),
+            species_mass_fracs={name: y for name, y in zip(thermo.species_names, mix['mass_fractions'].tolist())
+                                if y > 0},
+            mixed_velocity=float(mix['velocity'])
         )
 
-
 if __name__ == '__main__':
     from input_parameters import parameters
 
@@ -1,6 +1,12 @@
 from dataclasses import dataclass
 import numpy as np
-import cantera as ct
+
+from calculations.fuels import gas_properties
+from calculations.gas import DEFAULT_MECHANISM
+from utils.instrumentation import instrumented
+from utils.lazy import lazy_import
+
+ct = lazy_import('cantera')
 
 
 @dataclass
@@ -40,9 +46,10 @@ class CoFlowResults:
 class CoFlow:
     """N2 co-flow calculator"""
 
-    def __init__(self, geometry, operating):
+    def __init__(self, geometry, operating, mechanism=DEFAULT_MECHANISM):
         self.geom = geometry
         self.op = operating
+        self.mechanism = mechanism
 
         # Store geometry parameters
         self.coflow_ID = self.geom.coflow_ID
@@ -53,36 +60,35 @@ class CoFlow:
         self.temperature = self.op.coflow_temperature
         self.inlet_velocity = self.op.coflow_velocity
 
+    @instrumented('coflow')
     def calculate_flows(self):
         """Calculate N2 co-flow properties"""
-        # Initialize N2 gas phase
-        N2 = ct.Solution('gri30.yaml')
-        N2.TPX = self.temperature, self.pressure, 'N2:1.0'
+        # N2 properties, cached per state
+        N2 = gas_properties('N2:1.0', self.temperature, self.pressure, self.mechanism)
 
         # Calculate areas
         inlet_area = np.pi / 4 * (self.coflow_OD ** 2 - self.coflow_ID ** 2)
 
         # Calculate mass flow
-        mass_flow = self.inlet_velocity * inlet_area * N2.density
+        mass_flow = self.inlet_velocity * inlet_area * N2['density']
 
         # Calculate volume flow
-        volume_flow = mass_flow / N2.density
+        volume_flow = mass_flow / N2['density']
 
         # Standard conditions (1 atm, 273.15 K)
-        N2_std = ct.Solution('gri30.yaml')
-        N2_std.TPX = 273.15 + 0, ct.one_atm, 'N2:1.0'
+        N2_std = gas_properties('N2:1.0', 273.15 + 0, ct.one_atm, self.mechanism)
 
         # Standard volume flow
-        std_volume_flow = mass_flow / N2_std.density
+        std_volume_flow = mass_flow / N2_std['density']
 
         # Calculate Reynolds number
-        Re = self.inlet_velocity * (self.coflow_OD - self.coflow_ID) * N2.density / N2.viscosity
+        Re = self.inlet_velocity * (self.coflow_OD - self.coflow_ID) * N2['density'] / N2['viscosity']
 
         # Calculate enthalpy
-        enthalpy = N2.enthalpy_mass
+        enthalpy = N2['enthalpy_mass']
 
         # Calculate dynamic viscosity
-        dynamic_viscosity = N2.viscosity
+        dynamic_viscosity = N2['viscosity']
 
         return CoFlowResults(
             mass_flow=mass_flow,
@@ -90,10 +96,20 @@ class CoFlow:
             std_volume_flow=std_volume_flow,
             Re=Re,
             enthalpy=enthalpy,
-            density=N2.density,
+            density=N2['density'],
             dynamic_viscosity=dynamic_viscosity
         )
 
+    def radial_profile(self, params=None):
+        """Radially resolved co-flow (calculations.radial_profiles.RadialProfiles with one case)
+
+        Args:
+            params: calculations.radial_profiles.ProfileParams (default: laminar or turbulent by Reynolds number)
+        """
+        from calculations.radial_profiles import coflow_profiles
+        return coflow_profiles(self.coflow_ID, self.coflow_OD, self.pressure, self.temperature, self.inlet_velocity,
+                               params, mechanism=self.mechanism)
+
     def get_co_flow_properties(self):
         """Get N2 co-flow results"""
         flow_results = self.calculate_flows()
@@ -1,15 +1,21 @@
-import cantera as ct
 import numpy as np
 from dataclasses import dataclass
 from geometry.plate_generator import plate_generator
 from geometry.honeycomb_generator import honeycomb_generator
+from calculations.fuels import HYDROGEN, OXIDIZER, AIR, blend_composition, flame_state, gas_properties, \
+    lower_heating_value, stoich_air_fuel_ratio
+from calculations.gas import DEFAULT_MECHANISM, new_solution
+from utils.instrumentation import instrumented
+from utils.lazy import lazy_import
+
+ct = lazy_import('cantera')
 
 
 @dataclass
 class PilotBurnerProperties:
     """Storage class for central jet burner properties"""
 
-    # Unburnt mixture properties
+    # Unburnt mixture properties; the *_h2 fields refer to the fuel, H2 or a blend (calculations.fuels)
     # Mass flows
     mass_flow_total: float
     mass_flow_h2: float
@@ -52,6 +58,9 @@ class PilotBurnerProperties:
     flow_area_air: float
     flow_area_fuel: float
 
+    # Equilibrium product composition {species: mass fraction}; not stored in result tables
+    flame_species_mass_fracs: dict = None
+
     def print_properties(self):
         max_length = max(len(field) for field in self.__dataclass_fields__)  # type: ignore
         for field in self.__dataclass_fields__:  # type: ignore
@@ -63,7 +72,11 @@ class PilotBurnerProperties:
 
 
 class PilotBurner:
-    def __init__(self, geometry, operating):
+    def __init__(self, geometry, operating, mechanism=DEFAULT_MECHANISM, fuel=HYDROGEN):
+        self.geometry = geometry
+        self.mechanism = mechanism
+        self.fuel = blend_composition(fuel)
+
         # Store geometry parameters
         self.pilot_fuel_ID = geometry.pilot_fuel_ID
         self.pilot_fuel_OD = geometry.pilot_fuel_OD
@@ -83,45 +96,39 @@ class PilotBurner:
 
     def calculate_mass_flows(self):
         """Calculate mass flows of the pilot burner"""
-        # Initialize gas phases
-        air = ct.Solution('gri30.yaml')
-        air.TPX = self.pilot_temperature, self.pilot_pressure, 'O2:0.21, N2:0.79'
-
-        h2 = ct.Solution('gri30.yaml')
-        h2.TPX = self.pilot_temperature, self.pilot_pressure, 'H2:1.0'
+        # Fuel and air properties (cached per composition and state)
+        air = gas_properties(AIR, self.pilot_temperature, self.pilot_pressure, self.mechanism)
+        h2 = gas_properties(self.fuel, self.pilot_temperature, self.pilot_pressure, self.mechanism)
 
         # Calculate mass flows
-        mass_flow_air = self.pilot_air_velocity * self.air_hole_area * air.density
-        mass_flow_h2 = self.pilot_fuel_velocity * self.fuel_hole_area * h2.density
+        mass_flow_air = self.pilot_air_velocity * self.air_hole_area * air['density']
+        mass_flow_h2 = self.pilot_fuel_velocity * self.fuel_hole_area * h2['density']
         mass_flow_total = mass_flow_air + mass_flow_h2
 
         # Real volume flows
-        air_volume_flow = mass_flow_air / air.density
-        fuel_volume_flow = mass_flow_h2 / h2.density
+        air_volume_flow = mass_flow_air / air['density']
+        fuel_volume_flow = mass_flow_h2 / h2['density']
         vol_flow_real_total = air_volume_flow + fuel_volume_flow
 
         # Standard conditions (1 atm, 273.15 K)
-        air_std = ct.Solution('gri30.yaml')
-        air_std.TPX = 273.15 + 0, ct.one_atm, 'O2:0.21, N2:0.79'
-
-        h2_std = ct.Solution('gri30.yaml')
-        h2_std.TPX = 273.15 + 0, ct.one_atm, 'H2:1.0'
+        air_std = gas_properties(AIR, 273.15 + 0, ct.one_atm, self.mechanism)
+        h2_std = gas_properties(self.fuel, 273.15 + 0, ct.one_atm, self.mechanism)
 
         # Standard volume flows
-        vol_flow_std_air = mass_flow_air / air_std.density
-        vol_flow_std_h2 = mass_flow_h2 / h2_std.density
+        vol_flow_std_air = mass_flow_air / air_std['density']
+        vol_flow_std_h2 = mass_flow_h2 / h2_std['density']
         vol_flow_std_total = vol_flow_std_air + vol_flow_std_h2
 
         # Dimensionless numbers
-        reynolds_h2 = self.pilot_fuel_velocity * self.pilot_fuel_ID * h2.density / h2.viscosity
-        reynolds_air = self.pilot_air_velocity * self.air_hole_area * air.density / air.viscosity
+        reynolds_h2 = self.pilot_fuel_velocity * self.pilot_fuel_ID * h2['density'] / h2['viscosity']
+        reynolds_air = self.pilot_air_velocity * self.air_hole_area * air['density'] / air['viscosity']
 
         # Mixed flow properties
-        gas_mix = ct.Solution('gri30.yaml')
-        gas_mix.TPX = self.pilot_temperature, self.pilot_pressure, 'H2:1.0, O2:1.0, N2:3.76'
-        stoich_ratio = gas_mix.stoich_air_fuel_ratio('H2:1.0', 'O2:1.0, N2:3.76', basis='mass')
+        gas_mix = new_solution(self.mechanism)
+        gas_mix.TP = self.pilot_temperature, self.pilot_pressure
+        stoich_ratio = stoich_air_fuel_ratio(self.fuel, OXIDIZER, self.mechanism)
         phi = stoich_ratio / (mass_flow_air / mass_flow_h2)
-        gas_mix.set_equivalence_ratio(phi, 'H2', 'O2:1.0, N2:3.76')
+        gas_mix.set_equivalence_ratio(phi, self.fuel, OXIDIZER)
 
         rho_mix = gas_mix.density_mass
         mixed_velocity = mass_flow_total / self.hencken_area / rho_mix
@@ -131,8 +138,8 @@ class PilotBurner:
         return {
             'flow_area_air': self.air_hole_area,
             'flow_area_fuel': self.fuel_hole_area,
-            'rho_h2': h2.density,
-            'rho_air': air.density,
+            'rho_h2': h2['density'],
+            'rho_air': air['density'],
             'mass_flow_total': mass_flow_total,
             'mass_flow_h2': mass_flow_h2,
             'mass_flow_air': mass_flow_air,
@@ -151,49 +158,35 @@ class PilotBurner:
     def calculate_flame_properties(self, mass_flow_h2, mass_flow_air):
         """Calculate flame properties including temperature and power output from the mass flows."""
 
-        # Initialize Cantera objects
-        gas = ct.Solution('gri30.yaml')
-        # Calculate stoichiometric fuel-to-air ratio
-        #gas.set_equivalence_ratio(1.0, 'H2', 'O2:1.0, N2:3.76')
-        stoich_ratio = gas.stoich_air_fuel_ratio('H2:1.0', 'O2:1.0, N2:3.76', basis='mass')
+        stoich_ratio = stoich_air_fuel_ratio(self.fuel, OXIDIZER, self.mechanism)
 
         # Calculate equivalence ratio
         phi = stoich_ratio / (mass_flow_air / mass_flow_h2)
 
-        # Set up flame mixture with calculated equivalence ratio
-        flame = ct.Solution('gri30.yaml')
-        flame.set_equivalence_ratio(phi, 'H2', 'O2:1.0, N2:3.76')
-        flame.TP = self.pilot_temperature, self.pilot_pressure
-
-        # Calculate equilibrium
-        flame.equilibrate('HP')
-
-        # Get flame properties
-        flame_density = flame.density
-        flame_temperature = flame.T
-        flame_enthalpy_mass = flame.enthalpy_mass
-        flame_enthalpy_mole = flame.enthalpy_mole
+        # Equilibrium flame, shared by all cases with the same blend and mixture
+        flame = flame_state(self.fuel, phi, self.pilot_temperature, self.pilot_pressure, mechanism=self.mechanism)
 
-        LHV_H2 = 120.1e6  # Lower heating value of H2 [J/kg]
-        flame_power = mass_flow_h2 * LHV_H2
+        flame_power = mass_flow_h2 * lower_heating_value(self.fuel, self.mechanism)
 
         return {
-            'flame_density': flame_density,
-            'flame_temperature': flame_temperature,
-            'flame_enthalpy_mass': flame_enthalpy_mass,
-            'flame_enthalpy_mole': flame_enthalpy_mole,
+            'flame_density': flame['density'],
+            'flame_temperature': flame['temperature'],
+            'flame_enthalpy_mass': flame['enthalpy_mass'],
+            'flame_enthalpy_mole': flame['enthalpy_mole'],
             'flame_power': flame_power,
             'OF_ratio': mass_flow_air / mass_flow_h2,
-            'equivalence_ratio': phi
+            'equivalence_ratio': phi,
+            'flame_species_mass_fracs': flame['mass_fractions'],
         }
 
+    @instrumented('pilot_burner')
     def get_pilot_burner_properties(self, geometry_config):
         if geometry_config == 'Honeycomb':
-            stats = honeycomb_generator(generate_dxf=False)
-            print("Honeycomb Generator Output:", stats)
+            stats = honeycomb_generator(generate_dxf=False, params=self.geometry)
         elif geometry_config == 'Plate':
-            stats = plate_generator(generate_dxf=False)
-            print("Plate Generator Output:", stats)
+            stats = plate_generator(generate_dxf=False, params=self.geometry)
+        else:
+            raise ValueError(f"Unknown geometry config '{geometry_config}'")
 
         self.air_hole_number = stats['air_hole_number']
         self.air_hole_area = stats['air_hole_area']
@@ -0,0 +1,289 @@
+"""Supply pressure drops of the pilot plate, the pilot fuel tubes and the co-flow straightener.
+
+* Pilot air: every air hole of the plate (or honeycomb cell) passes its share of the air from one common plenum.
+  Holes shorter than REATTACHMENT_LENGTH hydraulic diameters are thin orifices (dp = rho V^2 / (2 Cd^2)); longer
+  ones are short tubes whose jet reattaches: entrance loss, wall friction over the passage and the exit dynamic head.
+  The plenum drop is the one at which the holes in parallel pass the PilotBurner air flow, so holes with more friction
+  pass less air (see `air_velocity_min/max`).
+* Pilot fuel: the same short-tube law for the fuel tubes of inner diameter pilot_fuel_ID and length fuel_tube_length.
+* Co-flow: the honeycomb flow straightener of the co-flow annulus, with the loss coefficient of Barlow, Rae & Pope
+  (Low-speed wind tunnel testing) based on the approach velocity.
+
+Gases are incompressible at the pilot / co-flow pressure, so the drops hold while they stay small against it. All
+functions broadcast over sweep cases and holes; per-hole geometry comes from `pilot_holes` (one geometry) or
+`stack_holes` (one per case, padded with NaN), without it every hole of a stream has the diameter of the tube:
+
+    drops = batch_pressure_drops(parameters, holes=pilot_holes('Honeycomb', geometry))
+    drops['air_supply_pressure'], drops['fuel_supply_pressure'], drops['coflow_supply_pressure']
+"""
+import dataclasses
+import math
+
+import numpy as np
+
+from calculations.fuels import HYDROGEN, blend_composition
+from calculations.gas import DEFAULT_MECHANISM
+
+REATTACHMENT_LENGTH = 2.0  # Passage length / hydraulic diameter above which the vena contracta reattaches
+DIAMETER_DECIMALS = 12  # Hydraulic diameters [m] equal to this many decimals count as the same hole
+
+
+@dataclasses.dataclass(frozen=True)
+class PressureDropParams:
+    """Loss model of the supply passages
+
+    Attributes:
+    ----------
+    plate_thickness: float
+        Length of the air passages through the pilot plate or honeycomb [m].
+    fuel_tube_length: float
+        Length of the pilot fuel tubes [m].
+    orifice_discharge_coefficient: float
+        Discharge coefficient of thin (sharp-edged) orifices.
+    entrance_loss: float
+        Entrance loss coefficient of short tubes (sharp-edged inlet).
+    straightener_cell_size: float
+        Hydraulic diameter of the co-flow honeycomb cells [m].
+    straightener_length: float
+        Flow length of the co-flow honeycomb [m].
+    straightener_porosity: float
+        Open area fraction of the co-flow honeycomb.
+    straightener_roughness: float
+        Wall roughness of the co-flow honeycomb cells [m].
+    tol: float
+        Relative tolerance of the plenum pressure drop iterations.
+    max_iter: int
+        Iteration limit of the plenum pressure drop iterations.
+    """
+    plate_thickness: float = 5.0e-3
+    fuel_tube_length: float = 50.0e-3
+    orifice_discharge_coefficient: float = 0.61
+    entrance_loss: float = 0.5
+    straightener_cell_size: float = 3.2e-3
+    straightener_length: float = 25.0e-3
+    straightener_porosity: float = 0.9
+    straightener_roughness: float = 1.0e-5
+    tol: float = 1e-8
+    max_iter: int = 50
+
+
+def _perimeters(xy, offsets):
+    # Length of every closed outline of stacked ring coordinates (see geometry.hole_arrays)
+    if len(offsets) < 2:
+        return np.empty(0)
+    segments = np.append(np.hypot(*np.diff(xy, axis=0).T), 0.0)
+    segments[offsets[1:-1] - 1] = 0.0  # Jumps from one outline to the next
+    return np.add.reduceat(segments, offsets[:-1])
+
+
+def pilot_holes(geometry_config, geometry=None, fuel_pattern=None):
+    """Flow areas [m^2] and hydraulic diameters [m] of every pilot air and fuel hole.
+
+    Returns {'air_areas', 'air_diameters', 'fuel_areas', 'fuel_diameters'}. Honeycomb cells holding a fuel tube or the
+    central jet keep the annulus around it, with the tube wall added to the wetted perimeter.
+    """
+    from geometry.hole_arrays import hole_arrays
+    from geometry.lattice import flow_areas
+    from input_parameters.parameters import GeometryParams
+
+    geometry = geometry or GeometryParams()
+    arrays = hole_arrays(geometry_config, geometry, fuel_pattern)
+    air_areas, fuel_areas = flow_areas(geometry_config, arrays, geometry)
+
+    # A single inserted circle of the removed area adds its circumference
+    removed = np.maximum(arrays['air_areas'] - air_areas, 0.0)
+    air_perimeters = _perimeters(arrays['air_xy'], arrays['air_offsets']) + 2.0 * np.sqrt(math.pi * removed)
+    if geometry_config == 'Honeycomb':
+        fuel_diameters = np.full(len(fuel_areas), geometry.pilot_fuel_ID)
+    else:
+        fuel_diameters = 4.0 * fuel_areas / _perimeters(arrays['fuel_xy'], arrays['fuel_offsets'])
+
+    open_air = air_areas > 0
+    return {
+        'air_areas': air_areas[open_air],
+        'air_diameters': 4.0 * air_areas[open_air] / air_perimeters[open_air],
+        'fuel_areas': fuel_areas,
+        'fuel_diameters': fuel_diameters,
+    }
+
+
+def stack_holes(hole_sets):
+    """Stack the `pilot_holes` of several cases into (cases, holes) arrays, padding missing holes with NaN"""
+    stacked = {}
+    for name in ('air_areas', 'air_diameters', 'fuel_areas', 'fuel_diameters'):
+        width = max(len(holes[name]) for holes in hole_sets)
+        stacked[name] = np.full((len(hole_sets), width), np.nan)
+        for row, holes in zip(stacked[name], hole_sets):
+            row[:len(holes[name])] = holes[name]
+    return stacked
+
+
+def friction_factor(reynolds):
+    """Darcy friction factor of smooth passages (Churchill), continuous from 64/Re through transition to turbulent.
+
+    Continuity keeps the plenum iterations from cycling around the transition.
+    """
+    reynolds = np.maximum(reynolds, 1e-12)
+    a = (2.457 * np.log(1.0 / ((7.0 / reynolds) ** 0.9))) ** 16
+    b = (37530.0 / reynolds) ** 16
+    return 8.0 * ((8.0 / reynolds) ** 12 + (a + b) ** -1.5) ** (1.0 / 12.0)
+
+
+def loss_coefficient(length, diameter, reynolds, params=None):
+    """Loss coefficient K (dp = K rho V^2 / 2 with V the velocity in the passage) of orifices and short tubes"""
+    params = params or PressureDropParams()
+    ratio = length / diameter
+    tube = params.entrance_loss + friction_factor(reynolds) * ratio + 1.0
+    return np.where(ratio < REATTACHMENT_LENGTH, 1.0 / params.orifice_discharge_coefficient ** 2, tube)
+
+
+def parallel_holes(mass_flow, areas, diameters, length, density, viscosity, params=None):
+    """Common pressure drop of holes in parallel fed from one plenum.
+
+    Args:
+        mass_flow, density, viscosity: Total mass flow [kg/s] and gas properties per case, shape (cases,)
+        areas, diameters: Flow areas [m^2] and hydraulic diameters [m] of the holes, (holes,) or (cases, holes);
+            NaN entries are holes a case does not have
+        length: Passage length [m]
+        params: PressureDropParams
+
+    Returns (pressure drop [Pa] per case, hole velocities [m/s] of shape (cases, holes), NaN for missing holes).
+    """
+    params = params or PressureDropParams()
+    mass_flow, density, viscosity = (np.asarray(value, dtype=float)[..., None] for value in
+                                     (mass_flow, density, viscosity))
+    areas = np.nan_to_num(np.asarray(areas, dtype=float))
+    diameters = np.asarray(diameters, dtype=float)
+    inverse = None
+    if diameters.ndim == 1:
+        # Holes shared by all cases: equal holes carry equal velocities, so iterate once per distinct diameter
+        diameters, inverse = np.unique(np.round(diameters, DIAMETER_DECIMALS), return_inverse=True)
+        areas = np.bincount(inverse, weights=areas, minlength=len(diameters))
+
+    # Start from a uniform velocity, then update the Reynolds numbers of the holes until the drop settles
+    velocity = np.broadcast_to(mass_flow / (density * areas.sum(axis=-1, keepdims=True)),
+                               np.broadcast_shapes(mass_flow.shape, diameters.shape))
+    pressure_drop = np.zeros(mass_flow.shape)
+    for _ in range(params.max_iter):
+        K = loss_coefficient(length, diameters, density * velocity * diameters / viscosity, params)
+        conductance = np.nansum(areas * np.sqrt(2.0 * density / K), axis=-1, keepdims=True)
+        previous, pressure_drop = pressure_drop, (mass_flow / conductance) ** 2
+        velocity = np.sqrt(2.0 * pressure_drop / (density * K))
+        if np.all(np.abs(pressure_drop - previous) <= params.tol * pressure_drop):
+            break
+    if inverse is not None:
+        return pressure_drop[..., 0], velocity[..., inverse]
+    return pressure_drop[..., 0], np.where(np.isnan(diameters), np.nan, velocity)
+
+
+def straightener_loss(velocity, density, viscosity, params=None):
+    """Loss coefficient of the co-flow honeycomb on the approach velocity (Barlow, Rae & Pope)"""
+    params = params or PressureDropParams()
+    porosity, cell = params.straightener_porosity, params.straightener_cell_size
+    roughness_reynolds = np.maximum(density * velocity * params.straightener_roughness / viscosity, 1e-12)
+    relative_roughness = (params.straightener_roughness / cell) ** 0.4
+    friction = np.where(roughness_reynolds <= 275.0, 0.375 * relative_roughness * roughness_reynolds ** -0.1,
+                        0.214 * relative_roughness)
+    return friction * (params.straightener_length / cell + 3.0) / porosity ** 2 + (1.0 / porosity - 1.0) ** 2
+
+
+@dataclasses.dataclass
+class PressureDropResults:
+    """Pressure drops of the pilot and co-flow supplies
+
+    Attributes:
+    ----------
+    air_pressure_drop, fuel_pressure_drop, coflow_pressure_drop: float
+        Drop from the supply plenum to the burner exit [Pa].
+    air_supply_pressure, fuel_supply_pressure, coflow_supply_pressure: float
+        Plenum pressure the supply has to deliver [Pa].
+    air_velocity_min, air_velocity_max: float
+        Slowest and fastest pilot air hole [m/s].
+    fuel_reynolds_number: float
+        Reynolds number of the fuel tube flow.
+    """
+    air_pressure_drop: float
+    fuel_pressure_drop: float
+    coflow_pressure_drop: float
+    air_supply_pressure: float
+    fuel_supply_pressure: float
+    coflow_supply_pressure: float
+    air_velocity_min: float
+    air_velocity_max: float
+    fuel_reynolds_number: float
+
+    def print_properties(self):
+        max_length = max(len(field) for field in self.__dataclass_fields__)  # type: ignore
+        for field in self.__dataclass_fields__:  # type: ignore
+            print(f"{field:{max_length}}: {getattr(self, field):.5e}")
+
+
+def batch_pressure_drops(parameters, holes=None, params=None, bounds=None, fuel=HYDROGEN, mechanism=DEFAULT_MECHANISM):
+    """Pressure drops for a batch of parameters (calculations.vectorized), as {PressureDropResults field: array}.
+
+    Args:
+        parameters: Batch inputs, see calculations.vectorized.nominal_parameters; 'pilot_air_ID' defaults to the
+            GeometryParams value
+        holes: Per-hole geometry from `pilot_holes` or `stack_holes`; None treats every hole of a stream as a tube of
+            diameter pilot_air_ID / pilot_fuel_ID
+        params: PressureDropParams
+        bounds: Property table bounds (calculations.vectorized.table_bounds)
+        fuel: Fuel composition, H2 or a blend (calculations.fuels)
+        mechanism: Kinetic mechanism of the gas properties (calculations.gas.MECHANISMS)
+    """
+    from calculations.property_tables import bounds_of, gas_transport_table, merge_bounds, table_axis
+    from calculations.vectorized import AIR, NITROGEN, _broadcast, gas_density
+    from input_parameters.parameters import GeometryParams
+
+    params = params or PressureDropParams()
+    fuel = blend_composition(fuel)
+    (air_area, fuel_area, air_ID, fuel_ID, pressure, temperature, air_velocity, fuel_velocity, coflow_pressure,
+     coflow_temperature, coflow_velocity) = _broadcast(
+        parameters['air_hole_area'], parameters['fuel_hole_area'],
+        parameters.get('pilot_air_ID', GeometryParams.pilot_air_ID), parameters['pilot_fuel_ID'],
+        parameters['pilot_pressure'], parameters['pilot_temperature'], parameters['pilot_air_velocity'],
+        parameters['pilot_fuel_velocity'], parameters['coflow_pressure'], parameters['coflow_temperature'],
+        parameters['coflow_velocity'])
+    if holes is None:
+        holes = {'air_areas': air_area[:, None], 'air_diameters': air_ID[:, None],
+                 'fuel_areas': fuel_area[:, None], 'fuel_diameters': fuel_ID[:, None]}
+
+    bounds = bounds or merge_bounds(bounds_of(temperature=temperature), bounds_of(temperature=coflow_temperature))
+    temperature_axis = table_axis('temperature', *bounds['temperature'])
+
+    def viscosity(composition, T):
+        return gas_transport_table(composition, temperature_axis, mechanism)(T, names=['viscosity'])['viscosity']
+
+    rho_air, mu_air = gas_density(AIR, temperature, pressure, mechanism), viscosity(AIR, temperature)
+    air_drop, air_velocities = parallel_holes(air_velocity * air_area * rho_air, holes['air_areas'],
+                                              holes['air_diameters'], params.plate_thickness, rho_air, mu_air,
+                                              params)
+
+    rho_fuel, mu_fuel = gas_density(fuel, temperature, pressure, mechanism), viscosity(fuel, temperature)
+    fuel_drop, _ = parallel_holes(fuel_velocity * fuel_area * rho_fuel, holes['fuel_areas'],
+                                  holes['fuel_diameters'], params.fuel_tube_length, rho_fuel, mu_fuel, params)
+
+    rho_n2 = gas_density(NITROGEN, coflow_temperature, coflow_pressure, mechanism)
+    mu_n2 = viscosity(NITROGEN, coflow_temperature)
+    coflow_drop = straightener_loss(coflow_velocity, rho_n2, mu_n2, params) * rho_n2 * coflow_velocity ** 2 / 2
+
+    return {
+        'air_pressure_drop': air_drop,
+        'fuel_pressure_drop': fuel_drop,
+        'coflow_pressure_drop': coflow_drop,
+        'air_supply_pressure': pressure + air_drop,
+        'fuel_supply_pressure': pressure + fuel_drop,
+        'coflow_supply_pressure': coflow_pressure + coflow_drop,
+        'air_velocity_min': np.nanmin(air_velocities, axis=-1),
+        'air_velocity_max': np.nanmax(air_velocities, axis=-1),
+        'fuel_reynolds_number': rho_fuel * fuel_velocity * fuel_ID / mu_fuel,
+    }
+
+
+def burner_pressure_drops(geometry_config, geometry, operating, params=None, fuel=HYDROGEN):
+    """Pressure drops of one case with the per-hole geometry of its pilot pattern, as PressureDropResults"""
+    from calculations.vectorized import nominal_parameters
+
+    parameters = nominal_parameters(geometry, operating, geometry_config)
+    values = batch_pressure_drops(parameters, pilot_holes(geometry_config, geometry), params, fuel=fuel)
+    return PressureDropResults(**{name: float(value[0]) for name, value in values.items()})
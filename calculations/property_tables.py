@@ -0,0 +1,168 @@
+"""Tabulated Cantera properties for batched evaluation.
+
+Transport properties and equilibrium flame states are smooth in equivalence ratio, temperature and pressure, so they
+are computed with Cantera once on a small regular grid and interpolated multilinearly for whole sample arrays.
+Everything that follows exactly from the ideal gas law or the NASA polynomials (densities, enthalpies, cp) is not
+tabulated; see calculations.vectorized.
+
+Interpolated values are exact at the nodes. In between, with bounds spanning 0.4 in equivalence ratio and 140 K, the
+batch results stay within a few 1e-5 of the scalar calculators for the flame states and viscosities and within 2e-4
+for the Lewis number, whose diffusivity is the most curved in temperature. Wider bounds reach MAX_NODES and coarsen
+the grid: over 0.2 to 1.0 and 280 to 600 K the deviations grow to about 2e-4 for the flame states and 1e-3 for the
+Lewis number.
+
+Tables are cached per grid, so repeated batches with the same bounds reuse them. Pass explicit bounds covering all
+batches of a run (e.g. all Monte Carlo samples) to build the tables once.
+"""
+import math
+from functools import lru_cache
+
+import numpy as np
+
+from calculations.gas import DEFAULT_MECHANISM, new_solution, equilibrate
+from utils.lazy import lazy_import
+
+ct = lazy_import('cantera')
+
+# Grid spacing and maximum number of nodes per axis
+AXIS_STEPS = {'phi': 0.01, 'temperature': 10.0, 'pressure': 0.25e5}
+MAX_NODES = {'phi': 41, 'temperature': 17, 'pressure': 9}
+
+
+def table_axis(name, low, high):
+    """Grid nodes covering [low, high] for one table axis, as a (hashable) tuple"""
+    if high <= low:
+        return (float(low),)
+    n = min(max(math.ceil((high - low) / AXIS_STEPS[name]) + 1, 2), MAX_NODES[name])
+    return tuple(np.linspace(low, high, n).tolist())
+
+
+def bounds_of(**arrays):
+    """(min, max) of each array, e.g. bounds_of(phi=phi, temperature=T)"""
+    return {name: (float(np.min(values)), float(np.max(values))) for name, values in arrays.items()}
+
+
+def merge_bounds(*bounds):
+    merged = {}
+    for b in bounds:
+        for name, (low, high) in b.items():
+            old_low, old_high = merged.get(name, (low, high))
+            merged[name] = (min(low, old_low), max(high, old_high))
+    return merged
+
+
+def interpolate(axes, values, *points):
+    """Multilinear interpolation on a regular (possibly non-uniform) grid.
+
+    Args:
+        axes: Node coordinates per axis
+        values: Array of shape (len(axes[0]), len(axes[1]), ...) plus optional trailing value dimensions
+        points: One coordinate array per axis, broadcast against each other; clamped to the grid
+
+    Returns an array of the broadcast point shape plus the trailing value dimensions.
+    """
+    points = np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in points))
+    shape = points[0].shape
+    lower = []
+    weights = []
+    for axis, p in zip(axes, points):
+        axis = np.asarray(axis)
+        p = p.ravel()
+        if len(axis) == 1:
+            lower.append(np.zeros(p.shape, dtype=np.intp))
+            weights.append(np.zeros(p.shape))
+            continue
+        i = np.clip(np.searchsorted(axis, p, side='right') - 1, 0, len(axis) - 2)
+        lower.append(i)
+        weights.append(np.clip((p - axis[i]) / (axis[i + 1] - axis[i]), 0.0, 1.0))
+
+    trailing = values.shape[len(axes):]
+    result = np.zeros((points[0].size,) + trailing)
+    for corner in range(2 ** len(axes)):
+        upper = [(corner >> d) & 1 for d in range(len(axes))]
+        if any(u and len(axis) == 1 for u, axis in zip(upper, axes)):
+            continue  # Single node axes have no upper corner
+        weight = np.ones(points[0].size)
+        for u, w in zip(upper, weights):
+            weight *= w if u else 1.0 - w
+        index = tuple(i + u for i, u in zip(lower, upper))
+        result += weight.reshape((-1,) + (1,) * len(trailing)) * values[index]
+    return result.reshape(shape + trailing)
+
+
+class PropertyTable:
+    """Named property arrays on a common grid"""
+
+    def __init__(self, axes, values):
+        self.axes = axes
+        self.values = values
+
+    def __call__(self, *points, names=None):
+        """Interpolated properties at the points, {name: array}; all properties unless `names` are given"""
+        names = names or list(self.values)
+        return {name: interpolate(self.axes, self.values[name], *points) for name in names}
+
+
+@lru_cache(maxsize=32)
+def gas_transport_table(composition, temperature_axis, mechanism=DEFAULT_MECHANISM):
+    """Viscosity and thermal conductivity of a fixed composition over temperature (pressure independent)"""
+    gas = new_solution(mechanism)
+    viscosity = np.empty(len(temperature_axis))
+    conductivity = np.empty(len(temperature_axis))
+    for i, temperature in enumerate(temperature_axis):
+        gas.TPX = temperature, ct.one_atm, composition
+        viscosity[i] = gas.viscosity
+        conductivity[i] = gas.thermal_conductivity
+    return PropertyTable((temperature_axis,), {'viscosity': viscosity, 'thermal_conductivity': conductivity})
+
+
+@lru_cache(maxsize=32)
+def premixed_transport_table(fuel, oxidizer, phi_axis, temperature_axis, mechanism=DEFAULT_MECHANISM):
+    """Fresh mixture transport over (phi, T) at 1 atm.
+
+    'fuel_diffusivity' is the mixture-averaged diffusion coefficient of the main fuel species times pressure
+    [m^2/s * Pa]; divide by the actual pressure.
+    """
+    gas = new_solution(mechanism)
+    gas.X = fuel
+    fuel_index = int(np.argmax(gas.X))
+    shape = (len(phi_axis), len(temperature_axis))
+    viscosity = np.empty(shape)
+    conductivity = np.empty(shape)
+    diffusivity = np.empty(shape)
+    for i, phi in enumerate(phi_axis):
+        for j, temperature in enumerate(temperature_axis):
+            gas.TP = temperature, ct.one_atm
+            gas.set_equivalence_ratio(phi, fuel, oxidizer)
+            viscosity[i, j] = gas.viscosity
+            conductivity[i, j] = gas.thermal_conductivity
+            diffusivity[i, j] = gas.mix_diff_coeffs[fuel_index] * ct.one_atm
+    return PropertyTable((phi_axis, temperature_axis), {
+        'viscosity': viscosity,
+        'thermal_conductivity': conductivity,
+        'fuel_diffusivity': diffusivity,
+    })
+
+
+@lru_cache(maxsize=32)
+def equilibrium_table(fuel, oxidizer, phi_axis, temperature_axis, pressure_axis, mechanism=DEFAULT_MECHANISM):
+    """HP equilibrium of the fresh mixture over (phi, T, P): temperature, mean molecular weight and mass fractions"""
+    gas = new_solution(mechanism)
+    shape = (len(phi_axis), len(temperature_axis), len(pressure_axis))
+    temperature_ad = np.empty(shape)
+    molecular_weight = np.empty(shape)
+    mass_fractions = np.empty(shape + (gas.n_species,))
+    for i, phi in enumerate(phi_axis):
+        for j, temperature in enumerate(temperature_axis):
+            for k, pressure in enumerate(pressure_axis):
+                gas.TP = temperature, pressure
+                gas.set_equivalence_ratio(phi, fuel, oxidizer)
+                equilibrate(gas, 'HP')
+                temperature_ad[i, j, k] = gas.T
+                molecular_weight[i, j, k] = gas.mean_molecular_weight
+                mass_fractions[i, j, k] = gas.Y
+    return PropertyTable((phi_axis, temperature_axis, pressure_axis), {
+        'temperature': temperature_ad,
+        'molecular_weight': molecular_weight,
+        'mass_fractions': mass_fractions,
+    })
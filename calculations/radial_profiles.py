@@ -0,0 +1,263 @@
+"""Radially resolved velocity and temperature profiles of the jet pipe and the co-flow annulus.
+
+JetBurner and CoFlow carry a single bulk velocity. Here the bulk velocity (area average) is distributed over a radial
+grid with a fully developed profile, for CFD inlets and for the momentum flux of the streams:
+
+* 'plug': uniform velocity, as the calculators assume.
+* 'laminar': Poiseuille flow in the pipe, its exact counterpart in the annulus.
+* 'turbulent': power law u ~ y^(1/n) from each wall with n = 1.8 log10(Re) - 1.7, meeting at the radius of maximum
+  velocity of the laminar annulus (the axis in a pipe).
+* 'auto': 'laminar' below TRANSITION_REYNOLDS, 'turbulent' above, per case.
+
+With a wall temperature the temperature follows the velocity shape (Reynolds analogy, Pr ~ 1) from the wall value,
+with the velocity weighted mean equal to the stream temperature; the density follows from the ideal gas law at the
+stream pressure. All cases are evaluated at once on (cases, points) arrays and integrated with precomputed
+trapezoidal weights:
+
+    profiles = coflow_profiles(geometry.coflow_ID, geometry.coflow_OD, op.coflow_pressure, op.coflow_temperature,
+                               op.coflow_velocity, ProfileParams('turbulent', points=400))
+    profiles.mass_flow, profiles.momentum_flux, profiles.to_csv('coflow_inlet.csv')
+"""
+import csv
+import dataclasses
+
+import numpy as np
+
+from calculations.fuels import HYDROGEN, OXIDIZER, blend_composition
+from calculations.gas import DEFAULT_MECHANISM
+
+SHAPES = ('plug', 'laminar', 'turbulent', 'auto')
+GRIDS = ('uniform', 'cosine')
+TRANSITION_REYNOLDS = 2300.0
+
+
+@dataclasses.dataclass(frozen=True)
+class ProfileParams:
+    """Radial profile model
+
+    Attributes:
+    ----------
+    shape: str
+        'plug', 'laminar', 'turbulent' or 'auto' (laminar or turbulent by the bulk Reynolds number).
+    points: int
+        Radial grid points across the pipe radius or annulus gap, walls included.
+    grid: str
+        'uniform' spacing, or 'cosine' spacing clustered at the walls.
+    wall_temperature: float
+        Wall temperature [K]; None keeps the stream temperature across the section. The velocity is scaled to keep
+        the mass flow of the stream, so the bulk velocity differs from the stream velocity.
+    """
+    shape: str = 'auto'
+    points: int = 101
+    grid: str = 'uniform'
+    wall_temperature: float = None
+
+    def __post_init__(self):
+        if self.shape not in SHAPES:
+            raise ValueError(f"Unknown profile shape '{self.shape}'; choose from {SHAPES}")
+        if self.grid not in GRIDS:
+            raise ValueError(f"Unknown radial grid '{self.grid}'; choose from {GRIDS}")
+        if self.points < 2:
+            raise ValueError('A radial grid needs at least 2 points')
+
+
+@dataclasses.dataclass
+class RadialProfiles:
+    """Profiles and their integrals for a batch of cases
+
+    Attributes:
+    ----------
+    radius, velocity, temperature, density: np.ndarray
+        Profiles (cases, points) [m, m/s, K, kg/m^3]; the velocity is zero at the walls unless the shape is 'plug'.
+    bulk_velocity, max_velocity: np.ndarray
+        Area averaged and peak velocity [m/s] per case.
+    mass_flow: np.ndarray
+        Integrated mass flow [kg/s].
+    momentum_flux: np.ndarray
+        Integrated axial momentum flux [N].
+    momentum_coefficient: np.ndarray
+        Momentum flux relative to the plug flow of the same mass flow at the stream density.
+    energy_coefficient: np.ndarray
+        Kinetic energy flux relative to the plug flow of the same mass flow at the stream density.
+    reynolds_number: np.ndarray
+        Reynolds number of the integrated mass flow on the hydraulic diameter.
+    """
+    radius: np.ndarray
+    velocity: np.ndarray
+    temperature: np.ndarray
+    density: np.ndarray
+    bulk_velocity: np.ndarray
+    max_velocity: np.ndarray
+    mass_flow: np.ndarray
+    momentum_flux: np.ndarray
+    momentum_coefficient: np.ndarray
+    energy_coefficient: np.ndarray
+    reynolds_number: np.ndarray
+
+    def to_csv(self, filename, case=0):
+        """Write the profile of one case as 'radius, velocity, temperature, density' columns (CFD inlet)"""
+        names = ('radius', 'velocity', 'temperature', 'density')
+        with open(filename, 'w', newline='') as f:
+            csv.writer(f).writerow(names)
+            np.savetxt(f, np.column_stack([getattr(self, name)[case] for name in names]), delimiter=',',
+                       fmt='%.17g')
+
+
+def radial_grid(inner, outer, points, grid='uniform'):
+    """Radii (cases, points) from the inner to the outer wall, with an inner radius of 0 for a pipe"""
+    inner, outer = (np.asarray(value, dtype=float)[..., None] for value in (inner, outer))
+    if grid == 'uniform':
+        fraction = np.linspace(0.0, 1.0, points)
+    elif grid == 'cosine':
+        fraction = 0.5 * (1.0 - np.cos(np.linspace(0.0, np.pi, points)))
+    else:
+        raise ValueError(f"Unknown radial grid '{grid}'; choose from {GRIDS}")
+    return inner + (outer - inner) * fraction
+
+
+def _area_weights(radius):
+    # Trapezoidal weights of the integral of f 2 pi r dr over the section, (cases, points)
+    integrand = 2.0 * np.pi * radius
+    widths = np.diff(radius, axis=-1)
+    weights = np.zeros_like(radius)
+    weights[..., :-1] += widths / 2
+    weights[..., 1:] += widths / 2
+    return weights * integrand
+
+
+def power_law_exponent(reynolds):
+    """Exponent n of the turbulent power law profile u ~ y^(1/n), at least 4"""
+    return np.maximum(1.8 * np.log10(np.maximum(reynolds, 1.0)) - 1.7, 4.0)
+
+
+def _peak_radius(inner, outer):
+    # Radius of maximum velocity of the laminar annulus, the axis for a pipe
+    with np.errstate(divide='ignore', invalid='ignore'):
+        peak = np.sqrt((outer ** 2 - inner ** 2) / (2.0 * np.log(outer / inner)))
+    return np.where(inner > 0, peak, 0.0)
+
+
+def velocity_shape(radius, inner, outer, shape, reynolds):
+    """Unnormalized velocity profile (cases, points) of the shape; 'auto' picks laminar or turbulent by `reynolds`"""
+    inner, outer, reynolds = (np.asarray(value, dtype=float)[..., None] for value in (inner, outer, reynolds))
+    if shape == 'plug':
+        return np.ones_like(radius)
+
+    # Laminar: pressure driven flow between the walls, log term only for the annulus
+    x = radius / outer
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_term = np.where(inner > 0, (1.0 - (inner / outer) ** 2) * np.log(x) / np.log(outer / inner), 0.0)
+    laminar = np.maximum(1.0 - x ** 2 + np.nan_to_num(log_term), 0.0)
+    if shape == 'laminar':
+        return laminar
+
+    # Turbulent: power law from the nearer wall, both sides reaching 1 at the peak radius
+    peak = _peak_radius(inner, outer)
+    exponent = 1.0 / power_law_exponent(reynolds)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        outer_side = np.clip((outer - radius) / (outer - peak), 0.0, 1.0) ** exponent
+        inner_side = np.clip((radius - inner) / (peak - inner), 0.0, 1.0) ** exponent
+    turbulent = np.where(radius >= peak, outer_side, np.nan_to_num(inner_side))
+    if shape == 'turbulent':
+        return turbulent
+    if shape == 'auto':
+        return np.where(reynolds < TRANSITION_REYNOLDS, laminar, turbulent)
+    raise ValueError(f"Unknown profile shape '{shape}'; choose from {SHAPES}")
+
+
+def radial_profiles(inner, outer, velocity, density, viscosity, temperature, params=None):
+    """Profiles of streams with bulk velocity, density, viscosity and temperature given per case.
+
+    Args:
+        inner, outer: Inner (0 for a pipe) and outer radius [m]
+        velocity: Bulk (area averaged) velocity [m/s]
+        density, viscosity: Gas density [kg/m^3] and dynamic viscosity [Pa s] at the stream temperature
+        temperature: Stream temperature [K]
+        params: ProfileParams
+    """
+    params = params or ProfileParams()
+    inner, outer, velocity, density, viscosity, temperature = np.broadcast_arrays(
+        *(np.atleast_1d(np.asarray(value, dtype=float)) for value in
+          (inner, outer, velocity, density, viscosity, temperature)))
+    hydraulic_diameter = 2.0 * (outer - inner)
+    area = np.pi * (outer ** 2 - inner ** 2)
+
+    radius = radial_grid(inner, outer, params.points, params.grid)
+    weights = _area_weights(radius)
+    shape = velocity_shape(radius, inner, outer, params.shape, velocity * hydraulic_diameter * density / viscosity)
+    # Normalize on the same quadrature so the integrated bulk velocity is exact
+    u = shape * (velocity * area / np.sum(shape * weights, axis=-1))[..., None]
+
+    T = np.broadcast_to(temperature[..., None], radius.shape)
+    if params.wall_temperature is not None:
+        # Velocity weighted mean of wall + amplitude * (u / u_max) equals the stream temperature
+        s = shape / np.max(shape, axis=-1, keepdims=True)
+        amplitude = ((temperature - params.wall_temperature) * np.sum(u * weights, axis=-1)
+                     / np.sum(u * s * weights, axis=-1))
+        T = params.wall_temperature + amplitude[..., None] * s
+    rho = density[..., None] * temperature[..., None] / T
+    if params.wall_temperature is not None:
+        # Rescale the velocity to the stream's mass flow on the varying density; the velocity weighted mean
+        # temperature does not depend on the scale
+        u = u * (velocity * density * area / np.sum(rho * u * weights, axis=-1))[..., None]
+
+    mass_flow = np.sum(rho * u * weights, axis=-1)
+    momentum_flux = np.sum(rho * u ** 2 * weights, axis=-1)
+    return RadialProfiles(
+        radius=radius,
+        velocity=u,
+        temperature=T,
+        density=rho,
+        bulk_velocity=np.sum(u * weights, axis=-1) / area,
+        max_velocity=np.max(u, axis=-1),
+        mass_flow=mass_flow,
+        momentum_flux=momentum_flux,
+        momentum_coefficient=momentum_flux / (mass_flow * velocity),
+        energy_coefficient=np.sum(rho * u ** 3 * weights, axis=-1) / (mass_flow * velocity ** 2),
+        reynolds_number=mass_flow / area * hydraulic_diameter / viscosity,
+    )
+
+
+def coflow_profiles(coflow_ID, coflow_OD, coflow_pressure, coflow_temperature, coflow_velocity, params=None,
+                    bounds=None, mechanism=DEFAULT_MECHANISM):
+    """Profiles of the N2 co-flow annulus for arrays of operating points (CoFlow properties)"""
+    from calculations.property_tables import bounds_of, gas_transport_table, table_axis
+    from calculations.vectorized import NITROGEN, _broadcast, _pure
+
+    inner, outer, pressure, temperature, velocity = _broadcast(coflow_ID, coflow_OD, coflow_pressure,
+                                                               coflow_temperature, coflow_velocity)
+    bounds = bounds or bounds_of(temperature=temperature)
+    thermo, Y = _pure(NITROGEN, mechanism)
+    viscosity = gas_transport_table(NITROGEN, table_axis('temperature', *bounds['temperature']), mechanism)(
+        temperature, names=['viscosity'])['viscosity']
+    return radial_profiles(inner / 2, outer / 2, velocity, thermo.density(temperature, pressure, Y), viscosity,
+                           temperature, params)
+
+
+def jet_profiles(jet_ID, jet_equivalence_ratio, jet_pressure, jet_temperature, jet_velocity, params=None,
+                 bounds=None, fuel=HYDROGEN, mechanism=DEFAULT_MECHANISM):
+    """Profiles of the premixed jet pipe for arrays of operating points (incompressible JetBurner properties)"""
+    from calculations.property_tables import bounds_of, premixed_transport_table, table_axis
+    from calculations.vectorized import _broadcast, _premixed, premixed_mass_fractions
+
+    fuel = blend_composition(fuel)
+    pipe_ID, phi, pressure, temperature, velocity = _broadcast(jet_ID, jet_equivalence_ratio, jet_pressure,
+                                                               jet_temperature, jet_velocity)
+    bounds = bounds or bounds_of(phi=phi, temperature=temperature)
+    thermo = _premixed(fuel, OXIDIZER, mechanism)[0]
+    density = thermo.density(temperature, pressure, premixed_mass_fractions(phi, fuel, OXIDIZER, mechanism))
+    viscosity = premixed_transport_table(fuel, OXIDIZER, table_axis('phi', *bounds['phi']),
+                                         table_axis('temperature', *bounds['temperature']), mechanism)(
+        phi, temperature)['viscosity']
+    return radial_profiles(0.0, pipe_ID / 2, velocity, density, viscosity, temperature, params)
+
+
+def batch_profiles(parameters, params=None, bounds=None, fuel=HYDROGEN, mechanism=DEFAULT_MECHANISM):
+    """Jet and co-flow profiles of a batch of parameters (calculations.vectorized), {'jet', 'coflow': RadialProfiles}"""
+    p = parameters
+    return {
+        'jet': jet_profiles(p['jet_ID'], p['jet_equivalence_ratio'], p['jet_pressure'], p['jet_temperature'],
+                            p['jet_velocity'], params, bounds, fuel, mechanism),
+        'coflow': coflow_profiles(p['coflow_ID'], p['coflow_OD'], p['coflow_pressure'], p['coflow_temperature'],
+                                  p['coflow_velocity'], params, bounds, mechanism),
+    }
@@ -0,0 +1,318 @@
+"""Reactor network model of the mixing zone downstream of the burner.
+
+MixedTemperature mixes the jet and pilot products with the co-flow instantly and without chemistry. Here the streams
+enter a perfectly stirred reactor (PSR) of a given residence time, whose outflow continues through a plug flow reactor
+(PFR), modelled as a constant pressure reactor travelling with the flow. The result is the temperature and composition
+history over residence time and distance downstream of the burner, including the slow chemistry (recombination, NO)
+that instant mixing leaves out.
+
+The Cantera objects of the network are built once per MixingZone and re-initialized for every case; each PSR solve
+starts from the steady state of the previous case, so a sweep of neighbouring cases costs a fraction of building and
+solving fresh networks:
+
+    zone = MixingZone()
+    result = zone.solve(inlet_streams(jet, pilot, coflow, operating), operating.jet_pressure, exit_area)
+
+`mixing_zone_sweep` evaluates a list of sweep cases over a process pool, with one MixingZone per worker.
+"""
+import dataclasses
+import functools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from calculations.fuels import HYDROGEN, blend_composition
+from calculations.gas import DEFAULT_MECHANISM, new_solution, equilibrate
+from utils.lazy import lazy_import
+
+ct = lazy_import('cantera')
+
+# Pressure rise of the PSR above the outlet, relative to the pressure, at which the outflow balances the inflow
+PRESSURE_TOLERANCE = 1e-6
+
+
+@dataclasses.dataclass(frozen=True)
+class MixingZoneParams:
+    """Residence times and output resolution of the mixing zone
+
+    Attributes:
+    ----------
+    psr_residence_time: float
+        Residence time of the stirred reactor [s].
+    pfr_residence_time: float
+        Residence time of the plug flow reactor behind it [s].
+    pfr_points: int
+        Number of points of the reported history, evenly spaced in PFR residence time.
+    start_from_equilibrium: bool
+        Start cold PSR solves from the equilibrium of the mixed inlets instead of the inlets mixed without chemistry,
+        so that fresh premixed inlets ignite.
+    """
+    psr_residence_time: float = 1e-3
+    pfr_residence_time: float = 20e-3
+    pfr_points: int = 41
+    start_from_equilibrium: bool = False
+
+
+@dataclasses.dataclass
+class InletStream:
+    """One stream entering the mixing zone
+
+    Attributes:
+    ----------
+    mass_flow: float
+        Mass flow [kg/s].
+    temperature: float
+        Temperature [K].
+    mass_fractions: dict
+        Composition {species: mass fraction}.
+    """
+    mass_flow: float
+    temperature: float
+    mass_fractions: dict
+
+
+@dataclasses.dataclass
+class MixingZoneResult:
+    """History of the mixed stream through the PSR and the PFR
+
+    Attributes:
+    ----------
+    time: np.ndarray
+        Residence time since the PSR exit [s].
+    distance: np.ndarray
+        Distance travelled since the PSR exit at the mean velocity through the exit area [m].
+    temperature: np.ndarray
+        Temperature [K].
+    mass_fractions: np.ndarray
+        Mass fractions (points, species).
+    species_names: list
+        Species of the columns of `mass_fractions`.
+    psr_temperature: float
+        Temperature of the stirred reactor [K].
+    mixed_temperature: float
+        Temperature of the streams mixed without chemistry [K], as in MixedTemperature.
+    """
+    time: np.ndarray
+    distance: np.ndarray
+    temperature: np.ndarray
+    mass_fractions: np.ndarray
+    species_names: list
+    psr_temperature: float
+    mixed_temperature: float
+
+    def species(self, name):
+        """Mass fraction history of one species"""
+        return self.mass_fractions[:, self.species_names.index(name)]
+
+    def print_summary(self, species=('H2O', 'OH', 'NO')):
+        print(f"{'mixed_temperature':18}: {self.mixed_temperature:.5e}")
+        print(f"{'psr_temperature':18}: {self.psr_temperature:.5e}")
+        print(f"{'exit_temperature':18}: {self.temperature[-1]:.5e}")
+        print(f"{'distance':18}: {self.distance[-1]:.5e}")
+        for name in species:
+            if name in self.species_names:
+                print(f"{'Y_' + name:18}: {self.species(name)[0]:.5e} -> {self.species(name)[-1]:.5e}")
+
+
+class MixingZone:
+    def __init__(self, n_streams=3, params=None, mechanism=DEFAULT_MECHANISM):
+        """Build the reactor network once.
+
+        Args:
+            n_streams: Number of inlet streams
+            params: MixingZoneParams
+            mechanism: Cantera mechanism (calculations.gas.MECHANISMS name or file)
+        """
+        self.params = params or MixingZoneParams()
+        self.gas = new_solution(mechanism)
+        self.species_names = list(self.gas.species_names)
+
+        # Reservoirs of the inlet streams -> PSR -> outlet reservoir; the PFR is a separate network fed with the PSR
+        # state. Reactor phases are copies of self.gas
+        self.inlets = [ct.Reservoir(self.gas, clone=True) for _ in range(n_streams)]
+        self.psr = ct.IdealGasReactor(self.gas, clone=True)
+        self.outlet = ct.Reservoir(self.gas, clone=True)
+        self.controllers = [ct.MassFlowController(inlet, self.psr, mdot=0.0) for inlet in self.inlets]
+        self.exhaust = ct.PressureController(self.psr, self.outlet, primary=self.controllers[0],
+                                             K=PRESSURE_TOLERANCE)
+        self.psr_net = ct.ReactorNet([self.psr])
+        self.pfr = ct.IdealGasConstPressureReactor(self.gas, clone=True)
+        self.pfr_net = ct.ReactorNet([self.pfr])
+        self.warm = False
+
+    def reset(self):
+        """Start the next PSR solve from the mixed inlet state instead of the previous solution"""
+        self.warm = False
+
+    def _set_state(self, reactor, T, P, Y):
+        # A reactor's phase is re-synchronized from the reactor on every access, so set it through one reference
+        phase = reactor.phase
+        phase.TPY = T, P, Y
+        reactor.syncState()
+
+    def _mass_fractions(self, composition):
+        # Species the mechanism does not have are dropped (Cantera renormalizes)
+        return {name: y for name, y in composition.items() if name in self.species_names and y > 0}
+
+    def solve(self, streams, pressure, area):
+        """Steady PSR and PFR history for one case.
+
+        Args:
+            streams: InletStream per inlet
+            pressure: Pressure of the mixing zone [Pa]
+            area: Flow area downstream of the burner [m^2], for the distance
+        """
+        if len(streams) != len(self.inlets):
+            raise ValueError(f'Expected {len(self.inlets)} streams, got {len(streams)}')
+        gas = self.gas
+        mass_flows = np.array([stream.mass_flow for stream in streams])
+        total = mass_flows.sum()
+
+        # Inlet states, and the streams mixed without chemistry
+        enthalpy = 0.0
+        Y = np.zeros(gas.n_species)
+        for inlet, stream, controller in zip(self.inlets, streams, self.controllers):
+            gas.TPY = stream.temperature, pressure, self._mass_fractions(stream.mass_fractions)
+            enthalpy += stream.mass_flow * gas.enthalpy_mass
+            Y += stream.mass_flow * gas.Y
+            self._set_state(inlet, stream.temperature, pressure, gas.Y)
+            controller.mass_flow_rate = stream.mass_flow
+        gas.HPY = enthalpy / total, pressure, Y / total
+        mixed_temperature = gas.T
+        self._set_state(self.outlet, gas.T, pressure, gas.Y)
+
+        # The largest stream is the primary flow of the outlet; the pressure coefficient passes the others with a
+        # negligible pressure rise
+        primary = int(np.argmax(mass_flows))
+        self.exhaust.primary = self.controllers[primary]
+        self.exhaust.pressure_coeff = (total - mass_flows[primary]) / (PRESSURE_TOLERANCE * pressure)
+
+        # Warm start from the previous steady state at the new pressure, otherwise from the mixed inlets
+        if self.warm:
+            state = self.psr.phase
+            gas.TPY = state.T, pressure, state.Y
+        elif self.params.start_from_equilibrium:
+            equilibrate(gas, 'HP')
+        self._set_state(self.psr, gas.T, pressure, gas.Y)
+        self.psr.volume = total * self.params.psr_residence_time / gas.density
+        self.psr_net.initial_time = 0.0
+        self.psr_net.reinitialize()
+        self.psr_net.advance_to_steady_state()
+        self.warm = True
+
+        state = self.psr.phase
+        psr_temperature = state.T
+        self._set_state(self.pfr, state.T, pressure, state.Y)
+        self.pfr_net.initial_time = 0.0
+        self.pfr_net.reinitialize()
+
+        times = np.linspace(0.0, self.params.pfr_residence_time, self.params.pfr_points)
+        temperature = np.empty(len(times))
+        mass_fractions = np.empty((len(times), gas.n_species))
+        density = np.empty(len(times))
+        for i, t in enumerate(times):
+            if t > 0:
+                self.pfr_net.advance(t)
+            state = self.pfr.phase
+            temperature[i] = state.T
+            mass_fractions[i] = state.Y
+            density[i] = state.density
+
+        # Distance from the residence time at the mean velocity through the downstream area
+        velocity = total / (density * area)
+        distance = np.concatenate([[0.0], np.cumsum(np.diff(times) * (velocity[1:] + velocity[:-1]) / 2)])
+        return MixingZoneResult(
+            time=times,
+            distance=distance,
+            temperature=temperature,
+            mass_fractions=mass_fractions,
+            species_names=self.species_names,
+            psr_temperature=psr_temperature,
+            mixed_temperature=mixed_temperature,
+        )
+
+
+def inlet_streams(jet_results, pilot_results, coflow_results, operating):
+    """Jet and pilot flame products and the co-flow N2 of one case, from the calculator results"""
+    return [
+        InletStream(jet_results.mass_flow_total, jet_results.flame_temperature, jet_results.flame_species_mass_fracs),
+        InletStream(pilot_results.mass_flow_total, pilot_results.flame_temperature,
+                    pilot_results.flame_species_mass_fracs),
+        InletStream(coflow_results.mass_flow, operating.coflow_temperature, {'N2': 1.0}),
+    ]
+
+
+def batch_inlet_streams(parameters, bounds=None, fuel=HYDROGEN, mechanism=DEFAULT_MECHANISM):
+    """Inlet streams of every case of a batch (see calculations.vectorized.nominal_parameters) burning `fuel`"""
+    from calculations.thermo import get_thermo
+    from calculations.vectorized import STREAMS, evaluate_batch, flame_mass_fractions, table_bounds
+
+    p = {name: np.atleast_1d(np.asarray(value, dtype=float)) for name, value in parameters.items()}
+    bounds = bounds or table_bounds(p, fuel, mechanism)
+    streams = evaluate_batch(p, streams=STREAMS[:3], bounds=bounds, fuel=fuel, mechanism=mechanism)
+    jet, pilot, coflow = streams['jet'], streams['pilot'], streams['coflow']
+    n = len(jet)
+    jet_Y = flame_mass_fractions(p['jet_equivalence_ratio'], p['jet_temperature'], p['jet_pressure'], bounds, fuel,
+                                 mechanism)
+    pilot_Y = flame_mass_fractions(pilot.equivalence_ratio, p['pilot_temperature'], p['pilot_pressure'], bounds,
+                                   fuel, mechanism)
+    species = get_thermo(mechanism=mechanism).species_names
+    coflow_temperature = np.broadcast_to(p['coflow_temperature'], (n,))
+
+    def composition(Y):
+        return {name: y for name, y in zip(species, Y.tolist()) if y > 0}
+
+    return [[InletStream(float(jet.mass_flow_total[i]), float(jet.flame_temperature[i]), composition(jet_Y[i])),
+             InletStream(float(pilot.mass_flow_total[i]), float(pilot.flame_temperature[i]),
+                         composition(pilot_Y[i])),
+             InletStream(float(coflow.mass_flow[i]), float(coflow_temperature[i]), {'N2': 1.0})]
+            for i in range(n)]
+
+
+@functools.lru_cache(maxsize=4)
+def _worker_zone(params, mechanism):
+    # One network per worker process (and per parameter set), reused for every chunk it receives
+    return MixingZone(params=params, mechanism=mechanism)
+
+
+def _solve_chunk(params, mechanism, chunk):
+    zone = _worker_zone(params, mechanism)
+    zone.reset()
+    results = []
+    for streams, pressure, area in chunk:
+        try:
+            results.append(zone.solve(streams, pressure, area))
+        except ct.CanteraError:
+            results.append(None)
+            zone.reset()
+    return results
+
+
+def mixing_zone_sweep(cases, params=None, mechanism=DEFAULT_MECHANISM, workers=None, chunk_size=8):
+    """MixingZoneResult of every case (None where the solver failed).
+
+    Args:
+        cases: Sequence of sweep.runner.Case burning the same fuel; neighbouring cases should be close for the warm
+            starts to pay off
+        params: MixingZoneParams
+        mechanism: Cantera mechanism of the reactors
+        workers: Worker processes (None: one per CPU, 0: evaluate in this process)
+        chunk_size: Cases per worker task, solved in order on one network
+    """
+    from calculations.burner_array import array_parameters
+
+    params = params or MixingZoneParams()
+    fuels = {blend_composition(case.fuel) for case in cases}
+    if len(fuels) > 1:
+        raise ValueError(f'The cases of a mixing zone sweep must burn the same fuel, got {sorted(fuels)}')
+    parameters = array_parameters(cases)
+    streams = batch_inlet_streams(parameters, fuel=fuels.pop() if fuels else HYDROGEN, mechanism=mechanism)
+    areas = np.pi / 4 * parameters['coflow_OD'] ** 2
+    items = list(zip(streams, parameters['jet_pressure'].tolist(), areas.tolist()))
+    chunks = [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+    if workers == 0 or len(chunks) <= 1:
+        results = [_solve_chunk(params, mechanism, chunk) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_solve_chunk, *zip(*[(params, mechanism, chunk) for chunk in chunks])))
+    return [result for chunk in results for result in chunk]
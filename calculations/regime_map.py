@@ -0,0 +1,193 @@
+"""Vectorized turbulent premixed combustion regime maps (Borghi / Peters diagram).
+
+`regime_map` evaluates u'/S_L, l_0/delta_f, the Karlovitz and Damkohler numbers and the turbulent Reynolds number on
+the broadcast grid of jet velocity, equivalence ratio, pressure and jet diameter in one NumPy pass. Cantera is only
+used once per distinct (phi, T) pair to get the mixture density and transport properties; the pressure dependence
+follows from the ideal gas law.
+
+The scalar JetBurner uses the same definitions (`karlovitz_number`, `reference_flame_speed`), so a map evaluated at a
+single point reproduces its Karlovitz number.
+"""
+import dataclasses
+
+import numpy as np
+
+from calculations.gas import new_solution
+from utils.lazy import lazy_import
+
+ct = lazy_import('cantera')
+
+# Defaults shared with JetBurner
+TURBULENCE_INTENSITY = 0.1  # u' / U
+FLAME_THICKNESS = 0.5e-3  # Thermal thickness [m]
+FLAME_SPEED_1ATM = 0.24  # Laminar flame speed at 1 atm [m/s]
+
+# Regime codes
+LAMINAR = 0
+WRINKLED = 1
+CORRUGATED = 2
+THIN_REACTION_ZONES = 3
+BROKEN_REACTION_ZONES = 4
+REGIME_NAMES = {
+    LAMINAR: 'laminar',
+    WRINKLED: 'wrinkled flamelets',
+    CORRUGATED: 'corrugated flamelets',
+    THIN_REACTION_ZONES: 'thin reaction zones',
+    BROKEN_REACTION_ZONES: 'broken reaction zones',
+}
+
+
+def reference_flame_speed(pressure):
+    """Laminar flame speed from the 1 atm reference value with p^-0.5 pressure scaling"""
+    return FLAME_SPEED_1ATM * (np.asarray(pressure) / ct.one_atm) ** (-0.5)
+
+
+def karlovitz_number(u_prime, flame_speed, flame_thickness, integral_length):
+    return (u_prime / flame_speed) ** (3 / 2) * (flame_thickness / integral_length) ** (1 / 2)
+
+
+def damkohler_number(u_prime, flame_speed, flame_thickness, integral_length):
+    # Ratio of the integral eddy turnover time to the chemical (flame) time
+    return (integral_length / u_prime) / (flame_thickness / flame_speed)
+
+
+def classify_regime(u_prime_sl, karlovitz, turbulent_reynolds):
+    """Peters regime code for every point"""
+    regime = np.full(np.shape(karlovitz), THIN_REACTION_ZONES, dtype=np.int8)
+    regime[karlovitz > 100] = BROKEN_REACTION_ZONES
+    regime[(karlovitz <= 1) & (u_prime_sl > 1)] = CORRUGATED
+    regime[(karlovitz <= 1) & (u_prime_sl <= 1)] = WRINKLED
+    regime[turbulent_reynolds < 1] = LAMINAR
+    return regime
+
+
+def flame_speed_table(phi, temperature, pressure, fuel='H2', mechanism='gri30.yaml', width=0.03):
+    """Laminar flame speeds from Cantera free flames at the given equivalence ratios.
+
+    The result can be passed to `regime_map` as `flame_speed=(phi, speeds)`; values in between are interpolated.
+    Each flame takes seconds to solve, so keep `phi` coarse and reuse the table.
+    """
+    gas = new_solution(mechanism)
+    speeds = np.empty(len(phi))
+    for i, value in enumerate(phi):
+        gas.TP = temperature, pressure
+        gas.set_equivalence_ratio(value, fuel, 'O2:1.0, N2:3.76')
+        flame = ct.FreeFlame(gas, width=width)
+        flame.set_refine_criteria(ratio=3, slope=0.1, curve=0.2)
+        flame.solve(loglevel=0, auto=True)
+        speeds[i] = flame.velocity[0]
+    return np.asarray(phi, dtype=float), speeds
+
+
+def mixture_properties(phi, temperature, pressure, fuel='H2', mechanism='gri30.yaml'):
+    """Density, kinematic viscosity and thermal diffusivity of the fresh mixture on broadcast arrays.
+
+    Cantera is evaluated at the reference pressure for every distinct (phi, T) pair only; density scales with p and
+    the kinematic properties with 1/p (ideal gas, pressure independent dynamic viscosity and conductivity).
+    """
+    phi, temperature, pressure = np.broadcast_arrays(*(np.asarray(a, dtype=float)
+                                                       for a in (phi, temperature, pressure)))
+    pairs, inverse = np.unique(np.stack([phi.ravel(), temperature.ravel()], axis=1), axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+
+    gas = new_solution(mechanism)
+    rho_ref = np.empty(len(pairs))
+    mu = np.empty(len(pairs))
+    k_over_cp = np.empty(len(pairs))
+    for i, (pair_phi, pair_temperature) in enumerate(pairs):
+        gas.TP = pair_temperature, ct.one_atm
+        gas.set_equivalence_ratio(pair_phi, fuel, 'O2:1.0, N2:3.76')
+        rho_ref[i] = gas.density_mass
+        mu[i] = gas.viscosity
+        k_over_cp[i] = gas.thermal_conductivity / gas.cp_mass
+
+    scale = pressure / ct.one_atm
+    density = rho_ref[inverse].reshape(phi.shape) * scale
+    viscosity = mu[inverse].reshape(phi.shape)
+    return {
+        'density': density,
+        'kinematic_viscosity': viscosity / density,
+        'thermal_diffusivity': k_over_cp[inverse].reshape(phi.shape) / density,
+    }
+
+
+@dataclasses.dataclass
+class RegimeMap:
+    """Regime map arrays, all with the broadcast shape of the inputs"""
+    velocity: np.ndarray
+    phi: np.ndarray
+    pressure: np.ndarray
+    diameter: np.ndarray
+    u_prime: np.ndarray
+    flame_speed: np.ndarray
+    flame_thickness: np.ndarray
+    u_prime_sl: np.ndarray
+    length_ratio: np.ndarray
+    karlovitz: np.ndarray
+    damkohler: np.ndarray
+    reynolds: np.ndarray
+    turbulent_reynolds: np.ndarray
+    regime: np.ndarray
+
+
+def regime_map(velocity, phi, pressure, diameter, temperature=298.15, turbulence_intensity=TURBULENCE_INTENSITY,
+               flame_thickness=FLAME_THICKNESS, flame_speed=None, integral_scale=1.0, fuel='H2',
+               mechanism='gri30.yaml'):
+    """Evaluate the combustion regime on a grid.
+
+    Args:
+        velocity, phi, pressure, diameter: Jet velocity [m/s], equivalence ratio, pressure [Pa] and jet inner
+            diameter [m]. Arrays are broadcast against each other, so e.g. `velocity[:, None]` and `phi[None, :]`
+            give a velocity x phi map.
+        temperature: Fresh mixture temperature [K]
+        turbulence_intensity: u'/U
+        flame_thickness: Flame thickness [m], or 'diffusive' for alpha / S_L
+        flame_speed: None for the pressure-scaled reference speed used by JetBurner, a constant [m/s], or a
+            (phi, speeds) table from `flame_speed_table`, interpolated in phi and scaled with (p / p_table)^-0.5
+            relative to `table_pressure` when given as (phi, speeds, table_pressure)
+        integral_scale: Integral length scale as a fraction of the jet diameter
+    """
+    velocity, phi, pressure, diameter = np.broadcast_arrays(
+        *(np.asarray(a, dtype=float) for a in (velocity, phi, pressure, diameter)))
+
+    if flame_speed is None:
+        sl = reference_flame_speed(pressure)
+    elif np.ndim(flame_speed) == 0:
+        sl = np.full(phi.shape, float(flame_speed))
+    else:
+        table_phi, table_speed = flame_speed[0], flame_speed[1]
+        sl = np.interp(phi, table_phi, table_speed)
+        if len(flame_speed) > 2:
+            sl = sl * (pressure / flame_speed[2]) ** (-0.5)
+
+    properties = mixture_properties(phi, temperature, pressure, fuel, mechanism)
+    if isinstance(flame_thickness, str):
+        if flame_thickness != 'diffusive':
+            raise ValueError(f"Unknown flame thickness model '{flame_thickness}'")
+        l_f = properties['thermal_diffusivity'] / sl
+    else:
+        l_f = np.full(phi.shape, float(flame_thickness))
+
+    u_prime = turbulence_intensity * velocity
+    l_0 = integral_scale * diameter
+
+    u_prime_sl = u_prime / sl
+    karlovitz = karlovitz_number(u_prime, sl, l_f, l_0)
+    turbulent_reynolds = u_prime * l_0 / properties['kinematic_viscosity']
+
+    return RegimeMap(
+        velocity=velocity,
+        phi=phi,
+        pressure=pressure,
+        diameter=diameter,
+        u_prime=u_prime,
+        flame_speed=sl,
+        flame_thickness=l_f,
+        u_prime_sl=u_prime_sl,
+        length_ratio=l_0 / l_f,
+        karlovitz=karlovitz,
+        damkohler=damkohler_number(u_prime, sl, l_f, l_0),
+        reynolds=velocity * diameter / properties['kinematic_viscosity'],
+        turbulent_reynolds=turbulent_reynolds,
+        regime=classify_regime(u_prime_sl, karlovitz, turbulent_reynolds),
+    )
@@ -0,0 +1,164 @@
+"""Columnar result containers for bulk runs.
+
+Each table stores the numeric fields of one result dataclass in a single NumPy structured array, one record per case.
+Columns are views into that array, slicing a table returns a table sharing the same buffer, and indexing with an
+integer returns the scalar dataclass for that case. Fields that are not numeric (e.g. `species_mass_fracs`) are not
+stored; the dataclass views report them as None.
+"""
+import csv
+import dataclasses
+
+import numpy as np
+
+from calculations.jet_burner import JetBurnerProperties
+from calculations.pilot_burner import PilotBurnerProperties
+from calculations.n2_co_flow import CoFlowResults
+from calculations.mixed_temperature import MixingResults
+from utils.lazy import lazy_import
+
+pa = lazy_import('pyarrow')
+pq = lazy_import('pyarrow.parquet')
+
+_NUMERIC_TYPES = (float, int, bool)
+
+
+class ResultTable:
+    """Struct-of-arrays container for the results of many cases"""
+
+    row_class = None
+
+    def __init__(self, data):
+        if data.dtype != self.dtype():
+            raise ValueError(f'{type(self).__name__} expects dtype {self.dtype()}, got {data.dtype}')
+        self.data = data
+
+    @classmethod
+    def fields(cls):
+        """Names of the stored (numeric) fields, in dataclass order"""
+        return [field.name for field in dataclasses.fields(cls.row_class) if field.type in _NUMERIC_TYPES]
+
+    @classmethod
+    def dtype(cls):
+        # Cached per subclass, slicing constructs tables often
+        if '_dtype' not in cls.__dict__:
+            cls._dtype = np.dtype([(name, np.float64) for name in cls.fields()])
+        return cls._dtype
+
+    @classmethod
+    def _types(cls):
+        # {field name: int or bool} of the stored fields that are not floats, cached per subclass
+        if '_field_types' not in cls.__dict__:
+            cls._field_types = {field.name: field.type for field in dataclasses.fields(cls.row_class)
+                                if field.type in (int, bool)}
+        return cls._field_types
+
+    @classmethod
+    def empty(cls, n):
+        """Table of `n` cases with every value set to NaN"""
+        data = np.empty(n, dtype=cls.dtype())
+        for name in cls.fields():
+            data[name] = np.nan
+        return cls(data)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a table from dataclass instances or mappings with the same field names"""
+        table = cls.empty(len(rows))
+        for i, row in enumerate(rows):
+            table.set_row(i, row)
+        return table
+
+    @classmethod
+    def from_columns(cls, **columns):
+        """Build a table from equally long column arrays; missing columns are NaN"""
+        n = len(next(iter(columns.values())))
+        table = cls.empty(n)
+        for name, values in columns.items():
+            table.data[name] = values
+        return table
+
+    @classmethod
+    def concatenate(cls, tables):
+        return cls(np.concatenate([table.data for table in tables]))
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        if isinstance(index, (int, np.integer)):
+            return self.row(index)
+        return type(self)(self.data[index])
+
+    def __getattr__(self, name):
+        # Column access (table.mass_flow_total) without copying
+        if name != 'data' and name in self.data.dtype.names:
+            return self.data[name]
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def __repr__(self):
+        return f'{type(self).__name__}({len(self)} cases)'
+
+    def column(self, name):
+        return self.data[name]
+
+    def row(self, index):
+        """Scalar dataclass view of one case; int and bool fields get their type back unless they are NaN"""
+        record = self.data[index]
+        values = {name: float(record[name]) for name in self.data.dtype.names}
+        for name, kind in self._types().items():
+            if not np.isnan(values[name]):
+                values[name] = kind(values[name])
+        for field in dataclasses.fields(self.row_class):
+            values.setdefault(field.name, None)
+        return self.row_class(**values)
+
+    def set_row(self, index, values):
+        """Write one case from a dataclass instance or a mapping of field names to values"""
+        if dataclasses.is_dataclass(values):
+            values = {name: getattr(values, name) for name in self.data.dtype.names}
+        for name in self.data.dtype.names:
+            value = values.get(name)
+            self.data[name][index] = np.nan if value is None else value
+
+    def to_npz(self, filename, compressed=False):
+        save = np.savez_compressed if compressed else np.savez
+        save(filename, **{name: self.data[name] for name in self.data.dtype.names})
+
+    @classmethod
+    def from_npz(cls, filename):
+        with np.load(filename) as archive:
+            return cls.from_columns(**{name: archive[name] for name in cls.fields() if name in archive})
+
+    def to_csv(self, filename):
+        names = self.data.dtype.names
+        with open(filename, 'w', newline='') as f:
+            csv.writer(f).writerow(names)
+            np.savetxt(f, np.column_stack([self.data[name] for name in names]), delimiter=',', fmt='%.17g')
+
+    def to_parquet(self, filename):
+        """Write the table as Parquet; requires the optional pyarrow package"""
+        try:
+            table = pa.table({name: self.data[name] for name in self.data.dtype.names})
+        except ImportError as e:
+            raise ImportError('Writing Parquet files requires pyarrow (pip install pyarrow)') from e
+        pq.write_table(table, filename)
+
+
+class JetBurnerTable(ResultTable):
+    row_class = JetBurnerProperties
+
+
+class PilotBurnerTable(ResultTable):
+    row_class = PilotBurnerProperties
+
+
+class CoFlowTable(ResultTable):
+    row_class = CoFlowResults
+
+
+class MixingTable(ResultTable):
+    row_class = MixingResults
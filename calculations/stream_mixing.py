@@ -0,0 +1,65 @@
+"""Adiabatic mixing of burner streams by mass, species and enthalpy conservation.
+
+The mixed stream carries the mass flow weighted mass fractions and specific enthalpy of its inlet streams; its
+temperature follows from inverting h(T, Y) on the NASA polynomials of calculations.thermo. Every input is an array
+over a batch of cases, so whole sweeps of (jet, pilot, co-flow) triplets mix in one pass. The streams are taken as
+they are given (e.g. the equilibrium products of the jet and pilot flames and the co-flow N2), nothing is recomputed:
+
+    state = mix_streams(mass_flows, enthalpies, mass_fractions, pressure, get_thermo(species), area=exit_area)
+
+MixedTemperature mixes one case this way; calculations.vectorized.mixing_batch mixes the stream tables of a batch.
+"""
+import numpy as np
+
+from calculations.thermo import get_thermo
+
+
+def mass_fraction_array(compositions, species):
+    """Mass fractions (S, K) of the streams' {species: mass fraction} mappings over `species`"""
+    index = {name: k for k, name in enumerate(species)}
+    Y = np.zeros((len(compositions), len(species)))
+    for s, composition in enumerate(compositions):
+        for name, value in composition.items():
+            Y[s, index[name]] = value
+    return Y
+
+
+def mix_streams(mass_flows, enthalpies, mass_fractions, pressure, thermo, area=None, T0=1000.0):
+    """Mix S streams for each case of a batch.
+
+    Args:
+        mass_flows: Stream mass flows (..., S) [kg/s]
+        enthalpies: Stream specific enthalpies (..., S) [J/kg]
+        mass_fractions: Stream mass fractions (..., S, K) over thermo.species_names
+        pressure: Pressure of the mixed stream (...) [Pa]
+        thermo: IdealGasThermo of the K species
+        area: Flow area of the mixed stream (...) [m^2] for its velocity; None leaves the velocity NaN
+        T0: Start of the temperature iteration (...) [K]
+
+    Returns {name: array} with 'mass_flow', 'enthalpy', 'mass_fractions' (..., K), 'temperature', 'cp', 'density' and
+    'velocity'.
+    """
+    mass_flows = np.asarray(mass_flows, dtype=float)
+    mass_flow = mass_flows.sum(axis=-1)
+    weights = mass_flows / mass_flow[..., None]
+    enthalpy = np.sum(weights * np.asarray(enthalpies, dtype=float), axis=-1)
+    Y = np.sum(weights[..., None] * np.asarray(mass_fractions, dtype=float), axis=-2)
+
+    # Species absent from every stream (e.g. the carbon species of gri30) are left out of the temperature iteration
+    present = np.flatnonzero(np.any(Y != 0, axis=tuple(range(Y.ndim - 1))))
+    if len(present) < len(thermo.species_names):
+        thermo = get_thermo(tuple(thermo.species_names[k] for k in present), thermo.mechanism)
+    Y_present = Y[..., present]
+
+    temperature = thermo.temperature_from_enthalpy(enthalpy, Y_present, T0=T0)
+    density = thermo.density(temperature, pressure, Y_present)
+    velocity = mass_flow / (density * area) if area is not None else np.full(np.shape(mass_flow), np.nan)
+    return {
+        'mass_flow': mass_flow,
+        'enthalpy': enthalpy,
+        'mass_fractions': Y,
+        'temperature': temperature,
+        'cp': thermo.cp_mass(temperature, Y_present),
+        'density': density,
+        'velocity': velocity,
+    }
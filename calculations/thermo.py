@@ -0,0 +1,113 @@
+"""Vectorized ideal gas thermodynamics from the mechanism's NASA 7-coefficient polynomials.
+
+`IdealGasThermo` evaluates cp, h and s of arbitrary mixtures for whole arrays of states at once and inverts h(T) with
+a vectorized Newton iteration. The species data is read from Cantera once per (mechanism, species) set and cached.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from calculations.gas import DEFAULT_MECHANISM, new_solution
+from utils.lazy import lazy_import
+
+ct = lazy_import('cantera')
+
+
+class IdealGasThermo:
+    def __init__(self, species=None, mechanism=DEFAULT_MECHANISM):
+        """Thermo evaluator for `species` (all species of the mechanism if None), ordered as given"""
+        gas = new_solution(mechanism)
+        self.mechanism = mechanism
+        self.species_names = list(species) if species is not None else list(gas.species_names)
+        self.gas_constant = ct.gas_constant  # J/kmol/K
+
+        n = len(self.species_names)
+        self.molecular_weights = np.empty(n)
+        self.t_mid = np.empty(n)
+        self.low = np.empty((n, 7))
+        self.high = np.empty((n, 7))
+        for k, name in enumerate(self.species_names):
+            thermo = gas.species(name).thermo
+            if thermo.n_coeffs != 15:
+                raise ValueError(f'Species {name} does not use NASA 7-coefficient polynomials')
+            coeffs = thermo.coeffs
+            self.t_mid[k] = coeffs[0]
+            self.high[k] = coeffs[1:8]
+            self.low[k] = coeffs[8:15]
+            self.molecular_weights[k] = gas.molecular_weights[gas.species_index(name)]
+
+    def _coefficients(self, T):
+        # (..., K, 7) polynomial coefficients valid at temperature T (...,)
+        T = np.asarray(T, dtype=float)[..., None]
+        use_high = T > self.t_mid
+        return np.where(use_high[..., None], self.high, self.low)
+
+    def cp_R(self, T):
+        """Dimensionless molar heat capacities cp/R of every species, shape (..., K)"""
+        a = self._coefficients(T)
+        T = np.asarray(T, dtype=float)[..., None]
+        return a[..., 0] + T * (a[..., 1] + T * (a[..., 2] + T * (a[..., 3] + T * a[..., 4])))
+
+    def h_RT(self, T):
+        """Dimensionless molar enthalpies h/(RT) of every species, shape (..., K)"""
+        a = self._coefficients(T)
+        T = np.asarray(T, dtype=float)[..., None]
+        return (a[..., 0] + T * (a[..., 1] / 2 + T * (a[..., 2] / 3 + T * (a[..., 3] / 4 + T * a[..., 4] / 5)))
+                + a[..., 5] / T)
+
+    def s_R(self, T):
+        """Dimensionless standard state molar entropies s0/R of every species, shape (..., K)"""
+        a = self._coefficients(T)
+        T = np.asarray(T, dtype=float)[..., None]
+        return (a[..., 0] * np.log(T) + T * (a[..., 1] + T * (a[..., 2] / 2 + T * (a[..., 3] / 3 + T * a[..., 4] / 4)))
+                + a[..., 6])
+
+    def mean_molecular_weight(self, Y):
+        """Mean molecular weight [kg/kmol] from mass fractions (..., K)"""
+        return 1.0 / np.sum(np.asarray(Y) / self.molecular_weights, axis=-1)
+
+    def enthalpy_mass(self, T, Y):
+        """Mixture specific enthalpy [J/kg]"""
+        h_k = self.h_RT(T) * self.gas_constant * np.asarray(T, dtype=float)[..., None] / self.molecular_weights
+        return np.sum(np.asarray(Y) * h_k, axis=-1)
+
+    def cp_mass(self, T, Y):
+        """Mixture specific heat capacity at constant pressure [J/kg/K]"""
+        cp_k = self.cp_R(T) * self.gas_constant / self.molecular_weights
+        return np.sum(np.asarray(Y) * cp_k, axis=-1)
+
+    def density(self, T, P, Y):
+        return np.asarray(P) * self.mean_molecular_weight(Y) / (self.gas_constant * np.asarray(T))
+
+    def temperature_from_enthalpy(self, h, Y, T0=1000.0, tol=1e-6, max_iter=50):
+        """Solve h(T, Y) = h for T with a vectorized Newton iteration"""
+        h = np.asarray(h, dtype=float)
+        T = np.broadcast_to(np.asarray(T0, dtype=float), h.shape).copy()
+        for _ in range(max_iter):
+            residual = self.enthalpy_mass(T, Y) - h
+            step = residual / self.cp_mass(T, Y)
+            T = np.clip(T - step, 200.0, 6000.0)
+            if np.all(np.abs(step) < tol * T):
+                break
+        return T
+
+    def mass_fractions(self, composition):
+        """Mass fraction vector (K,) from a {species: mass fraction} mapping, normalized"""
+        Y = np.zeros(len(self.species_names))
+        for name, value in composition.items():
+            Y[self.species_names.index(name)] = value
+        return Y / Y.sum()
+
+    def mass_fractions_from_moles(self, composition):
+        """Mass fraction vector (K,) from a {species: mole fraction} mapping, normalized"""
+        X = np.zeros(len(self.species_names))
+        for name, value in composition.items():
+            X[self.species_names.index(name)] = value
+        Y = X * self.molecular_weights
+        return Y / Y.sum()
+
+
+@lru_cache(maxsize=None)
+def get_thermo(species=None, mechanism=DEFAULT_MECHANISM):
+    """Cached IdealGasThermo; `species` must be a tuple (or None for the full mechanism)"""
+    return IdealGasThermo(species, mechanism)
@@ -0,0 +1,376 @@
+"""Batched jet, pilot, co-flow and mixing evaluation.
+
+These functions evaluate the same models as JetBurner, PilotBurner, CoFlow and MixedTemperature for whole arrays of
+operating points and geometries at once and return the columnar tables of calculations.results. Densities,
+enthalpies and heat capacities are evaluated exactly (ideal gas law and NASA polynomials); transport properties and
+equilibrium flame states are interpolated from Cantera tables (calculations.property_tables).
+
+All inputs are named like the OperatingParams / GeometryParams fields plus the pilot hole areas, see
+`nominal_parameters`. Every entry may be a scalar or an array; they are broadcast against each other.
+"""
+import dataclasses
+from functools import lru_cache
+
+import numpy as np
+
+from calculations.compressible import jet_flow
+from calculations.fuels import HYDROGEN, blend_composition, lower_heating_value, stoich_air_fuel_ratio
+from calculations.gas import DEFAULT_MECHANISM, new_solution
+from calculations.thermo import get_thermo
+from calculations.property_tables import (table_axis, bounds_of, merge_bounds, gas_transport_table,
+                                          premixed_transport_table, equilibrium_table)
+from calculations.regime_map import TURBULENCE_INTENSITY, FLAME_THICKNESS, karlovitz_number, reference_flame_speed
+from calculations.results import JetBurnerTable, PilotBurnerTable, CoFlowTable, MixingTable
+from calculations.stream_mixing import mix_streams
+from utils.lazy import lazy_import
+
+ct = lazy_import('cantera')
+
+FUEL = HYDROGEN
+OXIDIZER = 'O2:1.0, N2:3.76'
+AIR = 'O2:0.21, N2:0.79'
+NITROGEN = 'N2:1.0'
+STD_TEMPERATURE = 273.15 + 0
+
+STREAMS = ('jet', 'pilot', 'coflow', 'mixing')
+
+# Parameters the batch functions depend on
+BATCH_PARAMETERS = (
+    'jet_ID', 'jet_OD', 'pilot_fuel_ID', 'pilot_burner_ID', 'coflow_ID', 'coflow_OD',
+    'air_hole_area', 'fuel_hole_area',
+    'jet_equivalence_ratio', 'jet_pressure', 'jet_temperature', 'jet_velocity',
+    'pilot_pressure', 'pilot_temperature', 'pilot_air_velocity', 'pilot_fuel_velocity',
+    'coflow_pressure', 'coflow_temperature', 'coflow_velocity',
+)
+
+
+@lru_cache(maxsize=None)
+def _premixed(fuel, oxidizer, mechanism=DEFAULT_MECHANISM):
+    # (thermo, fuel mass fractions, oxidizer mass fractions, stoichiometric oxidizer/fuel mass ratio)
+    gas = new_solution(mechanism)
+    gas.TPX = 300.0, ct.one_atm, fuel
+    fuel_Y = dict(zip(gas.species_names, gas.Y))
+    gas.TPX = 300.0, ct.one_atm, oxidizer
+    oxidizer_Y = dict(zip(gas.species_names, gas.Y))
+    species = tuple(name for name in gas.species_names if fuel_Y[name] > 0 or oxidizer_Y[name] > 0)
+    thermo = get_thermo(species, mechanism)
+    stoich_ratio = gas.stoich_air_fuel_ratio(fuel, oxidizer)
+    return (thermo, np.array([fuel_Y[name] for name in species]), np.array([oxidizer_Y[name] for name in species]),
+            stoich_ratio)
+
+
+@lru_cache(maxsize=None)
+def _pure(composition, mechanism=DEFAULT_MECHANISM):
+    # (thermo, mass fractions) of a fixed composition
+    gas = new_solution(mechanism)
+    gas.TPX = 300.0, ct.one_atm, composition
+    species = tuple(name for name, y in zip(gas.species_names, gas.Y) if y > 0)
+    return get_thermo(species, mechanism), np.array([gas.Y[gas.species_index(name)] for name in species])
+
+
+def premixed_mass_fractions(phi, fuel=FUEL, oxidizer=OXIDIZER, mechanism=DEFAULT_MECHANISM):
+    """Fresh mixture mass fractions (..., K) over the species of `_premixed(fuel, oxidizer, mechanism)[0]`"""
+    _, fuel_Y, oxidizer_Y, stoich_ratio = _premixed(fuel, oxidizer, mechanism)
+    oxidizer_per_fuel = stoich_ratio / np.asarray(phi, dtype=float)[..., None]
+    return (fuel_Y + oxidizer_per_fuel * oxidizer_Y) / (1.0 + oxidizer_per_fuel)
+
+
+def gas_density(composition, temperature, pressure, mechanism=DEFAULT_MECHANISM):
+    thermo, Y = _pure(composition, mechanism)
+    return thermo.density(temperature, pressure, Y)
+
+
+def pilot_stoich_ratio(fuel=FUEL, mechanism=DEFAULT_MECHANISM):
+    # Same (cached) call as PilotBurner
+    return stoich_air_fuel_ratio(fuel, OXIDIZER, mechanism)
+
+
+def pilot_equivalence_ratio(air_hole_area, fuel_hole_area, pilot_pressure, pilot_temperature, pilot_air_velocity,
+                            pilot_fuel_velocity, fuel=FUEL, mechanism=DEFAULT_MECHANISM):
+    """Pilot equivalence ratio from the air and fuel mass flows"""
+    fuel = blend_composition(fuel)
+    mass_flow_air = pilot_air_velocity * air_hole_area * gas_density(AIR, pilot_temperature, pilot_pressure,
+                                                                     mechanism)
+    mass_flow_h2 = pilot_fuel_velocity * fuel_hole_area * gas_density(fuel, pilot_temperature, pilot_pressure,
+                                                                      mechanism)
+    return pilot_stoich_ratio(fuel, mechanism) / (mass_flow_air / mass_flow_h2)
+
+
+def nominal_parameters(geometry, operating, geometry_config='Honeycomb'):
+    """Batch inputs of one case: every OperatingParams and GeometryParams field plus the pilot hole areas"""
+    from geometry.honeycomb_generator import honeycomb_generator
+    from geometry.plate_generator import plate_generator
+
+    if geometry_config == 'Honeycomb':
+        stats = honeycomb_generator(generate_dxf=False, params=geometry)
+    elif geometry_config == 'Plate':
+        stats = plate_generator(generate_dxf=False, params=geometry)
+    else:
+        raise ValueError(f"Unknown geometry config '{geometry_config}'")
+    return {**dataclasses.asdict(geometry), **dataclasses.asdict(operating),
+            'air_hole_area': stats['air_hole_area'], 'fuel_hole_area': stats['fuel_hole_area']}
+
+
+def table_bounds(parameters, fuel=FUEL, mechanism=DEFAULT_MECHANISM):
+    """Property table bounds covering every stream of a batch; pass to evaluate_batch to reuse the tables"""
+    p = {name: np.asarray(value, dtype=float) for name, value in parameters.items()}
+    pilot_phi = pilot_equivalence_ratio(p['air_hole_area'], p['fuel_hole_area'], p['pilot_pressure'],
+                                        p['pilot_temperature'], p['pilot_air_velocity'], p['pilot_fuel_velocity'],
+                                        fuel, mechanism)
+    return merge_bounds(
+        bounds_of(phi=p['jet_equivalence_ratio'], temperature=p['jet_temperature'], pressure=p['jet_pressure']),
+        bounds_of(phi=pilot_phi, temperature=p['pilot_temperature'], pressure=p['pilot_pressure']),
+        bounds_of(temperature=p['coflow_temperature']),
+    )
+
+
+def _broadcast(*arrays):
+    # Common 1-D shape of the batch inputs (tables hold one row per case)
+    return np.broadcast_arrays(*(np.atleast_1d(np.asarray(a, dtype=float)).ravel() for a in arrays))
+
+
+def _flame_properties(phi, temperature, pressure, bounds, fuel, mechanism):
+    # Equilibrium flame state; enthalpy is conserved from the fresh mixture
+    thermo = _premixed(fuel, OXIDIZER, mechanism)[0]
+    table = equilibrium_table(fuel, OXIDIZER, table_axis('phi', *bounds['phi']),
+                              table_axis('temperature', *bounds['temperature']),
+                              table_axis('pressure', *bounds['pressure']), mechanism)
+    state = table(phi, temperature, pressure, names=['temperature', 'molecular_weight'])
+    molecular_weight = state['molecular_weight']
+    enthalpy_mass = thermo.enthalpy_mass(temperature, premixed_mass_fractions(phi, fuel, mechanism=mechanism))
+    return {
+        'flame_density': pressure * molecular_weight / (ct.gas_constant * state['temperature']),
+        'flame_temperature': state['temperature'],
+        'flame_enthalpy_mass': enthalpy_mass,
+        'flame_enthalpy_mole': enthalpy_mass * molecular_weight,
+    }
+
+
+def flame_mass_fractions(phi, temperature, pressure, bounds=None, fuel=FUEL, mechanism=DEFAULT_MECHANISM):
+    """Equilibrium flame mass fractions (N, K) over the species of the mechanism
+    (`get_thermo(mechanism=mechanism).species_names`)
+    """
+    phi, temperature, pressure = _broadcast(phi, temperature, pressure)
+    bounds = bounds or bounds_of(phi=phi, temperature=temperature, pressure=pressure)
+    table = equilibrium_table(blend_composition(fuel), OXIDIZER, table_axis('phi', *bounds['phi']),
+                              table_axis('temperature', *bounds['temperature']),
+                              table_axis('pressure', *bounds['pressure']), mechanism)
+    return table(phi, temperature, pressure, names=['mass_fractions'])['mass_fractions']
+
+
+def jet_batch(jet_ID, jet_equivalence_ratio, jet_pressure, jet_temperature, jet_velocity, bounds=None,
+              turbulence_intensity=TURBULENCE_INTENSITY, flame_thickness=FLAME_THICKNESS, compressible=None,
+              fuel=FUEL, mechanism=DEFAULT_MECHANISM):
+    """JetBurner for arrays of operating points, as a JetBurnerTable
+
+    With `compressible` (calculations.compressible.CompressibleParams) the jet pressure and temperature are the
+    stagnation state and the flows follow from the expanded, possibly choked, jet. `fuel` is H2 or a blend
+    (calculations.fuels); the property tables are cached per quantized blend and per `mechanism`.
+    """
+    fuel = blend_composition(fuel)
+    pipe_ID, phi, pressure, temperature, velocity = _broadcast(jet_ID, jet_equivalence_ratio, jet_pressure,
+                                                               jet_temperature, jet_velocity)
+    bounds = bounds or bounds_of(phi=phi, temperature=temperature, pressure=pressure)
+    flow_area = np.pi * (pipe_ID / 2) ** 2
+
+    thermo, _, _, stoich_ratio = _premixed(fuel, OXIDIZER, mechanism)
+    Y = premixed_mass_fractions(phi, fuel, mechanism=mechanism)
+    Y_h2 = 1.0 / (1.0 + stoich_ratio / phi)
+    static_temperature, static_pressure = temperature, pressure
+    mach_number, choked = np.full(np.shape(phi), np.nan), np.zeros(np.shape(phi))
+    transport_bounds = bounds
+    if compressible is not None:
+        flow = jet_flow(phi, pressure, temperature, velocity, flow_area, compressible, mechanism, fuel)
+        static_temperature, static_pressure = flow['temperature'], flow['pressure']
+        velocity, mach_number, choked = flow['velocity'], flow['mach'], flow['choked']
+        transport_bounds = merge_bounds(bounds, bounds_of(temperature=static_temperature))
+    mixture_density = thermo.density(static_temperature, static_pressure, Y)
+
+    mass_flow_total = velocity * flow_area * mixture_density
+    mass_flow_h2 = mass_flow_total * Y_h2
+    mass_flow_air = mass_flow_total * (1.0 - Y_h2)
+
+    vol_flow_std_h2 = mass_flow_h2 / gas_density(fuel, STD_TEMPERATURE, ct.one_atm, mechanism)
+    vol_flow_std_air = mass_flow_air / gas_density(AIR, STD_TEMPERATURE, ct.one_atm, mechanism)
+
+    transport = premixed_transport_table(fuel, OXIDIZER, table_axis('phi', *transport_bounds['phi']),
+                                         table_axis('temperature', *transport_bounds['temperature']), mechanism)(
+        phi, static_temperature)
+    thermal_diff = transport['thermal_conductivity'] / (mixture_density * thermo.cp_mass(static_temperature, Y))
+    mass_diff = transport['fuel_diffusivity'] / static_pressure
+
+    u_prime = turbulence_intensity * velocity
+    flame = _flame_properties(phi, temperature, pressure, bounds, fuel, mechanism)
+
+    return JetBurnerTable.from_columns(
+        flow_area=flow_area,
+        rho_mix=mixture_density,
+        rho_h2=gas_density(fuel, temperature, pressure, mechanism),
+        rho_air=gas_density(AIR, temperature, pressure, mechanism),
+        mass_flow_total=mass_flow_total,
+        mass_flow_h2=mass_flow_h2,
+        mass_flow_air=mass_flow_air,
+        vol_flow_real_total=mass_flow_total / mixture_density,
+        vol_flow_std_total=vol_flow_std_h2 + vol_flow_std_air,
+        vol_flow_std_h2=vol_flow_std_h2,
+        vol_flow_std_air=vol_flow_std_air,
+        reynolds_number=velocity * pipe_ID * mixture_density / transport['viscosity'],
+        lewis_number=thermal_diff / mass_diff,
+        karlovitz_number=karlovitz_number(u_prime, reference_flame_speed(pressure), flame_thickness, pipe_ID),
+        flame_power=mass_flow_h2 * lower_heating_value(fuel, mechanism),
+        mach_number=mach_number,
+        choked=choked,
+        **flame,
+    )
+
+
+def pilot_batch(air_hole_area, fuel_hole_area, pilot_fuel_ID, pilot_burner_ID, jet_OD, pilot_pressure,
+                pilot_temperature, pilot_air_velocity, pilot_fuel_velocity, bounds=None, fuel=FUEL,
+                mechanism=DEFAULT_MECHANISM):
+    """PilotBurner for arrays of operating points and hole areas, as a PilotBurnerTable"""
+    fuel = blend_composition(fuel)
+    (air_area, fuel_area, fuel_ID, hencken_OD, hencken_ID, pressure, temperature, air_velocity,
+     fuel_velocity) = _broadcast(air_hole_area, fuel_hole_area, pilot_fuel_ID, pilot_burner_ID, jet_OD,
+                                 pilot_pressure, pilot_temperature, pilot_air_velocity, pilot_fuel_velocity)
+    hencken_area = (np.pi * (hencken_OD / 2) ** 2) - (np.pi * (hencken_ID / 2) ** 2)
+
+    rho_air = gas_density(AIR, temperature, pressure, mechanism)
+    rho_h2 = gas_density(fuel, temperature, pressure, mechanism)
+    mass_flow_air = air_velocity * air_area * rho_air
+    mass_flow_h2 = fuel_velocity * fuel_area * rho_h2
+    mass_flow_total = mass_flow_air + mass_flow_h2
+
+    air_volume_flow = mass_flow_air / rho_air
+    fuel_volume_flow = mass_flow_h2 / rho_h2
+    vol_flow_std_air = mass_flow_air / gas_density(AIR, STD_TEMPERATURE, ct.one_atm, mechanism)
+    vol_flow_std_h2 = mass_flow_h2 / gas_density(fuel, STD_TEMPERATURE, ct.one_atm, mechanism)
+
+    phi = pilot_stoich_ratio(fuel, mechanism) / (mass_flow_air / mass_flow_h2)
+    bounds = bounds or bounds_of(phi=phi, temperature=temperature, pressure=pressure)
+    temperature_axis = table_axis('temperature', *bounds['temperature'])
+    mu_air = gas_transport_table(AIR, temperature_axis, mechanism)(temperature, names=['viscosity'])['viscosity']
+    mu_h2 = gas_transport_table(fuel, temperature_axis, mechanism)(temperature, names=['viscosity'])['viscosity']
+
+    thermo = _premixed(fuel, OXIDIZER, mechanism)[0]
+    rho_mix = thermo.density(temperature, pressure, premixed_mass_fractions(phi, fuel, mechanism=mechanism))
+
+    return PilotBurnerTable.from_columns(
+        flow_area_air=air_area,
+        flow_area_fuel=fuel_area,
+        rho_h2=rho_h2,
+        rho_air=rho_air,
+        mass_flow_total=mass_flow_total,
+        mass_flow_h2=mass_flow_h2,
+        mass_flow_air=mass_flow_air,
+        vol_flow_real_total=air_volume_flow + fuel_volume_flow,
+        vol_flow_real_h2=fuel_volume_flow,
+        vol_flow_real_air=air_volume_flow,
+        vol_flow_std_total=vol_flow_std_air + vol_flow_std_h2,
+        vol_flow_std_h2=vol_flow_std_h2,
+        vol_flow_std_air=vol_flow_std_air,
+        reynolds_number_h2=fuel_velocity * fuel_ID * rho_h2 / mu_h2,
+        # Same (area based) definition as PilotBurner
+        reynolds_number_air=air_velocity * air_area * rho_air / mu_air,
+        mixed_velocity=mass_flow_total / hencken_area / rho_mix,
+        rho_mix=rho_mix,
+        flame_power=mass_flow_h2 * lower_heating_value(fuel, mechanism),
+        OF_ratio=mass_flow_air / mass_flow_h2,
+        equivalence_ratio=phi,
+        **_flame_properties(phi, temperature, pressure, bounds, fuel, mechanism),
+    )
+
+
+def coflow_batch(coflow_ID, coflow_OD, coflow_pressure, coflow_temperature, coflow_velocity, bounds=None,
+                 mechanism=DEFAULT_MECHANISM):
+    """CoFlow for arrays of operating points, as a CoFlowTable"""
+    inner, outer, pressure, temperature, velocity = _broadcast(coflow_ID, coflow_OD, coflow_pressure,
+                                                               coflow_temperature, coflow_velocity)
+    bounds = bounds or bounds_of(temperature=temperature)
+    thermo, Y = _pure(NITROGEN, mechanism)
+
+    density = thermo.density(temperature, pressure, Y)
+    viscosity = gas_transport_table(NITROGEN, table_axis('temperature', *bounds['temperature']), mechanism)(
+        temperature, names=['viscosity'])['viscosity']
+    inlet_area = np.pi / 4 * (outer ** 2 - inner ** 2)
+    mass_flow = velocity * inlet_area * density
+
+    return CoFlowTable.from_columns(
+        mass_flow=mass_flow,
+        volume_flow=mass_flow / density,
+        std_volume_flow=mass_flow / thermo.density(STD_TEMPERATURE, ct.one_atm, Y),
+        Re=velocity * (outer - inner) * density / viscosity,
+        enthalpy=thermo.enthalpy_mass(temperature, Y),
+        density=density,
+        dynamic_viscosity=viscosity,
+    )
+
+
+def mix_batch_streams(jet, pilot, coflow, jet_mass_fractions, pilot_mass_fractions, pressure, area=None,
+                      mechanism=DEFAULT_MECHANISM):
+    """Mixed state (calculations.stream_mixing.mix_streams) of batched stream tables.
+
+    Args:
+        jet, pilot, coflow: Stream tables
+        jet_mass_fractions, pilot_mass_fractions: Flame compositions (N, K), see `flame_mass_fractions`
+        pressure: Pressure of the mixed stream [Pa]
+        area: Flow area of the mixed stream [m^2]
+        mechanism: Mechanism of the flame compositions
+    """
+    thermo = get_thermo(mechanism=mechanism)
+    coflow_Y = np.broadcast_to(thermo.mass_fractions_from_moles({'N2': 1.0}), np.shape(jet_mass_fractions))
+    return mix_streams(
+        np.stack([jet.mass_flow_total, pilot.mass_flow_total, coflow.mass_flow], axis=-1),
+        np.stack([jet.flame_enthalpy_mass, pilot.flame_enthalpy_mass, coflow.enthalpy], axis=-1),
+        np.stack([jet_mass_fractions, pilot_mass_fractions, coflow_Y], axis=-2),
+        pressure, thermo, area=area, T0=jet.flame_temperature)
+
+
+def mixing_batch(jet, pilot, coflow, jet_mass_fractions, pilot_mass_fractions, pressure, area=None,
+                 mechanism=DEFAULT_MECHANISM):
+    """MixedTemperature from batched stream tables, as a MixingTable; arguments as for `mix_batch_streams`"""
+    mix = mix_batch_streams(jet, pilot, coflow, jet_mass_fractions, pilot_mass_fractions, pressure, area, mechanism)
+    return MixingTable.from_columns(
+        jet_mass_flow=jet.mass_flow_total,
+        pilot_mass_flow=pilot.mass_flow_total,
+        coflow_mass_flow=coflow.mass_flow,
+        total_mass_flow=mix['mass_flow'],
+        mixed_temp=mix['temperature'],
+        mixed_enthalpy=mix['enthalpy'],
+        mixed_cp=mix['cp'],
+        mixed_velocity=mix['velocity'],
+    )
+
+
+def evaluate_batch(parameters, streams=STREAMS, bounds=None, compressible=None, fuel=FUEL,
+                   mechanism=DEFAULT_MECHANISM):
+    """Evaluate the streams for a batch of parameters (see `nominal_parameters`), {stream: ResultTable}.
+
+    Mixing needs all three stream tables and evaluates them even if they are not requested. `compressible` selects the
+    compressible jet model (see `jet_batch`), `fuel` the fuel of the jet and pilot (H2 or a blend), `mechanism` the
+    Cantera mechanism of the thermo data and property tables (calculations.gas).
+    """
+    names = list(parameters)
+    p = dict(zip(names, _broadcast(*(parameters[name] for name in names))))
+    bounds = bounds or table_bounds(p, fuel, mechanism)
+    results = {}
+    if 'jet' in streams or 'mixing' in streams:
+        results['jet'] = jet_batch(p['jet_ID'], p['jet_equivalence_ratio'], p['jet_pressure'], p['jet_temperature'],
+                                   p['jet_velocity'], bounds, compressible=compressible, fuel=fuel,
+                                   mechanism=mechanism)
+    if 'pilot' in streams or 'mixing' in streams:
+        results['pilot'] = pilot_batch(p['air_hole_area'], p['fuel_hole_area'], p['pilot_fuel_ID'],
+                                       p['pilot_burner_ID'], p['jet_OD'], p['pilot_pressure'],
+                                       p['pilot_temperature'], p['pilot_air_velocity'], p['pilot_fuel_velocity'],
+                                       bounds, fuel=fuel, mechanism=mechanism)
+    if 'coflow' in streams or 'mixing' in streams:
+        results['coflow'] = coflow_batch(p['coflow_ID'], p['coflow_OD'], p['coflow_pressure'],
+                                         p['coflow_temperature'], p['coflow_velocity'], bounds, mechanism)
+    if 'mixing' in streams:
+        results['mixing'] = mixing_batch(
+            results['jet'], results['pilot'], results['coflow'],
+            flame_mass_fractions(p['jet_equivalence_ratio'], p['jet_temperature'], p['jet_pressure'], bounds, fuel,
+                                 mechanism),
+            flame_mass_fractions(results['pilot'].equivalence_ratio, p['pilot_temperature'], p['pilot_pressure'],
+                                 bounds, fuel, mechanism),
+            p['jet_pressure'], np.pi / 4 * p['coflow_OD'] ** 2, mechanism)
+    return {stream: results[stream] for stream in streams}
@@ -0,0 +1,337 @@
+"""Fuel hole placement patterns on the hexagonal pilot grid.
+
+A pattern decides, for every site (q, r) of the grid, whether it carries a fuel hole. Patterns are evaluated as NumPy
+boolean masks over whole coordinate arrays, so a layout costs a handful of array operations instead of one Python call
+per site, and many candidate layouts can be generated and scored together:
+
+    patterns = [*modular_patterns(periods=(2, 3, 4)), *ring_patterns(max_ring=8)]
+    scores = score_patterns(patterns, 'Honeycomb')
+    best = patterns[int(np.argmin(scores.local_ratio_cv))]
+
+Patterns are frozen dataclasses (hashable, printable) and combine with `|`, `&` and `-`. The centre site always
+belongs to the central jet and is never a fuel position.
+"""
+import dataclasses
+import itertools
+import math
+
+import numpy as np
+
+from utils.lazy import lazy_import
+
+shapely = lazy_import('shapely')
+
+
+def hex_distance(q, r):
+    """Number of lattice steps from the centre to (q, r)"""
+    q, r = np.asarray(q), np.asarray(r)
+    return np.maximum(np.maximum(np.abs(q), np.abs(r)), np.abs(q + r))
+
+
+def ring_position(q, r):
+    """Position of (q, r) along its hexagonal ring, counted counter-clockwise from (d, -d); 0 at the centre"""
+    q, r = np.asarray(q), np.asarray(r)
+    d = hex_distance(q, r)
+    return np.select(
+        [d == 0,
+         (q == d) & (r < 0),
+         (q + r == d) & (q > 0),
+         (r == d) & (q <= 0),
+         (q == -d) & (r > 0),
+         (q + r == -d) & (q < 0)],
+        [0, r + d, 2 * d - q, 2 * d - q, 4 * d - r, 5 * d + q],
+        default=5 * d + q)
+
+
+class FuelPattern:
+    """Base class of the placement rules; subclasses implement `_select`"""
+
+    def mask(self, q, r):
+        """Boolean array, True where the site (q, r) carries a fuel hole"""
+        q, r = np.asarray(q), np.asarray(r)
+        return self._select(q, r) & ((q != 0) | (r != 0))
+
+    def _select(self, q, r):
+        raise NotImplementedError
+
+    def __or__(self, other):
+        return Combined('or', self, other)
+
+    def __and__(self, other):
+        return Combined('and', self, other)
+
+    def __sub__(self, other):
+        return Combined('sub', self, other)
+
+
+@dataclasses.dataclass(frozen=True)
+class ModularPattern(FuelPattern):
+    """Regular sub-lattice: fuel where (q + shear * r - q_phase) % q_period == 0 and (r - r_phase) % r_period == 0
+
+    The defaults give the original pattern, fuel on every second site of every second row. shear=1 with both periods 3
+    (or q_period=3, r_period=1, shear=2) gives the layout in which every air cell touches exactly one fuel hole.
+    """
+    q_period: int = 2
+    r_period: int = 2
+    q_phase: int = 0
+    r_phase: int = 0
+    shear: int = 0
+
+    def _select(self, q, r):
+        return ((q + self.shear * r - self.q_phase) % self.q_period == 0) & ((r - self.r_phase) % self.r_period == 0)
+
+
+@dataclasses.dataclass(frozen=True)
+class RingPattern(FuelPattern):
+    """Fuel on selected hexagonal rings, on every `spacing`-th site along each ring
+
+    Attributes:
+    ----------
+    rings: tuple
+        Ring numbers (lattice steps from the centre) that carry fuel.
+    spacing: int
+        Fuel on every `spacing`-th site along a ring.
+    phase: int
+        Position along the ring of the first fuel site.
+    """
+    rings: tuple = (2, 4, 6, 8)
+    spacing: int = 1
+    phase: int = 0
+
+    def _select(self, q, r):
+        on_ring = np.isin(hex_distance(q, r), self.rings)
+        return on_ring & ((ring_position(q, r) - self.phase) % self.spacing == 0)
+
+
+@dataclasses.dataclass(frozen=True)
+class GradedPattern(FuelPattern):
+    """Density-graded layout: a different pattern per radial band
+
+    Attributes:
+    ----------
+    bands: tuple
+        ((outer ring, pattern), ...) in increasing ring order; a site uses the pattern of the first band whose outer
+        ring is at or beyond its own ring, sites outside the last band carry no fuel.
+    """
+    bands: tuple = ((4, ModularPattern(2, 2)), (math.inf, ModularPattern(3, 3, shear=1)))
+
+    def _select(self, q, r):
+        ring = hex_distance(q, r)
+        selected = np.zeros(np.shape(q), dtype=bool)
+        inner = -1
+        for outer, pattern in self.bands:
+            band = (ring > inner) & (ring <= outer)
+            selected |= band & pattern.mask(q, r)
+            inner = outer
+        return selected
+
+
+@dataclasses.dataclass(frozen=True)
+class MaskPattern(FuelPattern):
+    """Explicit list of fuel sites
+
+    Attributes:
+    ----------
+    positions: frozenset
+        (q, r) pairs that carry fuel.
+    """
+    positions: frozenset = frozenset()
+
+    def _select(self, q, r):
+        if not self.positions:
+            return np.zeros(np.shape(q), dtype=bool)
+        keys = np.array(sorted(self.positions), dtype=np.int64)
+        return np.isin(_key(q, r), _key(keys[:, 0], keys[:, 1]))
+
+    @classmethod
+    def from_mask(cls, q, r, mask):
+        """Pattern of the sites where `mask` is set, e.g. the result of another pattern edited by hand"""
+        mask = np.asarray(mask, dtype=bool)
+        return cls(frozenset(zip(np.asarray(q)[mask].tolist(), np.asarray(r)[mask].tolist())))
+
+
+@dataclasses.dataclass(frozen=True)
+class Combined(FuelPattern):
+    """Union ('or'), intersection ('and') or difference ('sub') of two patterns"""
+    operation: str
+    left: FuelPattern
+    right: FuelPattern
+
+    def _select(self, q, r):
+        left, right = self.left.mask(q, r), self.right.mask(q, r)
+        if self.operation == 'or':
+            return left | right
+        if self.operation == 'and':
+            return left & right
+        if self.operation == 'sub':
+            return left & ~right
+        raise ValueError(f"Unknown pattern operation '{self.operation}'")
+
+
+def _key(q, r):
+    # One int64 per site for set membership tests
+    return (np.asarray(q, dtype=np.int64) << 32) + np.asarray(r, dtype=np.int64)
+
+
+DEFAULT_PATTERN = ModularPattern()
+
+PATTERNS = {
+    'default': DEFAULT_PATTERN,
+    'sparse': ModularPattern(3, 3, shear=1),
+    'rings': RingPattern(),
+    'graded': GradedPattern(),
+}
+
+
+def get_pattern(pattern):
+    """Resolve a pattern name from PATTERNS; FuelPattern instances and None (the default) pass through"""
+    if pattern is None:
+        return DEFAULT_PATTERN
+    if isinstance(pattern, FuelPattern):
+        return pattern
+    if pattern not in PATTERNS:
+        raise ValueError(f"Unknown fuel pattern '{pattern}'")
+    return PATTERNS[pattern]
+
+
+def modular_patterns(periods=(2, 3), shears=(0, 1)):
+    """Every modular pattern with the given periods and shears, over all distinct phases"""
+    for q_period, r_period, shear in itertools.product(periods, periods, shears):
+        for q_phase, r_phase in itertools.product(range(q_period), range(r_period)):
+            yield ModularPattern(q_period, r_period, q_phase, r_phase, shear)
+
+
+def ring_patterns(max_ring=8, ring_steps=(1, 2, 3), spacings=(1, 2)):
+    """Ring patterns with evenly stepped rings (starting at each possible first ring) and site spacings"""
+    for step, spacing in itertools.product(ring_steps, spacings):
+        for first in range(1, step + 1):
+            yield RingPattern(tuple(range(first, max_ring + 1, step)), spacing)
+
+
+def pattern_masks(patterns, q, r):
+    """(number of patterns, number of sites) boolean matrix of the fuel positions of every pattern"""
+    q, r = np.asarray(q), np.asarray(r)
+    return np.stack([get_pattern(pattern).mask(q, r) for pattern in patterns])
+
+
+@dataclasses.dataclass
+class PatternScores:
+    """Batch scores of candidate fuel patterns, one entry per pattern
+
+    Attributes:
+    ----------
+    patterns: list
+        The scored patterns.
+    fuel_hole_number: np.ndarray
+        Fuel holes inside the burner boundary.
+    fuel_hole_area, air_hole_area: np.ndarray
+        Total fuel and air hole areas [m^2], as in calculate_hole_statistics.
+    air_to_fuel_area_ratio: np.ndarray
+        Air to fuel area ratio.
+    nearest_fuel_max, nearest_fuel_mean: np.ndarray
+        Largest and air-area weighted mean distance from an air hole to its closest fuel hole [m].
+    local_ratio_cv: np.ndarray
+        Air-area weighted coefficient of variation of the neighbourhood fuel to air area ratio, a measure of how
+        unevenly the fuel is spread over the air.
+    """
+    patterns: list
+    fuel_hole_number: np.ndarray
+    fuel_hole_area: np.ndarray
+    air_hole_area: np.ndarray
+    air_to_fuel_area_ratio: np.ndarray
+    nearest_fuel_max: np.ndarray
+    nearest_fuel_mean: np.ndarray
+    local_ratio_cv: np.ndarray
+
+
+def score_patterns(patterns, geometry_config='Honeycomb', params=None, radius=1):
+    """Score many fuel patterns on one grid without regenerating the Shapely geometry per pattern.
+
+    The air holes of the pattern-free grid are generated once; for each pattern the fuel holes inside the boundary,
+    the air area they take away and the lattice metrics of geometry.lattice are evaluated as (patterns x sites)
+    arrays.
+
+    Args:
+        patterns: FuelPattern instances or names from PATTERNS
+        geometry_config: 'Honeycomb' or 'Plate'
+        params: GeometryParams
+        radius: Neighbourhood radius in lattice steps for the local area ratio
+    """
+    from input_parameters.parameters import GeometryParams
+    from geometry.geometry_utils import cubic_to_cartesian
+    from geometry.hole_arrays import hole_arrays
+    from geometry.lattice import HexLattice, disc_offsets
+
+    params = params or GeometryParams()
+    patterns = list(patterns)
+    if geometry_config == 'Honeycomb':
+        from geometry.honeycomb_generator import HexGrid
+    elif geometry_config == 'Plate':
+        from geometry.plate_generator import HexGrid
+    else:
+        raise ValueError(f"Unknown geometry config '{geometry_config}'")
+
+    grid = HexGrid(params)
+    q, r, _ = np.array(grid.cubic_coords).T
+    lattice = HexLattice(q, r, grid.center_distance)
+    q, r = lattice.q, lattice.r
+    centers = lattice.centers()
+
+    # Sites where a fuel hole fits inside the boundary, with the same test as generate_fuel_holes
+    fuel_circles = shapely.buffer(shapely.points(centers), params.pilot_fuel_ID / 2, quad_segs=16)
+    if geometry_config == 'Honeycomb':
+        fits = shapely.contains(grid.generate_burner_boundary(), fuel_circles)
+        fuel_hole_size = math.pi * (params.pilot_fuel_ID / 2) ** 2
+    else:
+        fits = shapely.contains(grid.boundary_polygon, fuel_circles)
+        fuel_hole_size = float(shapely.area(fuel_circles[0]))
+    fuel = pattern_masks(patterns, q, r) & fits
+
+    # Air holes of the grid without fuel, per site
+    arrays = hole_arrays(geometry_config, params, fuel_pattern=MaskPattern())
+    base_air = np.bincount(lattice.locate(*arrays['air_centers'].T), weights=arrays['air_areas'],
+                           minlength=len(lattice))
+    if geometry_config == 'Honeycomb':
+        # Fuel tubes and the central jet sit inside the cells
+        fuel_od_size = math.pi * (params.pilot_fuel_OD / 2) ** 2
+        jet_od_size = math.pi * (params.jet_OD / 2) ** 2
+        jet = np.zeros(len(lattice))
+        jet[lattice.lookup(0, 0)] = jet_od_size
+        air = np.maximum(base_air - fuel * fuel_od_size - jet, 0.0)
+        air_total = base_air.sum() - fuel.sum(axis=1) * fuel_od_size - jet_od_size
+    else:
+        # Air holes overlapping a fuel hole are dropped
+        offsets = disc_offsets(2)
+        x, y = cubic_to_cartesian(offsets[:, 0], offsets[:, 1], -offsets.sum(axis=1),
+                                  grid.center_distance / math.sqrt(3))
+        overlapping = offsets[np.hypot(x, y) < (params.pilot_air_ID + params.pilot_fuel_ID) / 2]
+        blocked = np.zeros_like(fuel)
+        padded = np.concatenate([fuel, np.zeros((len(patterns), 1), dtype=bool)], axis=1)
+        for dq, dr in overlapping:
+            blocked |= padded[:, lattice.lookup(q + dq, r + dr)]
+        air = np.where(blocked, 0.0, base_air)
+        air_total = air.sum(axis=1)
+
+    fuel_area = fuel * fuel_hole_size
+    fuel_total = fuel_area.sum(axis=1)
+    has_air = air > 0
+    air_sum = air.sum(axis=1)
+    distance, _ = lattice.nearest(fuel)
+
+    # Neighbourhood sums as one sparse product for all patterns
+    neighborhood = lattice.neighborhood_matrix(radius)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        local_ratio = np.where(has_air, (neighborhood @ fuel_area.T).T / (neighborhood @ air.T).T, 0.0)
+        mean = (air * local_ratio).sum(axis=1) / air_sum
+        std = np.sqrt((air * (local_ratio - mean[:, None]) ** 2).sum(axis=1) / air_sum)
+
+        return PatternScores(
+            patterns=patterns,
+            fuel_hole_number=fuel.sum(axis=1),
+            fuel_hole_area=fuel_total,
+            air_hole_area=air_total,
+            air_to_fuel_area_ratio=np.where(fuel_total > 0, air_total / fuel_total, np.inf),
+            nearest_fuel_max=np.where(has_air, distance, 0.0).max(axis=1),
+            nearest_fuel_mean=(air * np.where(has_air, distance, 0.0)).sum(axis=1) / air_sum,
+            local_ratio_cv=std / mean,
+        )
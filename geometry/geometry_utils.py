@@ -1,15 +1,16 @@
 import math
-import shapely.geometry
 
+import numpy as np
 
-def is_fuel_position_cubic(q, r):
-    return (q, r) != (0, 0) and ((r % 4 == 0 and q % 2 == 0) or (r % 4 == 2 and q % 2 == 0))
+from geometry.fuel_patterns import DEFAULT_PATTERN
+from utils.lazy import lazy_import
+
+shapely = lazy_import('shapely')
 
 
-def is_fuel_position_cartesian(self, x, y):
-    i = round(y / self.row_height)
-    j = round(x / self.center_distance - (0.5 if i % 2 else 0))
-    return (i, j) != (0, 0) and ((i % 4 == 0 and j % 2 == 0) or (i % 4 == 2 and j % 2 == 1))
+def is_fuel_position_cubic(q, r):
+    """Default fuel placement rule at (q, r); see geometry.fuel_patterns for vectorized and alternative patterns"""
+    return bool(DEFAULT_PATTERN.mask(q, r))
 
 
 def cubic_to_cartesian(q, r, s, center_distance):
@@ -30,6 +31,34 @@ def cubic_to_cartesian(q, r, s, center_distance):
     return x, y
 
 
+def cartesian_to_cubic(x, y, center_distance):
+    """
+    Convert Cartesian coordinates (x, y) to the cubic coordinates (q, r, s) of the hexagon containing them.
+    Inverse of cubic_to_cartesian; works on scalars and NumPy arrays.
+
+    Parameters:
+    x (float or np.ndarray): Cartesian x coordinate(s)
+    y (float or np.ndarray): Cartesian y coordinate(s)
+    center_distance (float): Same scale as passed to cubic_to_cartesian (hexagon circumradius)
+
+    Returns:
+    tuple: Integer cubic coordinates (q, r, s)
+    """
+    q = (math.sqrt(3) / 3 * np.asarray(x) - np.asarray(y) / 3) / center_distance
+    r = (2 / 3 * np.asarray(y)) / center_distance
+    s = -q - r
+
+    # Round to the nearest hexagon and fix the component with the largest rounding error
+    q_round, r_round, s_round = np.round(q), np.round(r), np.round(s)
+    dq, dr, ds = np.abs(q_round - q), np.abs(r_round - r), np.abs(s_round - s)
+    fix_q = (dq > dr) & (dq > ds)
+    fix_r = ~fix_q & (dr > ds)
+    q_round = np.where(fix_q, -r_round - s_round, q_round)
+    r_round = np.where(fix_r, -q_round - s_round, r_round)
+    s_round = -q_round - r_round
+    return q_round.astype(int), r_round.astype(int), s_round.astype(int)
+
+
 def generate_hexagon(center, radius):
     """
     Generate the vertices of a pointy-topped hexagon oriented with a vertex pointing upward.
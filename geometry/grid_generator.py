@@ -1,5 +1,7 @@
 import math
 
+from utils.instrumentation import instrumented
+
 
 class HexagonalGridGenerator:
     """Generates a hexagonal grid coordinates for a given boundary and center distance
@@ -12,6 +14,7 @@ class HexagonalGridGenerator:
         self.center_distance = center_distance
         self.boundary = boundary
 
+    @instrumented('grid_generation')
     def generate_coordinates(self):
         grid_radius = math.ceil((self.boundary / 2) / self.center_distance)
         size = self.center_distance / math.sqrt(3)  # radius of the outer circle of the middle hexagon
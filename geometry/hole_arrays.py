@@ -0,0 +1,76 @@
+"""Flat NumPy representation of the pilot hole pattern.
+
+The Shapely geometries from the generators are converted into arrays per hole type ('air', 'fuel', 'fuel_od', 'jet',
+'jet_od'): `<type>_xy` holds the exterior coordinates of all outlines stacked, `<type>_offsets` the start index of
+each outline in `<type>_xy` (with the total count appended), and `<type>_centers` / `<type>_areas` the centroid and
+area of every hole. These arrays can be sent between processes through shared memory and plotted directly.
+"""
+import numpy as np
+
+from geometry.honeycomb_generator import get_hole_coordinates as honeycomb_coordinates
+from geometry.plate_generator import get_hole_coordinates as plate_coordinates
+from utils.lazy import lazy_import
+from utils.shared_memory import SharedArrays
+
+shapely = lazy_import('shapely')
+
+HOLE_TYPES = ('air', 'fuel', 'fuel_od', 'jet', 'jet_od')
+
+
+def _polygon_arrays(prefix, polygons):
+    polygons = np.asarray(polygons, dtype=object)
+    if len(polygons):
+        xy, index = shapely.get_coordinates(shapely.get_exterior_ring(polygons), return_index=True)
+        centers = shapely.get_coordinates(shapely.centroid(polygons))
+        areas = shapely.area(polygons)
+    else:
+        xy, index = np.empty((0, 2)), np.empty(0, dtype=np.int64)
+        centers, areas = np.empty((0, 2)), np.empty(0)
+    offsets = np.zeros(len(polygons) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(index, minlength=len(polygons)), out=offsets[1:])
+    return {
+        f'{prefix}_xy': xy,
+        f'{prefix}_offsets': offsets,
+        f'{prefix}_centers': centers,
+        f'{prefix}_areas': areas,
+    }
+
+
+def hole_arrays(geometry_config, params=None, fuel_pattern=None):
+    """Outlines, centres and areas of every hole of the 'Honeycomb' or 'Plate' pattern.
+
+    `fuel_pattern` selects the fuel placement (a name or instance from geometry.fuel_patterns), default if None.
+    """
+    if geometry_config == 'Honeycomb':
+        air_holes, fuel_holes, central_jet = honeycomb_coordinates(params, fuel_pattern)
+        fuel = [fuel_hole['circle'] for fuel_hole in fuel_holes]
+        fuel_od = [fuel_hole['od_circle'] for fuel_hole in fuel_holes]
+        jet, jet_od = [central_jet['circle']], [central_jet['od_circle']]
+    elif geometry_config == 'Plate':
+        air_holes, fuel, central_jet = plate_coordinates(params, fuel_pattern)
+        fuel_od, jet, jet_od = [], [central_jet], []
+    else:
+        raise ValueError(f"Unknown geometry config '{geometry_config}'")
+
+    arrays = {}
+    for prefix, polygons in zip(HOLE_TYPES, (air_holes, fuel, fuel_od, jet, jet_od)):
+        arrays.update(_polygon_arrays(prefix, polygons))
+    return arrays
+
+
+def outlines(arrays, prefix):
+    """Split the stacked outline coordinates of one hole type into one (n, 2) view per hole"""
+    offsets = arrays[f'{prefix}_offsets']
+    return np.split(arrays[f'{prefix}_xy'], offsets[1:-1])
+
+
+def share_hole_arrays(geometry_config, params=None, fuel_pattern=None):
+    """Compute the hole arrays into a shared memory block and return its descriptor.
+
+    Meant to run in a worker process; ownership of the block passes to whoever attaches with
+    `SharedArrays.attach(descriptor, owner=True)`.
+    """
+    shared = SharedArrays.from_arrays(hole_arrays(geometry_config, params, fuel_pattern))
+    descriptor = shared.descriptor
+    shared.close()
+    return descriptor
@@ -1,15 +1,20 @@
 from input_parameters.parameters import GeometryParams
 from geometry.grid_generator import HexagonalGridGenerator
-import shapely.geometry
 import math
-from geometry.geometry_utils import is_fuel_position_cubic, cubic_to_cartesian
-import ezdxf
+from geometry.geometry_utils import cubic_to_cartesian
+from geometry.fuel_patterns import get_pattern
 import os
 from datetime import datetime
+from utils.instrumentation import instrumented, count
+from utils.lazy import lazy_import
+import numpy as np
+
+shapely = lazy_import('shapely')
+ezdxf = lazy_import('ezdxf')
 
 
 class HexGrid:
-    def __init__(self, params: GeometryParams):
+    def __init__(self, params: GeometryParams, fuel_pattern=None):
         for key, value in params.__dict__.items():
             setattr(self, key, value)
 
@@ -26,27 +31,40 @@ class HexGrid:
         self.cartesian_coords = coordinates['cartesian_coordinates']
         self.cubic_coords = coordinates['cubic_coordinates']
 
+        self.fuel_pattern = get_pattern(fuel_pattern)
         self.boundary_polygon = shapely.geometry.Point(0, 0).buffer(self.boundary / 2)
 
+    @instrumented('hole_placement')
     def generate_air_holes(self, fuel_holes, central_jet):
         hexagons = []
         radius = self.pilot_air_ID / math.sqrt(3)  # Use inner radius
         burner_boundary = self.generate_burner_boundary()
+        ops = 0
         for coord in self.cubic_coords:
             cart_coord = cubic_to_cartesian(coord[0], coord[1], coord[2], self.center_distance / math.sqrt(3))
             hexagon = shapely.geometry.Polygon(self._create_hexagon(cart_coord, radius))
+            ops += 1
             if hexagon.intersects(burner_boundary):
                 hexagon = hexagon.intersection(burner_boundary)
-            if not any(hexagon.intersects(fuel_hole['circle']) for fuel_hole in
-                       fuel_holes) and self.boundary_polygon.contains(hexagon):
-                hexagons.append(hexagon)
+                ops += 1
+            # Index of the first fuel hole the cell overlaps; the fuel holes after it are not tested
+            hit = next((i for i, fuel_hole in enumerate(fuel_holes) if hexagon.intersects(fuel_hole['circle'])), None)
+            ops += len(fuel_holes) if hit is None else hit + 1
+            if hit is None:
+                ops += 1
+                if self.boundary_polygon.contains(hexagon):
+                    hexagons.append(hexagon)
+        count('shapely_ops', ops)
         return hexagons
 
+    @instrumented('hole_placement')
     def generate_fuel_holes(self, fuel_positions):
         circles = []
         radius = self.pilot_fuel_ID / 2
         od_radius = self.pilot_fuel_OD / 2
         burner_boundary = self.generate_burner_boundary()
+        # Two buffers and one containment test per position
+        count('shapely_ops', 3 * len(fuel_positions))
         for coord in fuel_positions:
             point = shapely.geometry.Point(coord)
             circle = point.buffer(radius)
@@ -77,13 +95,13 @@ class HexGrid:
         central_jet_od = shapely.geometry.Point(0, 0).buffer(od_radius)
         return {'circle': central_jet, 'od_circle': central_jet_od}
 
+    @instrumented('hole_placement')
     def check_fuel_positions(self):
-        fuel_positions_cubic = []
-        for coord in self.cubic_coords:
-            if is_fuel_position_cubic(coord[0], coord[1]):
-                fuel_positions_cubic.append(coord)
-        return fuel_positions_cubic
+        q, r = np.array(self.cubic_coords)[:, :2].T
+        is_fuel = self.fuel_pattern.mask(q, r)
+        return [coord for coord, fuel in zip(self.cubic_coords, is_fuel) if fuel]
 
+    @instrumented('dxf')
     def export_to_dxf(self, air_holes, fuel_holes, central_jet, filename):
         doc = ezdxf.new()
         msp = doc.modelspace()
@@ -117,12 +135,14 @@ class HexGrid:
 
         doc.saveas(filename)
 
+    @instrumented('statistics')
     def calculate_hole_statistics(self, air_holes, fuel_holes):
         # Calculate fuel hole area
         fuel_hole_area = len(fuel_holes) * (math.pi * (self.pilot_fuel_ID / 2) ** 2)
 
         # Calculate total hexagon area inside the boundary, including partial hexagons
         total_hex_area = sum(hexagon.intersection(self.boundary_polygon).area for hexagon in air_holes)
+        count('shapely_ops', len(air_holes))
 
         # Subtract the area of the fuel holes (using outer diameter)
         total_fuel_hole_od_area = len(fuel_holes) * (math.pi * (self.pilot_fuel_OD / 2) ** 2)
@@ -150,9 +170,9 @@ class HexGrid:
         }
 
 
-def honeycomb_generator(generate_dxf=False):
-    params = GeometryParams()
-    hex_grid = HexGrid(params)
+def honeycomb_generator(generate_dxf=False, params=None, fuel_pattern=None):
+    params = params or GeometryParams()
+    hex_grid = HexGrid(params, fuel_pattern)
 
     fuel_positions_cubic = hex_grid.check_fuel_positions()
     fuel_positions_cartesian = [cubic_to_cartesian(q, r, s, hex_grid.center_distance / math.sqrt(3)) for q, r, s in
@@ -171,9 +191,9 @@ def honeycomb_generator(generate_dxf=False):
     return stats
 
 
-def get_hole_coordinates():
-    params = GeometryParams()
-    hex_grid = HexGrid(params)
+def get_hole_coordinates(params=None, fuel_pattern=None):
+    params = params or GeometryParams()
+    hex_grid = HexGrid(params, fuel_pattern)
 
     central_jet = hex_grid.generate_central_jet()
     air_holes = hex_grid.generate_air_holes([], central_jet)
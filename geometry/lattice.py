@@ -0,0 +1,276 @@
+"""Hexagonal lattice index of the pilot pattern and mixing uniformity metrics.
+
+Every air and fuel hole of the generators sits on a site of the hexagonal grid. `HexLattice` maps the integer axial
+coordinates (q, r) of the occupied sites to array offsets through a dense index table, so looking up a site or its six
+neighbours is a single array access, and neighbourhood sums are a handful of vectorized gathers instead of pairwise
+Shapely distance queries.
+
+Example:
+    metrics = mixing_uniformity('Honeycomb', radius=2)
+    print(metrics.phi_std, metrics.nearest_fuel_distance.max())
+"""
+import dataclasses
+import math
+
+import numpy as np
+
+from input_parameters.parameters import GeometryParams, OperatingParams
+from geometry.geometry_utils import cartesian_to_cubic, cubic_to_cartesian
+from geometry.hole_arrays import hole_arrays
+from utils.instrumentation import count
+from utils.lazy import lazy_import
+
+shapely = lazy_import('shapely')
+
+# Axial offsets of the six neighbours
+NEIGHBOR_OFFSETS = np.array([(1, 0), (1, -1), (0, -1), (-1, 0), (-1, 1), (0, 1)])
+
+
+def disc_offsets(radius):
+    """Axial offsets of all sites within `radius` lattice steps, including (0, 0)"""
+    dq, dr = np.meshgrid(np.arange(-radius, radius + 1), np.arange(-radius, radius + 1), indexing='ij')
+    inside = np.maximum(np.maximum(np.abs(dq), np.abs(dr)), np.abs(dq + dr)) <= radius
+    return np.stack([dq[inside], dr[inside]], axis=1)
+
+
+class HexLattice:
+    """Dense (q, r) -> index table over the occupied sites of a hexagonal grid"""
+
+    def __init__(self, q, r, center_distance):
+        """
+        Args:
+            q, r: Axial coordinates of the sites; duplicates are merged
+            center_distance: Distance between adjacent site centres
+        """
+        sites = np.unique(np.stack([np.asarray(q, dtype=int), np.asarray(r, dtype=int)], axis=1), axis=0)
+        self.q, self.r = sites[:, 0], sites[:, 1]
+        self.center_distance = center_distance
+        self.q_min, self.r_min = int(self.q.min()), int(self.r.min())
+
+        # One spare row/column of -1 around the sites, so offsets by one step never need bounds checks
+        shape = (int(self.q.max()) - self.q_min + 3, int(self.r.max()) - self.r_min + 3)
+        self.index = np.full(shape, -1, dtype=np.intp)
+        self.index[self.q - self.q_min + 1, self.r - self.r_min + 1] = np.arange(len(self.q))
+
+    @classmethod
+    def from_cartesian(cls, x, y, center_distance):
+        """Lattice of the sites containing the points (x, y)"""
+        q, r, _ = cartesian_to_cubic(x, y, center_distance / math.sqrt(3))
+        return cls(q, r, center_distance)
+
+    def __len__(self):
+        return len(self.q)
+
+    def lookup(self, q, r):
+        """Site index of (q, r), -1 where the site is not occupied"""
+        q = np.asarray(q) - self.q_min + 1
+        r = np.asarray(r) - self.r_min + 1
+        inside = (q >= 0) & (q < self.index.shape[0]) & (r >= 0) & (r < self.index.shape[1])
+        result = np.full(np.shape(q), -1, dtype=np.intp)
+        result[inside] = self.index[q[inside], r[inside]]
+        return result
+
+    def locate(self, x, y):
+        """Site index of the sites containing the points (x, y), -1 outside the lattice"""
+        q, r, _ = cartesian_to_cubic(x, y, self.center_distance / math.sqrt(3))
+        return self.lookup(q, r)
+
+    def centers(self):
+        """Cartesian centres (n, 2) of the sites"""
+        x, y = cubic_to_cartesian(self.q, self.r, -self.q - self.r, self.center_distance / math.sqrt(3))
+        return np.stack([x, y], axis=1)
+
+    def neighbors(self):
+        """(n, 6) indices of the six neighbours of every site, -1 where unoccupied"""
+        return self.index[self.q[:, None] + NEIGHBOR_OFFSETS[:, 0] - self.q_min + 1,
+                          self.r[:, None] + NEIGHBOR_OFFSETS[:, 1] - self.r_min + 1]
+
+    def neighborhood(self, radius):
+        """(n, m) indices of all sites within `radius` steps of every site, -1 where unoccupied"""
+        offsets = disc_offsets(radius)
+        return self.lookup(self.q[:, None] + offsets[:, 0], self.r[:, None] + offsets[:, 1])
+
+    def neighborhood_sum(self, values, radius):
+        """Sum of per-site `values` over the neighbourhood of every site"""
+        values = np.asarray(values, dtype=float)
+        padded = np.append(values, 0.0)  # index -1 picks the zero
+        return padded[self.neighborhood(radius)].sum(axis=1)
+
+    def neighborhood_matrix(self, radius):
+        """Sparse (n, n) matrix summing per-site values over the neighbourhood of every site"""
+        from scipy import sparse
+
+        neighborhood = self.neighborhood(radius)
+        rows = np.repeat(np.arange(len(self)), neighborhood.shape[1])
+        columns = neighborhood.ravel()
+        occupied = columns >= 0
+        return sparse.csr_matrix((np.ones(occupied.sum()), (rows[occupied], columns[occupied])),
+                                 shape=(len(self), len(self)))
+
+    def nearest(self, mask, max_radius=None):
+        """Distance to and index of the nearest site where `mask` is set, for every site.
+
+        `mask` may be stacked, (..., n) for several layouts at once; the results have the same shape. Candidate offsets
+        are visited in order of Euclidean length, so the first hit is the nearest site. Sites without a hit within
+        `max_radius` steps get an infinite distance and index -1.
+        """
+        mask = np.asarray(mask, dtype=bool)
+        layouts = mask.reshape(-1, len(self))
+        max_radius = max_radius or int(max(np.ptp(self.q), np.ptp(self.r))) + 1
+        offsets = disc_offsets(max_radius)
+        x, y = cubic_to_cartesian(offsets[:, 0], offsets[:, 1], -offsets.sum(axis=1),
+                                  self.center_distance / math.sqrt(3))
+        lengths = np.hypot(x, y)
+        order = np.argsort(lengths, kind='stable')
+
+        distance = np.full(layouts.shape, np.inf)
+        nearest = np.full(layouts.shape, -1, dtype=np.intp)
+        # (layout, site) pairs still without a hit
+        layout, site = np.indices(layouts.shape).reshape(2, -1)
+        for (dq, dr), length in zip(offsets[order], lengths[order]):
+            if not len(site):
+                break
+            candidate = self.lookup(self.q[site] + dq, self.r[site] + dr)
+            hit = candidate >= 0
+            hit[hit] = layouts[layout[hit], candidate[hit]]
+            distance[layout[hit], site[hit]] = length
+            nearest[layout[hit], site[hit]] = candidate[hit]
+            layout, site = layout[~hit], site[~hit]
+        return distance.reshape(mask.shape), nearest.reshape(mask.shape)
+
+
+def _jet_footprint(arrays):
+    # Area of every air cell covered by the jet OD
+    jet_od = shapely.Polygon(arrays['jet_od_xy'])
+    offsets = arrays['air_offsets']
+    index = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    cells = shapely.polygons(shapely.linearrings(arrays['air_xy'], indices=index))
+    covered = shapely.intersects(cells, jet_od)
+    inside = shapely.covered_by(cells, jet_od)
+    count('shapely_ops', 2 * len(cells) + int(covered.sum()))
+    footprint = np.zeros(len(cells))
+    footprint[covered] = shapely.area(shapely.intersection(cells[covered], jet_od))
+    # Cells under the jet close completely, without round-off left over
+    footprint[inside] = arrays['air_areas'][inside]
+    return footprint
+
+
+def flow_areas(geometry_config, arrays, params):
+    """Open flow area of every air and fuel hole in `arrays` (from hole_arrays).
+
+    Honeycomb cells lose the cross section of the fuel tube they contain and their overlap with the central jet OD,
+    which spans several cells; fuel tubes count as exact circles, as in calculate_hole_statistics. The air areas add
+    up to slightly more than the air_hole_area of calculate_hole_statistics, which subtracts the whole jet OD area,
+    including the part over the cell walls.
+    """
+    air = arrays['air_areas'].copy()
+    fuel = arrays['fuel_areas'].copy()
+    if geometry_config == 'Honeycomb':
+        center_distance = params.pilot_hex_cell_size + params.pilot_hex_wall_th
+        lattice = HexLattice.from_cartesian(*arrays['air_centers'].T, center_distance)
+        cell_of_air = lattice.locate(*arrays['air_centers'].T)
+        # Position of each lattice site in the air hole list
+        air_of_cell = np.empty(len(lattice), dtype=np.intp)
+        air_of_cell[cell_of_air] = np.arange(len(air))
+
+        fuel_cells = lattice.locate(*arrays['fuel_centers'].T)
+        np.subtract.at(air, air_of_cell[fuel_cells[fuel_cells >= 0]], math.pi * (params.pilot_fuel_OD / 2) ** 2)
+        if len(arrays['jet_od_areas']):
+            air -= _jet_footprint(arrays)
+        fuel = np.full(len(fuel), math.pi * (params.pilot_fuel_ID / 2) ** 2)
+    return air, fuel
+
+
+@dataclasses.dataclass
+class MixingUniformity:
+    """Per-site mixing metrics of the pilot pattern
+
+    Attributes:
+    ----------
+    lattice: HexLattice
+        Sites of all air and fuel holes.
+    air_area, fuel_area: np.ndarray
+        Open air and fuel area per site [m^2].
+    nearest_fuel_distance: np.ndarray
+        Distance from every air site to the closest fuel hole [m] (NaN for sites without air).
+    local_area_ratio: np.ndarray
+        Fuel to air area ratio within the neighbourhood of every air site.
+    local_phi: np.ndarray
+        Equivalence ratio within the neighbourhood of every air site.
+    phi_mean, phi_std: float
+        Air-area weighted mean and standard deviation of the local equivalence ratio across the plate.
+    """
+    lattice: HexLattice
+    air_area: np.ndarray
+    fuel_area: np.ndarray
+    nearest_fuel_distance: np.ndarray
+    local_area_ratio: np.ndarray
+    local_phi: np.ndarray
+    phi_mean: float
+    phi_std: float
+
+    @property
+    def phi_variance(self):
+        return self.phi_std ** 2
+
+
+def mixing_uniformity(geometry_config, params=None, operating=None, radius=1, flows=None, fuel_pattern=None):
+    """Mixing uniformity metrics of the 'Honeycomb' or 'Plate' pattern.
+
+    Args:
+        geometry_config: 'Honeycomb' or 'Plate'
+        params, operating: GeometryParams / OperatingParams; the operating point sets the hole velocities
+        radius: Neighbourhood radius in lattice steps for the local area ratio and equivalence ratio
+        flows: Optional PilotFlowDistribution (calculations.flow_network); its per-hole mass flows replace the
+            uniform hole velocities of the operating point
+        fuel_pattern: Fuel placement (geometry.fuel_patterns), default pattern if None
+    """
+    from calculations.vectorized import AIR, FUEL, gas_density, pilot_stoich_ratio
+
+    params = params or GeometryParams()
+    operating = operating or OperatingParams()
+    arrays = hole_arrays(geometry_config, params, fuel_pattern)
+    air_areas, fuel_areas = flow_areas(geometry_config, arrays, params)
+
+    center_distance = params.pilot_hex_cell_size + params.pilot_hex_wall_th
+    centers = np.concatenate([arrays['air_centers'], arrays['fuel_centers']])
+    lattice = HexLattice.from_cartesian(*centers.T, center_distance)
+    air_sites = lattice.locate(*arrays['air_centers'].T)
+    fuel_sites = lattice.locate(*arrays['fuel_centers'].T)
+
+    air_area = np.bincount(air_sites, weights=air_areas, minlength=len(lattice))
+    fuel_area = np.bincount(fuel_sites, weights=fuel_areas, minlength=len(lattice))
+
+    if flows is None:
+        air_flow = air_area * operating.pilot_air_velocity * gas_density(
+            AIR, operating.pilot_temperature, operating.pilot_pressure)
+        fuel_flow = fuel_area * operating.pilot_fuel_velocity * gas_density(
+            FUEL, operating.pilot_temperature, operating.pilot_pressure)
+    else:
+        air_flow = np.bincount(lattice.locate(*flows.air.centers.T), weights=flows.air.mass_flow,
+                               minlength=len(lattice))
+        fuel_flow = np.bincount(lattice.locate(*flows.fuel.centers.T), weights=flows.fuel.mass_flow,
+                                minlength=len(lattice))
+
+    has_air = air_area > 0
+    distance, _ = lattice.nearest(fuel_area > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        local_area_ratio = lattice.neighborhood_sum(fuel_area, radius) / lattice.neighborhood_sum(air_area, radius)
+        local_phi = pilot_stoich_ratio() * (lattice.neighborhood_sum(fuel_flow, radius)
+                                            / lattice.neighborhood_sum(air_flow, radius))
+
+    weights = air_area[has_air]
+    phi = local_phi[has_air]
+    phi_mean = float(np.average(phi, weights=weights))
+    phi_std = float(np.sqrt(np.average((phi - phi_mean) ** 2, weights=weights)))
+
+    return MixingUniformity(
+        lattice=lattice,
+        air_area=air_area,
+        fuel_area=fuel_area,
+        nearest_fuel_distance=np.where(has_air, distance, np.nan),
+        local_area_ratio=np.where(has_air, local_area_ratio, np.nan),
+        local_phi=np.where(has_air, local_phi, np.nan),
+        phi_mean=phi_mean,
+        phi_std=phi_std,
+    )
@@ -0,0 +1,239 @@
+"""Search of the pilot hole geometry for a target area ratio, equivalence ratio or hole count.
+
+Candidates are drawn in a box of the design variables, snapped to the machining step, screened against the
+manufacturability limits (closed form, no geometry needed) and the feasible ones evaluated with
+geometry.fast_statistics, spread over a process pool. Every following round draws new candidates in shrinking boxes
+around the few best found so far, so a few rounds of a few hundred candidates converge on the target:
+
+    result = optimize('Honeycomb',
+                      bounds={'pilot_hex_cell_size': (1.0e-3, 2.5e-3), 'pilot_fuel_ID': (0.4e-3, 1.2e-3)},
+                      target_phi=0.5, operating=OperatingParams(pilot_air_velocity=8, pilot_fuel_velocity=20))
+    result.print_summary()
+
+For 'Honeycomb' the air opening equals the cell size (see GeometryParams), so pilot_air_ID follows
+pilot_hex_cell_size unless it is a design variable itself.
+"""
+import dataclasses
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from input_parameters.parameters import GeometryParams, OperatingParams
+from geometry.fast_statistics import hole_statistics
+
+DESIGN_VARIABLES = ('pilot_hex_cell_size', 'pilot_hex_wall_th', 'pilot_fuel_ID', 'pilot_fuel_OD', 'pilot_air_ID')
+
+
+@dataclasses.dataclass
+class Manufacturability:
+    """Manufacturing limits of the pilot plate [m]
+
+    Attributes:
+    ----------
+    min_wall_th: float
+        Thinnest honeycomb wall; fuel tubes must also fit inside their cell.
+    min_tube_wall: float
+        Thinnest fuel tube wall, (pilot_fuel_OD - pilot_fuel_ID) / 2.
+    min_hole: float
+        Smallest air or fuel hole diameter.
+    min_ligament: float
+        Least material between two neighbouring holes of the plate.
+    step: float
+        Machining increment every dimension is rounded to; 0 keeps them continuous.
+    """
+    min_wall_th: float = 0.1e-3
+    min_tube_wall: float = 0.15e-3
+    min_hole: float = 0.3e-3
+    min_ligament: float = 0.2e-3
+    step: float = 0.01e-3
+
+    def feasible(self, geometry_config, v):
+        """Mask of the candidates (dict of arrays of GeometryParams fields) that respect every limit"""
+        pitch = v['pilot_hex_cell_size'] + v['pilot_hex_wall_th']
+        ok = (v['pilot_fuel_ID'] >= self.min_hole) & (v['pilot_air_ID'] >= self.min_hole)
+        if geometry_config == 'Honeycomb':
+            ok &= v['pilot_hex_wall_th'] >= self.min_wall_th
+            ok &= (v['pilot_fuel_OD'] - v['pilot_fuel_ID']) / 2 >= self.min_tube_wall
+            ok &= v['pilot_fuel_OD'] <= v['pilot_air_ID']
+            ok &= v['pilot_air_ID'] <= v['pilot_hex_cell_size']
+        elif geometry_config == 'Plate':
+            ok &= pitch - v['pilot_air_ID'] >= self.min_ligament
+            ok &= pitch - (v['pilot_air_ID'] + v['pilot_fuel_ID']) / 2 >= self.min_ligament
+        else:
+            raise ValueError(f"Unknown geometry config '{geometry_config}'")
+        return ok
+
+
+@dataclasses.dataclass
+class OptimizationResult:
+    """Best geometry found and every evaluated candidate
+
+    Attributes:
+    ----------
+    geometry: GeometryParams
+        Best candidate.
+    statistics: dict
+        Hole statistics of the best candidate.
+    equivalence_ratio: float
+        Pilot equivalence ratio of the best candidate at the operating point.
+    objective: float
+        Sum of squared relative deviations from the targets of the best candidate.
+    history: dict
+        Design variables, 'air_to_fuel_area_ratio', 'fuel_hole_number', 'equivalence_ratio' and 'objective' of all
+        evaluated candidates, as arrays.
+    """
+    geometry: GeometryParams
+    statistics: dict
+    equivalence_ratio: float
+    objective: float
+    history: dict
+
+    def print_summary(self):
+        for name in DESIGN_VARIABLES:
+            print(f'{name:22} {getattr(self.geometry, name) * 1e3:8.3f} mm')
+        print(f"{'air_to_fuel_area_ratio':22} {self.statistics['air_to_fuel_area_ratio']:8.3f}")
+        print(f"{'fuel_hole_number':22} {self.statistics['fuel_hole_number']:8d}")
+        print(f"{'equivalence_ratio':22} {self.equivalence_ratio:8.3f}")
+        print(f"{'objective':22} {self.objective:8.2e}  ({len(self.history['objective'])} candidates)")
+
+
+def _evaluate_chunk(geometry_config, base, rows, fuel_pattern):
+    # Worker side: (air area, fuel area, fuel hole number) of each candidate
+    result = np.empty((len(rows), 3))
+    for i, row in enumerate(rows):
+        stats = hole_statistics(geometry_config, dataclasses.replace(base, **row), fuel_pattern)
+        result[i] = stats['air_hole_area'], stats['fuel_hole_area'], stats['fuel_hole_number']
+    return result
+
+
+def _evaluate(geometry_config, base, rows, fuel_pattern, workers, chunk_size):
+    chunks = [rows[start:start + chunk_size] for start in range(0, len(rows), chunk_size)]
+    if workers == 0 or len(chunks) <= 1:
+        results = [_evaluate_chunk(geometry_config, base, chunk, fuel_pattern) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_evaluate_chunk, *zip(*[(geometry_config, base, chunk, fuel_pattern)
+                                                             for chunk in chunks])))
+    return np.concatenate(results) if results else np.empty((0, 3))
+
+
+def optimize(geometry_config, bounds, target_ratio=None, target_phi=None, target_fuel_holes=None, base=None,
+             operating=None, limits=None, fuel_pattern=None, candidates=256, rounds=5, elite=4, shrink=0.5,
+             workers=None, chunk_size=32, seed=None):
+    """Search the design variables in `bounds` for the geometry closest to the targets.
+
+    Args:
+        geometry_config: 'Honeycomb' or 'Plate'
+        bounds: {GeometryParams field from DESIGN_VARIABLES: (low, high)} [m]
+        target_ratio: Target air to fuel area ratio
+        target_phi: Target pilot equivalence ratio at the velocities of `operating`
+        target_fuel_holes: Target number of fuel holes
+        base: GeometryParams holding the fixed dimensions
+        operating: OperatingParams for the equivalence ratio
+        limits: Manufacturability limits
+        fuel_pattern: Fuel placement (geometry.fuel_patterns)
+        candidates: Candidates drawn per round
+        rounds: Number of search rounds
+        elite: Number of best candidates the next round searches around
+        shrink: Factor on the search box size per round
+        workers: Worker processes (None: one per CPU, 0: evaluate in this process)
+        chunk_size: Candidates per worker task
+        seed: Seed of the random generator, for reproducible runs
+    """
+    from calculations.vectorized import pilot_equivalence_ratio
+
+    unknown = set(bounds) - set(DESIGN_VARIABLES)
+    if unknown:
+        raise ValueError(f'Unsupported design variables {sorted(unknown)}; choose from {DESIGN_VARIABLES}')
+    targets = {'air_to_fuel_area_ratio': target_ratio, 'equivalence_ratio': target_phi,
+               'fuel_hole_number': target_fuel_holes}
+    targets = {name: value for name, value in targets.items() if value is not None}
+    if not targets:
+        raise ValueError('Give at least one of target_ratio, target_phi and target_fuel_holes')
+
+    base = base or GeometryParams()
+    operating = operating or OperatingParams()
+    limits = limits or Manufacturability()
+    rng = np.random.default_rng(seed)
+    names = list(bounds)
+    low = np.array([bounds[name][0] for name in names])
+    high = np.array([bounds[name][1] for name in names])
+    tie_air = geometry_config == 'Honeycomb' and 'pilot_air_ID' not in bounds
+
+    history = {name: [] for name in [*names, 'air_to_fuel_area_ratio', 'fuel_hole_number', 'equivalence_ratio',
+                                     'objective']}
+    seen = set()
+    centers, half = None, (high - low) / 2
+    for _ in range(rounds):
+        if centers is None:
+            x = rng.uniform(low, high, size=(candidates, len(names)))
+        else:
+            # Shrinking boxes around the elite candidates
+            half = half * shrink
+            x = np.repeat(centers, -(-candidates // len(centers)), axis=0)[:candidates]
+            x = x + rng.uniform(-half, half, size=x.shape)
+        x = np.clip(x, low, high)
+        if limits.step:
+            x = np.clip(np.round(x / limits.step) * limits.step, low, high)
+        x = np.unique(x, axis=0)
+        x = x[[tuple(row) not in seen for row in x]]
+        seen.update(map(tuple, x))
+
+        values = {name: np.full(len(x), getattr(base, name)) for name in DESIGN_VARIABLES}
+        values.update({name: x[:, i] for i, name in enumerate(names)})
+        if tie_air:
+            values['pilot_air_ID'] = values['pilot_hex_cell_size']
+        x = x[limits.feasible(geometry_config, values)]
+        if not len(x):
+            continue
+
+        rows = [{name: float(value) for name, value in zip(names, row)} for row in x]
+        if tie_air:
+            for row in rows:
+                row['pilot_air_ID'] = row.get('pilot_hex_cell_size', base.pilot_hex_cell_size)
+        air_area, fuel_area, fuel_holes = _evaluate(geometry_config, base, rows, fuel_pattern, workers,
+                                                    chunk_size).T
+        with np.errstate(divide='ignore', invalid='ignore'):
+            outputs = {
+                'air_to_fuel_area_ratio': air_area / fuel_area,
+                'fuel_hole_number': fuel_holes,
+                'equivalence_ratio': pilot_equivalence_ratio(
+                    air_area, fuel_area, operating.pilot_pressure, operating.pilot_temperature,
+                    operating.pilot_air_velocity, operating.pilot_fuel_velocity),
+            }
+        objective = sum((outputs[name] / target - 1) ** 2 for name, target in targets.items())
+        objective = np.where(np.isfinite(objective), objective, np.inf)
+
+        for i, name in enumerate(names):
+            history[name].append(x[:, i])
+        for name, value in outputs.items():
+            history[name].append(value)
+        history['objective'].append(objective)
+
+        # Elite of everything evaluated so far
+        evaluated = np.column_stack([np.concatenate(history[name]) for name in names])
+        scores = np.concatenate(history['objective'])
+        order = np.argsort(scores, kind='stable')[:elite]
+        centers = evaluated[order[np.isfinite(scores[order])]]
+        if not len(centers):
+            centers = None
+
+    if not history['objective']:
+        raise ValueError('No candidate within the bounds respects the manufacturability limits')
+    scores = np.concatenate(history['objective'])
+    k = int(np.argmin(scores))
+    best = [np.concatenate(history[name])[k] for name in names]
+
+    geometry = dataclasses.replace(base, **dict(zip(names, map(float, best))))
+    if tie_air:
+        geometry.pilot_air_ID = geometry.pilot_hex_cell_size
+    statistics = hole_statistics(geometry_config, geometry, fuel_pattern)
+    return OptimizationResult(
+        geometry=geometry,
+        statistics=statistics,
+        equivalence_ratio=float(pilot_equivalence_ratio(
+            statistics['air_hole_area'], statistics['fuel_hole_area'], operating.pilot_pressure,
+            operating.pilot_temperature, operating.pilot_air_velocity, operating.pilot_fuel_velocity)),
+        objective=float(scores[k]),
+        history={name: np.concatenate(values) if values else np.empty(0) for name, values in history.items()},
+    )
@@ -1,15 +1,20 @@
 from input_parameters.parameters import GeometryParams
 from geometry.grid_generator import HexagonalGridGenerator
-import shapely.geometry
 import math
-from geometry.geometry_utils import is_fuel_position_cubic, cubic_to_cartesian
-import ezdxf
+from geometry.geometry_utils import cubic_to_cartesian
+from geometry.fuel_patterns import get_pattern
 import os
 from datetime import datetime
+from utils.instrumentation import instrumented, count
+from utils.lazy import lazy_import
+import numpy as np
+
+shapely = lazy_import('shapely')
+ezdxf = lazy_import('ezdxf')
 
 
 class HexGrid:
-    def __init__(self, params: GeometryParams):
+    def __init__(self, params: GeometryParams, fuel_pattern=None):
         # Dynamically set attributes from the params instance
         for key, value in params.__dict__.items():
             setattr(self, key, value)
@@ -30,30 +35,47 @@ class HexGrid:
         self.cartesian_coords = coordinates['cartesian_coordinates']
         self.cubic_coords = coordinates['cubic_coordinates']
 
+        # Fuel placement rule
+        self.fuel_pattern = get_pattern(fuel_pattern)
+
         # Create boundary polygon
         self.boundary_polygon = shapely.geometry.Point(0, 0).buffer(self.pilot_burner_ID * 0.95 / 2)
 
+    @instrumented('hole_placement')
     def generate_air_holes(self, fuel_holes, central_jet):
         # Generate air holes avoiding overlap with fuel holes and central jet
         circles = []
         radius = self.pilot_air_ID / 2
+        ops = 0
         for coord in self.cubic_coords:
             cart_coord = cubic_to_cartesian(coord[0], coord[1], coord[2], self.center_distance / math.sqrt(3))
             point = shapely.geometry.Point(cart_coord)
             circle = point.buffer(radius)
             distance_to_boundary = self.boundary_polygon.exterior.distance(point)
-            if not any(circle.intersection(fuel_hole).area > 0 for fuel_hole in fuel_holes) and (
-                    self.boundary_polygon.contains(circle) or distance_to_boundary == radius):
+            ops += 2
+            # Index of the first fuel hole the circle overlaps; the fuel holes after it are not tested
+            hit = next((i for i, fuel_hole in enumerate(fuel_holes) if circle.intersection(fuel_hole).area > 0), None)
+            ops += len(fuel_holes) if hit is None else hit + 1
+            if hit is not None:
+                continue
+            ops += 1
+            if self.boundary_polygon.contains(circle) or distance_to_boundary == radius:
+                ops += 2
                 if central_jet.intersects(circle):
                     circle = point.buffer(radius / math.sqrt(2))  # Reduce size for intersecting circles in the middle
+                    ops += 1
                 if point.distance(shapely.geometry.Point(0, 0)) > radius:
                     circles.append(circle)  # Exclude the central circle
+        count('shapely_ops', ops)
         return circles
 
+    @instrumented('hole_placement')
     def generate_fuel_holes(self, fuel_positions):
         # Generate fuel holes within the boundary
         circles = []
         radius = self.pilot_fuel_ID / 2
+        # One buffer and one containment test per position
+        count('shapely_ops', 2 * len(fuel_positions))
         for coord in fuel_positions:
             point = shapely.geometry.Point(coord)
             circle = point.buffer(radius)
@@ -67,14 +89,14 @@ class HexGrid:
         central_jet = shapely.geometry.Point(0, 0).buffer(radius)
         return central_jet
 
+    @instrumented('hole_placement')
     def check_fuel_positions(self):
         # Check and return fuel positions in cubic coordinates
-        fuel_positions_cubic = []
-        for coord in self.cubic_coords:
-            if is_fuel_position_cubic(coord[0], coord[1]):
-                fuel_positions_cubic.append(coord)
-        return fuel_positions_cubic
+        q, r = np.array(self.cubic_coords)[:, :2].T
+        is_fuel = self.fuel_pattern.mask(q, r)
+        return [coord for coord, fuel in zip(self.cubic_coords, is_fuel) if fuel]
 
+    @instrumented('dxf')
     def export_to_dxf(self, air_holes, fuel_holes, central_jet, filename):
         # Export the geometry to a DXF file with each hole type on a different layer
         doc = ezdxf.new()
@@ -103,6 +125,7 @@ class HexGrid:
         # Save the DXF file
         doc.saveas(filename)
 
+    @instrumented('statistics')
     def calculate_hole_statistics(self, air_holes, fuel_holes):
         # Calculate and return the air hole number, air hole area, fuel hole number, fuel hole area, and air to fuel
         # area ratio
@@ -121,12 +144,12 @@ class HexGrid:
         }
 
 
-def plate_generator(generate_dxf=False):
+def plate_generator(generate_dxf=False, params=None, fuel_pattern=None):
     # Initialize geometry parameters
-    params = GeometryParams()
+    params = params or GeometryParams()
 
     # Initialize hex grid
-    hex_grid = HexGrid(params)
+    hex_grid = HexGrid(params, fuel_pattern)
 
     # Check fuel positions
     fuel_positions_cubic = hex_grid.check_fuel_positions()
@@ -154,12 +177,12 @@ def plate_generator(generate_dxf=False):
     return stats
 
 
-def get_hole_coordinates():
+def get_hole_coordinates(params=None, fuel_pattern=None):
     # Initialize geometry parameters
-    params = GeometryParams()
+    params = params or GeometryParams()
 
     # Initialize hex grid
-    hex_grid = HexGrid(params)
+    hex_grid = HexGrid(params, fuel_pattern)
 
     # Check fuel positions
     fuel_positions_cubic = hex_grid.check_fuel_positions()
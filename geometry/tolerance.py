@@ -0,0 +1,144 @@
+"""Manufacturing tolerance analysis of the pilot hole areas.
+
+The generators compute `air_hole_area`, `fuel_hole_area` and `air_to_fuel_area_ratio` for nominal diameters and wall
+thickness. Here every hole gets its own diameter (and every honeycomb cell its own wall thickness) drawn from the
+given tolerance distributions, for many realizations at once. The nominal geometry is built with Shapely once; a
+perturbed hole keeps its nominal shape and position and only its area scales with (d / d_nominal)^2, which also holds
+for the honeycomb cells clipped at the burner boundary and the reduced plate holes next to the central jet.
+
+Honeycomb cells sit on a fixed pitch, so a thicker wall narrows the hexagonal opening by the same amount:
+    opening = pilot_air_ID + (error of pilot_air_ID) - (error of pilot_hex_wall_th)
+Drilled plate holes only depend on their diameters.
+
+Example:
+    result = tolerance_analysis('Honeycomb', {'pilot_fuel_ID': Normal(0.01e-3), 'pilot_hex_wall_th': Uniform(0.02e-3)},
+                                operating=OperatingParams())
+    print(result.percentiles())
+"""
+import dataclasses
+import math
+
+import numpy as np
+
+from input_parameters.parameters import GeometryParams
+from geometry.hole_arrays import hole_arrays
+
+# Geometry fields that can be toleranced, per configuration
+TOLERANCED_FIELDS = {
+    'Honeycomb': ('pilot_air_ID', 'pilot_hex_wall_th', 'pilot_fuel_ID', 'pilot_fuel_OD', 'jet_OD'),
+    'Plate': ('pilot_air_ID', 'pilot_fuel_ID'),
+}
+
+# Number of per-hole samples held in memory at once
+MAX_BLOCK = 4_000_000
+
+
+@dataclasses.dataclass
+class ToleranceResult:
+    """Hole area statistics of every realization
+
+    Attributes:
+    ----------
+    nominal: dict
+        Nominal air_hole_area, fuel_hole_area and air_to_fuel_area_ratio.
+    air_hole_area, fuel_hole_area, air_to_fuel_area_ratio: np.ndarray
+        Values per realization.
+    equivalence_ratio: np.ndarray
+        Pilot equivalence ratio per realization at the given operating point, None without one.
+    """
+    nominal: dict
+    air_hole_area: np.ndarray
+    fuel_hole_area: np.ndarray
+    air_to_fuel_area_ratio: np.ndarray
+    equivalence_ratio: np.ndarray = None
+
+    def percentiles(self, q=(2.5, 50, 97.5)):
+        """{quantity: {percentile: value}} of every reported quantity"""
+        names = ['air_hole_area', 'fuel_hole_area', 'air_to_fuel_area_ratio']
+        if self.equivalence_ratio is not None:
+            names.append('equivalence_ratio')
+        return {name: dict(zip(q, np.percentile(getattr(self, name), q))) for name in names}
+
+
+def _scaled_sum(rng, nominal_areas, distribution, nominal_size, realizations, offset=None):
+    # Sum over holes of area * (d / d_nominal)^2 for every realization, sampled in blocks of realizations
+    areas = np.asarray(nominal_areas)
+    if (distribution is None and offset is None) or len(areas) == 0:
+        return np.full(realizations, areas.sum())
+    block = max(1, MAX_BLOCK // max(len(areas), 1))
+    totals = np.empty(realizations)
+    for start in range(0, realizations, block):
+        n = min(block, realizations - start)
+        size = (np.full((n, len(areas)), float(nominal_size)) if distribution is None
+                else distribution.sample(nominal_size, rng, (n, len(areas))))
+        if offset is not None:
+            size = size - offset(n, len(areas))
+        totals[start:start + n] = ((size / nominal_size) ** 2) @ areas
+    return totals
+
+
+def tolerance_analysis(geometry_config, tolerances, params=None, realizations=1000, operating=None, seed=None):
+    """Distribution of the pilot hole areas under per-hole manufacturing tolerances.
+
+    Args:
+        geometry_config: 'Honeycomb' or 'Plate'
+        tolerances: {GeometryParams field: Normal / Uniform (utils.distributions)}, see TOLERANCED_FIELDS
+        params: Nominal GeometryParams
+        realizations: Number of manufactured burners to sample
+        operating: Optional OperatingParams; if given the pilot equivalence ratio of every realization is reported
+        seed: Seed of the random generator
+    """
+    params = params or GeometryParams()
+    unknown = set(tolerances) - set(TOLERANCED_FIELDS[geometry_config])
+    if unknown:
+        raise ValueError(f'{geometry_config} has no toleranced field(s) {sorted(unknown)}; '
+                         f'choose from {TOLERANCED_FIELDS[geometry_config]}')
+    rng = np.random.default_rng(seed)
+    arrays = hole_arrays(geometry_config, params)
+    n_fuel = len(arrays['fuel_areas'])
+
+    if geometry_config == 'Honeycomb':
+        wall = tolerances.get('pilot_hex_wall_th')
+        wall_error = None
+        if wall is not None:
+            def wall_error(n, holes):
+                return wall.sample(params.pilot_hex_wall_th, rng, (n, holes)) - params.pilot_hex_wall_th
+        hex_area = _scaled_sum(rng, arrays['air_areas'], tolerances.get('pilot_air_ID'), params.pilot_air_ID,
+                               realizations, wall_error)
+        # Fuel and jet tubes are counted as exact circles, like calculate_hole_statistics does
+        fuel_hole_area = _scaled_sum(rng, np.full(n_fuel, math.pi * (params.pilot_fuel_ID / 2) ** 2),
+                                     tolerances.get('pilot_fuel_ID'), params.pilot_fuel_ID, realizations)
+        fuel_od_area = _scaled_sum(rng, np.full(n_fuel, math.pi * (params.pilot_fuel_OD / 2) ** 2),
+                                   tolerances.get('pilot_fuel_OD'), params.pilot_fuel_OD, realizations)
+        jet_od_area = _scaled_sum(rng, [math.pi * (params.jet_OD / 2) ** 2], tolerances.get('jet_OD'),
+                                  params.jet_OD, realizations)
+        air_hole_area = hex_area - fuel_od_area - jet_od_area
+    else:
+        air_hole_area = _scaled_sum(rng, arrays['air_areas'], tolerances.get('pilot_air_ID'), params.pilot_air_ID,
+                                    realizations)
+        fuel_hole_area = _scaled_sum(rng, arrays['fuel_areas'], tolerances.get('pilot_fuel_ID'),
+                                     params.pilot_fuel_ID, realizations)
+
+    nominal_air, nominal_fuel = _nominal_areas(geometry_config, arrays, params)
+    result = ToleranceResult(
+        nominal={'air_hole_area': nominal_air, 'fuel_hole_area': nominal_fuel,
+                 'air_to_fuel_area_ratio': nominal_air / nominal_fuel if nominal_fuel > 0 else float('inf')},
+        air_hole_area=air_hole_area,
+        fuel_hole_area=fuel_hole_area,
+        air_to_fuel_area_ratio=air_hole_area / fuel_hole_area,
+    )
+    if operating is not None:
+        from calculations.vectorized import pilot_equivalence_ratio
+        result.equivalence_ratio = pilot_equivalence_ratio(
+            air_hole_area, fuel_hole_area, operating.pilot_pressure, operating.pilot_temperature,
+            operating.pilot_air_velocity, operating.pilot_fuel_velocity)
+    return result
+
+
+def _nominal_areas(geometry_config, arrays, params):
+    n_fuel = len(arrays['fuel_areas'])
+    if geometry_config == 'Honeycomb':
+        air = (arrays['air_areas'].sum() - n_fuel * math.pi * (params.pilot_fuel_OD / 2) ** 2
+               - math.pi * (params.jet_OD / 2) ** 2)
+        return air, n_fuel * math.pi * (params.pilot_fuel_ID / 2) ** 2
+    return arrays['air_areas'].sum(), arrays['fuel_areas'].sum()
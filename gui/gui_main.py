@@ -1,8 +1,8 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 from tkinter import PhotoImage
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 
 from gui.styles import setup_styles
 from gui.gui_inputs import InputFields
@@ -13,9 +13,11 @@ from calculations import jet_burner as jb
 from calculations import pilot_burner as pb
 from calculations import n2_co_flow as cf
 from calculations import mixed_temperature as mt
+from calculations import emissions as em
 
-from geometry.plate_generator import get_hole_coordinates as plate_coordinates, plate_generator
-from geometry.honeycomb_generator import get_hole_coordinates as honeycomb_coordinates, HexGrid
+from geometry.plate_generator import plate_generator
+from geometry.hole_arrays import share_hole_arrays, outlines
+from utils.shared_memory import SharedArrays, start_resource_tracker
 
 
 class UserInterface:
@@ -26,6 +28,11 @@ class UserInterface:
         self.root.geometry("1200x1200")
         self.root.minsize(1200, 1000)
 
+        # Hole geometry for the plot is generated in a worker process and shared through shared memory
+        self.geometry_pool = None
+        self.hole_block = None
+        self.root.protocol('WM_DELETE_WINDOW', self.close)
+
         # Load the logo image
         self.logo = PhotoImage(file="../assets/logo.png")
         self.root.iconphoto(False, self.logo)  # Set the application icon
@@ -102,78 +109,81 @@ class UserInterface:
             coflow_results = coflow.get_co_flow_properties()
 
             mixer = mt.MixedTemperature(geom, op)
-            mix_results = mixer.calculate_mixed_temperature(geometry_config)
+            mix_results = mixer.calculate_mixed_temperature(geometry_config, jet_results=jet_props,
+                                                            pilot_results=pilot_results,
+                                                            coflow_results=coflow_results)
+
+            emissions = em.flame_emissions(jet_props, pilot_results, op, fuel=jet.fuel)
 
-            self.outputs.update_tiles(jet_props, pilot_results, coflow_results, mix_results)
+            self.outputs.update_tiles(jet_props, pilot_results, coflow_results, mix_results, emissions)
 
             # Plot the geometry in the burner geometry display
             self.plot_geometry(geom, geometry_config)
 
             # Generate DXF file if the checkbox is ticked
             if self.generate_dxf_var.get():
-                plate_generator(generate_dxf=True)
+                plate_generator(generate_dxf=True, params=geom)
 
         except Exception as e:
             messagebox.showerror("Calculation Error", str(e))
 
-    def plot_geometry(self, geom, geometry_config):
-        fig, ax = plt.subplots()
-
-        if geometry_config == "Plate":
-            # Get hole coordinates for plate
-            air_holes, fuel_holes, central_jet = plate_coordinates()
+    def close(self):
+        """Stop the geometry worker process and close the window"""
+        if self.geometry_pool is not None:
+            self.geometry_pool.shutdown()
+            self.geometry_pool = None
+        self.root.destroy()
+
+    def load_hole_arrays(self, geom, geometry_config):
+        """Generate the hole arrays in the worker process and map them from shared memory"""
+        if self.geometry_pool is None:
+            start_resource_tracker()
+            self.geometry_pool = ProcessPoolExecutor(max_workers=1)
+        descriptor = self.geometry_pool.submit(share_hole_arrays, geometry_config, geom).result()
+
+        # Release the previous plot's block; if its artists still reference the arrays, the mapping goes with them
+        if self.hole_block is not None:
+            try:
+                self.hole_block.close()
+            except BufferError:
+                pass
+
+        # Unlinking right away frees the block as soon as the last mapping is released
+        self.hole_block = SharedArrays.attach(descriptor, owner=True)
+        self.hole_block.unlink()
+        return self.hole_block.arrays
 
-            # Plot air holes
-            for circle in air_holes:
-                x, y = circle.exterior.xy
-                ax.plot(x, y, color='blue')
-
-            # Plot fuel holes
-            for circle in fuel_holes:
-                x, y = circle.exterior.xy
-                ax.plot(x, y, color='red')
-
-            # Plot central jet
-            x, y = central_jet.exterior.xy
-            ax.plot(x, y, color='green')
+    def plot_geometry(self, geom, geometry_config):
+        # matplotlib and the TkAgg backend are only needed once a geometry is plotted
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.collections import LineCollection
+        import matplotlib.pyplot as plt
 
-            ax.set_title('Plate Generator Grid')
+        arrays = self.load_hole_arrays(geom, geometry_config)
 
-        elif geometry_config == "Honeycomb":
-            # Generate the hexagonal grid
-            hex_grid = HexGrid(geom)
-            burner_boundary = hex_grid.generate_burner_boundary()
-            air_holes, fuel_holes, central_jet = honeycomb_coordinates()
+        fig, ax = plt.subplots()
 
+        if geometry_config == "Honeycomb":
             # Plot burner boundary
-            x, y = burner_boundary.exterior.xy
-            ax.plot(x, y, color='black', linestyle='dotted')
-
-            # Plot air holes
-            for hexagon in air_holes:
-                x, y = hexagon.exterior.xy
-                ax.plot(x, y, color='blue')
-
-            # Plot fuel holes
-            for fuel_hole in fuel_holes:
-                circle = fuel_hole['circle']
-                x, y = circle.exterior.xy
-                ax.plot(x, y, color='red')
-
-                # Plot pilot fuel OD
-                od_circle = fuel_hole['od_circle']
-                x, y = od_circle.exterior.xy
-                ax.plot(x, y, color='orange', linestyle='dashed')
-
-            # Plot central jet
-            x, y = central_jet['circle'].exterior.xy
-            ax.plot(x, y, color='green')
-
-            # Plot central jet OD
-            x, y = central_jet['od_circle'].exterior.xy
-            ax.plot(x, y, color='purple', linestyle='dashed')
-
-            ax.set_title('Hexagonal Grid Geometry')
+            theta = np.linspace(0, 2 * np.pi, 257)
+            radius = geom.pilot_burner_ID / 2
+            ax.plot(radius * np.cos(theta), radius * np.sin(theta), color='black', linestyle='dotted')
+
+        # Air holes, fuel holes (and their OD), central jet (and its OD)
+        styles = {
+            'air': {'colors': 'blue'},
+            'fuel': {'colors': 'red'},
+            'fuel_od': {'colors': 'orange', 'linestyles': 'dashed'},
+            'jet': {'colors': 'green'},
+            'jet_od': {'colors': 'purple', 'linestyles': 'dashed'},
+        }
+        for hole_type, style in styles.items():
+            segments = outlines(arrays, hole_type)
+            if segments:
+                ax.add_collection(LineCollection(segments, **style))
+        ax.autoscale_view()
+
+        ax.set_title('Hexagonal Grid Geometry' if geometry_config == "Honeycomb" else 'Plate Generator Grid')
 
         ax.set_xlabel('X-axis (mm)')
         ax.set_ylabel('Y-axis (mm)')
@@ -6,6 +6,7 @@ class OutputTiles:
         self.flow_tile = self.create_tile(parent, "Flow Parameters", 0, 0, columnspan=1)
         self.thermal_tile = self.create_tile(parent, "Thermal Properties", 1, 0, columnspan=1)
         self.performance_tile = self.create_tile(parent, "Performance", 2, 0, columnspan=1)
+        self.emissions_tile = self.create_tile(parent, "Emissions", 3, 0, columnspan=1)
         self.burner_geometry_display = self.create_tile(parent, "Burner Geometry Display", 0, 2, columnspan=1, rowspan=4)
         self.flow_labels = {}
 
@@ -21,10 +22,12 @@ class OutputTiles:
         label.pack(fill='x', expand=True, padx=5, pady=2)
         return label
 
-    def update_tiles(self, jet_props, pilot_results, coflow_results, mix_results):
+    def update_tiles(self, jet_props, pilot_results, coflow_results, mix_results, emissions=None):
         self.update_flow_tile(jet_props, pilot_results, coflow_results)
         self.update_thermal_tile(jet_props, pilot_results, coflow_results, mix_results)
         self.update_performance_tile(jet_props, pilot_results, coflow_results)
+        if emissions is not None:
+            self.update_emissions_tile(emissions)
 
     def update_flow_tile(self, jet_props, pilot_results, coflow_results):
         kgs_to_gms = 1000  # Conversion factor from kg/s to g/s
@@ -114,6 +117,23 @@ class OutputTiles:
         self.flow_labels['Pilot air density'] = self.add_label(self.performance_tile,
                                                                 f"Pilot Air Density: {pilot_results.rho_air:.2f} kg/m³")
 
+    def update_emissions_tile(self, emissions):
+        self.clear_tile(self.emissions_tile)
+        emissions_frame = ttk.Frame(self.emissions_tile)
+        emissions_frame.pack(fill='x', expand=True, pady=5)
+        ttk.Label(emissions_frame, text=f"NOx after {emissions.residence_time * 1000:.0f} ms (wet)",
+                  style='TileHeader.TLabel').pack()
+
+        kgs_to_mgs = 1e6  # Conversion factor from kg/s to mg/s
+        self.flow_labels['Jet NO'] = self.add_label(self.emissions_tile,
+                                                    f"Jet NO: {emissions.jet_NO:.1f} ppm, NO2: {emissions.jet_NO2:.2f} ppm")
+        self.flow_labels['Pilot NO'] = self.add_label(self.emissions_tile,
+                                                      f"Pilot NO: {emissions.pilot_NO:.1f} ppm, NO2: {emissions.pilot_NO2:.2f} ppm")
+        self.flow_labels['Jet NOx Mass Flow'] = self.add_label(self.emissions_tile,
+                                                               f"Jet NOx: {emissions.jet_NOx_mass_flow * kgs_to_mgs:.3f} mg/s")
+        self.flow_labels['Pilot NOx Mass Flow'] = self.add_label(self.emissions_tile,
+                                                                 f"Pilot NOx: {emissions.pilot_NOx_mass_flow * kgs_to_mgs:.3f} mg/s")
+
     def clear_tile(self, tile):
         for widget in tile.winfo_children():
             widget.destroy()
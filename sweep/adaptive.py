@@ -0,0 +1,234 @@
+"""Adaptive sampling of a two-parameter operating envelope.
+
+The envelope is covered by a coarse uniform grid of cells. A cell is split into four whenever one of the refinement
+criteria fires on its corner values, e.g. the jet Karlovitz number crossing 1 or the pilot equivalence ratio changing
+by more than 10 % across the cell. Flagged cells are refined in order of priority (threshold crossings first, larger
+cells first) until nothing is flagged, the maximum level is reached or the evaluation budget is spent. Corner points
+are shared between neighbouring cells and evaluated only once.
+
+Example:
+    result = adaptive_sweep(
+        Case(), x=('jet_velocity', 20, 200), y=('jet_equivalence_ratio', 0.2, 1.0),
+        criteria=[Threshold('jet.karlovitz_number', 1.0), Threshold('jet.reynolds_number', 2300)],
+        budget=300)
+"""
+import dataclasses
+import heapq
+import math
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from input_parameters.parameters import OperatingParams
+from calculations.jet_burner import JetBurner
+from calculations.pilot_burner import PilotBurner
+from calculations.n2_co_flow import CoFlow
+
+
+@dataclasses.dataclass(frozen=True)
+class Threshold:
+    """Refine cells where `output` crosses `value`"""
+    output: str
+    value: float
+
+    def score(self, values):
+        above = values > self.value
+        return 2.0 if above.any() and not above.all() else 0.0
+
+
+@dataclasses.dataclass(frozen=True)
+class Gradient:
+    """Refine cells where `output` changes by more than `rel_tol` relative to its magnitude across the cell"""
+    output: str
+    rel_tol: float = 0.1
+
+    def score(self, values):
+        scale = np.max(np.abs(values))
+        if scale == 0:
+            return 0.0
+        change = (np.max(values) - np.min(values)) / scale
+        return 1.0 if change > self.rel_tol else 0.0
+
+
+def apply_parameters(case, **values):
+    """Copy of `case` with operating or geometry fields replaced"""
+    operating_fields = {field.name for field in dataclasses.fields(OperatingParams)}
+    operating = {name: value for name, value in values.items() if name in operating_fields}
+    geometry = {name: value for name, value in values.items() if name not in operating_fields}
+    return dataclasses.replace(case, operating=dataclasses.replace(case.operating, **operating),
+                               geometry=dataclasses.replace(case.geometry, **geometry))
+
+
+def evaluate_outputs(case, outputs):
+    """Evaluate the named outputs ('<stream>.<field>') of one case, running only the calculators they need"""
+    streams = {output.split('.', 1)[0] for output in outputs}
+    geometry, operating, mechanism, fuel = case.geometry, case.operating, case.mechanism, case.fuel
+    results = {}
+    if 'jet' in streams:
+        results['jet'] = JetBurner(geometry, operating, mechanism=mechanism, fuel=fuel).get_jet_burner_properties()
+    if 'pilot' in streams:
+        pilot = PilotBurner(geometry, operating, mechanism=mechanism, fuel=fuel)
+        results['pilot'] = pilot.get_pilot_burner_properties(case.geometry_config)
+    if 'coflow' in streams:
+        results['coflow'] = CoFlow(geometry, operating, mechanism=mechanism).calculate_flows()
+    values = []
+    for output in outputs:
+        stream, field = output.split('.', 1)
+        values.append(getattr(results[stream], field))
+    return values
+
+
+def _evaluate_point(case, x_name, y_name, outputs, point):
+    return evaluate_outputs(apply_parameters(case, **{x_name: point[0], y_name: point[1]}), outputs)
+
+
+@dataclasses.dataclass
+class AdaptiveResult:
+    """Sampled points and outputs of an adaptive sweep
+
+    Attributes:
+    ----------
+    x, y: np.ndarray
+        Parameter values of every evaluated point.
+    outputs: dict
+        Output name -> values at the points.
+    cells: list
+        Leaf cells as (x_min, x_max, y_min, y_max) in parameter units.
+    evaluations: int
+        Number of calculator evaluations spent.
+    """
+    x: np.ndarray
+    y: np.ndarray
+    outputs: dict
+    cells: list
+    evaluations: int
+
+
+class _Axis:
+    def __init__(self, name, low, high, log):
+        self.name = name
+        self.log = log
+        self.low = math.log(low) if log else low
+        self.high = math.log(high) if log else high
+
+    def value(self, fraction):
+        value = self.low + fraction * (self.high - self.low)
+        return math.exp(value) if self.log else value
+
+
+def adaptive_sweep(case, x, y, criteria, budget=500, initial=5, max_level=6, log_axes=(), workers=0):
+    """Sample outputs over two parameters, refining only where the criteria fire.
+
+    Args:
+        case: Base Case providing every parameter that is not swept
+        x, y: (parameter name, low, high) of the two swept OperatingParams/GeometryParams fields
+        criteria: Threshold / Gradient criteria on outputs named '<stream>.<field>', e.g. 'jet.karlovitz_number'
+        budget: Maximum number of evaluations, at least the initial**2 points of the initial grid
+        initial: Points per axis of the initial uniform grid (at least 2)
+        max_level: Maximum number of times a cell is split
+        log_axes: Names of parameters sampled on a logarithmic scale
+        workers: Worker processes evaluating each refinement round (0: evaluate in this process)
+    """
+    if initial < 2:
+        raise ValueError(f'The initial grid needs at least 2 points per axis, got {initial}')
+    if initial ** 2 > budget:
+        raise ValueError(f'The {initial}x{initial} initial grid exceeds the budget of {budget} evaluations')
+    outputs = list(dict.fromkeys(criterion.output for criterion in criteria))
+    axes = [_Axis(name, low, high, name in log_axes) for name, low, high in (x, y)]
+
+    # Points live on an integer lattice that is fine enough for the deepest level, so shared corners dedupe exactly
+    resolution = (initial - 1) * 2 ** max_level
+    values = {}
+
+    def to_parameters(point):
+        return tuple(axis.value(i / resolution) for axis, i in zip(axes, point))
+
+    def evaluate(points):
+        points = [point for point in dict.fromkeys(points) if point not in values]
+        evaluate_one = partial(_evaluate_point, case, axes[0].name, axes[1].name, outputs)
+        parameters = [to_parameters(point) for point in points]
+        if pool is not None:
+            results = list(pool.map(evaluate_one, parameters))
+        else:
+            results = [evaluate_one(p) for p in parameters]
+        for point, result in zip(points, results):
+            values[point] = np.array(result, dtype=float)
+
+    def corners(cell):
+        i, j, size = cell
+        return [(i, j), (i + size, j), (i, j + size), (i + size, j + size)]
+
+    def priority(cell):
+        corner_values = np.array([values[point] for point in corners(cell)])
+        return max((criterion.score(corner_values[:, outputs.index(criterion.output)]) for criterion in criteria),
+                   default=0.0)
+
+    pool = ProcessPoolExecutor(workers) if workers else None
+    try:
+        leaves = _refine(evaluate, corners, priority, values, initial, max_level, budget, workers)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    points = sorted(values)
+    parameters = np.array([to_parameters(point) for point in points])
+    output_values = np.array([values[point] for point in points])
+    cells = []
+    for i, j, size in sorted(leaves):
+        x0, y0 = to_parameters((i, j))
+        x1, y1 = to_parameters((i + size, j + size))
+        cells.append((x0, x1, y0, y1))
+
+    return AdaptiveResult(
+        x=parameters[:, 0],
+        y=parameters[:, 1],
+        outputs={output: output_values[:, k] for k, output in enumerate(outputs)},
+        cells=cells,
+        evaluations=len(values),
+    )
+
+
+def _refine(evaluate, corners, priority, values, initial, max_level, budget, workers):
+    # Returns the leaf cells (i, j, size) on the integer lattice after refinement
+    step = 2 ** max_level
+    leaves = [(i * step, j * step, step) for i in range(initial - 1) for j in range(initial - 1)]
+    evaluate([point for cell in leaves for point in corners(cell)])
+
+    # Max-heap on (criterion score, cell size)
+    heap = [(-priority(cell), -cell[2], cell) for cell in leaves]
+    heapq.heapify(heap)
+    leaves = set(leaves)
+
+    while heap and len(values) < budget:
+        # Refine one batch of the most important cells that still fits into the budget
+        batch = []
+        new_points = set()
+        while heap:
+            score, _, cell = heap[0]
+            if score == 0 or cell[2] == 1:
+                heapq.heappop(heap)
+                continue
+            i, j, size = cell
+            half = size // 2
+            points = {(i + half, j), (i, j + half), (i + half, j + half), (i + size, j + half), (i + half, j + size)}
+            points = {point for point in points if point not in values} - new_points
+            if len(values) + len(new_points) + len(points) > budget:
+                break
+            heapq.heappop(heap)
+            batch.append(cell)
+            new_points |= points
+            if len(batch) >= max(workers, 1) * 4:
+                break
+        if not batch:
+            break
+
+        evaluate(new_points)
+        for i, j, size in batch:
+            leaves.discard((i, j, size))
+            half = size // 2
+            for child in ((i, j, half), (i + half, j, half), (i, j + half, half), (i + half, j + half, half)):
+                leaves.add(child)
+                heapq.heappush(heap, (-priority(child), -half, child))
+
+    return leaves
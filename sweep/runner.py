@@ -0,0 +1,170 @@
+"""Process-pool sweeps over operating points and geometries.
+
+The parent allocates one shared memory result table per stream (jet, pilot, coflow, mixing) plus a status array for
+the whole sweep. Workers receive only the table descriptors and their slice of cases, attach to the tables and write
+their rows in place, so no result data is pickled back to the parent.
+"""
+import dataclasses
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from input_parameters.parameters import GeometryParams, OperatingParams
+from calculations.fuels import HYDROGEN
+from calculations.gas import DEFAULT_MECHANISM
+from calculations.jet_burner import JetBurner
+from calculations.pilot_burner import PilotBurner
+from calculations.n2_co_flow import CoFlow
+from calculations.mixed_temperature import MixedTemperature
+from calculations.results import JetBurnerTable, PilotBurnerTable, CoFlowTable, MixingTable
+from utils.shared_memory import SharedArrays, SharedTable, start_resource_tracker
+
+# Case status codes in SweepResults.status
+PENDING = 0
+DONE = 1
+FAILED = -1
+
+STREAM_TABLES = {
+    'jet': JetBurnerTable,
+    'pilot': PilotBurnerTable,
+    'coflow': CoFlowTable,
+    'mixing': MixingTable,
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class Case:
+    """One point of a sweep"""
+    geometry: GeometryParams = dataclasses.field(default_factory=GeometryParams)
+    operating: OperatingParams = dataclasses.field(default_factory=OperatingParams)
+    geometry_config: str = 'Honeycomb'
+    mechanism: str = DEFAULT_MECHANISM
+    fuel: str = HYDROGEN
+
+
+def evaluate_case(case):
+    """Run the jet, pilot, coflow and mixing calculators for one case"""
+    geometry, operating, mechanism, fuel = case.geometry, case.operating, case.mechanism, case.fuel
+    jet = JetBurner(geometry, operating, mechanism=mechanism, fuel=fuel).get_jet_burner_properties()
+    pilot = PilotBurner(geometry, operating, mechanism=mechanism, fuel=fuel).get_pilot_burner_properties(
+        case.geometry_config)
+    coflow = CoFlow(geometry, operating, mechanism=mechanism).calculate_flows()
+    mixing = MixedTemperature(geometry, operating, mechanism=mechanism, fuel=fuel).calculate_mixed_temperature(
+        case.geometry_config, jet_results=jet, pilot_results=pilot, coflow_results=coflow)
+    return {'jet': jet, 'pilot': pilot, 'coflow': coflow, 'mixing': mixing}
+
+
+@dataclasses.dataclass(frozen=True)
+class SweepDescriptor:
+    """Picklable handle to the shared result tables of a sweep"""
+    tables: dict
+    status: object
+
+
+class SweepResults:
+    """Shared result tables of a sweep, one row per case"""
+
+    def __init__(self, tables, status, owner):
+        self.shared_tables = tables
+        self.shared_status = status
+        self.owner = owner
+        self.errors = {}
+
+    @classmethod
+    def allocate(cls, n):
+        tables = {stream: SharedTable.allocate(table_class, n) for stream, table_class in STREAM_TABLES.items()}
+        status = SharedArrays.allocate({'status': ((n,), np.int8)})
+        status['status'][:] = PENDING
+        return cls(tables, status, owner=True)
+
+    @classmethod
+    def attach(cls, descriptor):
+        tables = {stream: SharedTable.attach(table) for stream, table in descriptor.tables.items()}
+        return cls(tables, SharedArrays.attach(descriptor.status), owner=False)
+
+    @property
+    def descriptor(self):
+        return SweepDescriptor({stream: table.descriptor for stream, table in self.shared_tables.items()},
+                               self.shared_status.descriptor)
+
+    @property
+    def status(self):
+        return self.shared_status['status']
+
+    def __getitem__(self, stream):
+        """Result table of one stream ('jet', 'pilot', 'coflow' or 'mixing')"""
+        return self.shared_tables[stream].table
+
+    def __len__(self):
+        return len(self.status)
+
+    def write(self, index, results):
+        for stream, row in results.items():
+            self.shared_tables[stream].table.set_row(index, row)
+        self.status[index] = DONE
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def close(self):
+        """Release the mappings, and the blocks themselves if this process owns them"""
+        for shared in (*self.shared_tables.values(), self.shared_status):
+            shared.close()
+            if self.owner:
+                shared.unlink()
+
+
+def _evaluate_chunk(descriptor, cases, start):
+    # Worker side: write rows straight into the parent's shared tables
+    results = SweepResults.attach(descriptor)
+    errors = {}
+    try:
+        for offset, case in enumerate(cases):
+            try:
+                results.write(start + offset, evaluate_case(case))
+            except Exception as e:
+                results.status[start + offset] = FAILED
+                errors[start + offset] = f'{type(e).__name__}: {e}'
+    finally:
+        results.close()
+    return start, len(cases), errors
+
+
+def run_sweep(cases, workers=None, chunk_size=16, on_chunk=None):
+    """Evaluate `cases` in a process pool and return the shared SweepResults.
+
+    Args:
+        cases: Sequence of Case
+        workers: Number of worker processes (None: one per CPU, 0: evaluate in this process)
+        chunk_size: Number of cases sent to a worker at once
+        on_chunk: Optional callback(results, start, count) run in the parent whenever a chunk finishes
+
+    The caller owns the returned results and must close() them.
+    """
+    cases = list(cases)
+    start_resource_tracker()
+    results = SweepResults.allocate(len(cases))
+    chunks = [(start, cases[start:start + chunk_size]) for start in range(0, len(cases), chunk_size)]
+
+    def finished(start, count, errors):
+        results.errors.update(errors)
+        if on_chunk is not None:
+            on_chunk(results, start, count)
+
+    try:
+        if workers == 0:
+            for start, chunk in chunks:
+                finished(*_evaluate_chunk(results.descriptor, chunk, start))
+        else:
+            with ProcessPoolExecutor(workers) as pool:
+                futures = [pool.submit(_evaluate_chunk, results.descriptor, chunk, start) for start, chunk in chunks]
+                for future in as_completed(futures):
+                    finished(*future.result())
+    except BaseException:
+        results.close()
+        raise
+    return results
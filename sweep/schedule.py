@@ -0,0 +1,170 @@
+"""Operating schedules: time-dependent setpoints streamed through the batched burner models.
+
+Ignition and load-ramp sequences are described by one Profile per varied OperatingParams field (or the pilot
+equivalence ratio, which sets the pilot fuel velocity at the scheduled air flow); every other input keeps the value of
+the case. `run_schedule` is a generator yielding one ScheduleStep per time step. The geometry of the case is
+evaluated once, the property tables once for the whole schedule, and the steps are pushed through
+calculations.vectorized a chunk at a time, so a sequence of thousands of steps costs a handful of batch calls:
+
+    profiles = {'jet_velocity': Profile([0.0, 2.0, 5.0], [20.0, 20.0, 120.0]),
+                'pilot_equivalence_ratio': Profile([0.0, 1.0], [0.8, 0.4], kind='step')}
+    for step in run_schedule(Case(), profiles, np.arange(0.0, 5.0, 1e-3), csv_path='ramp.csv'):
+        print(step.time, step.results['mixing'].mixed_temp)
+
+With `csv_path` every chunk is appended to the file as soon as it is evaluated ('time', the setpoints and
+'<stream>.<field>' columns), so an interrupted sequence keeps everything up to its last chunk.
+"""
+import csv
+import dataclasses
+
+import numpy as np
+
+from input_parameters.parameters import OperatingParams
+from calculations.burner_array import uniform_array
+from calculations.vectorized import AIR, STREAMS, evaluate_batch, gas_density, pilot_stoich_ratio, table_bounds
+from calculations.fuels import blend_composition
+from calculations.gas import DEFAULT_MECHANISM
+
+KINDS = ('linear', 'step')
+SETPOINTS = tuple(field.name for field in dataclasses.fields(OperatingParams)) + ('pilot_equivalence_ratio',)
+
+
+@dataclasses.dataclass(frozen=True)
+class Profile:
+    """Setpoint over time, held constant before the first and after the last point
+
+    Attributes:
+    ----------
+    times: tuple
+        Increasing times of the points [s].
+    values: tuple
+        Setpoint at each time.
+    kind: str
+        'linear' interpolates between the points, 'step' holds each value until the next point.
+    """
+    times: tuple
+    values: tuple
+    kind: str = 'linear'
+
+    def __post_init__(self):
+        object.__setattr__(self, 'times', tuple(float(t) for t in self.times))
+        object.__setattr__(self, 'values', tuple(float(v) for v in self.values))
+        if self.kind not in KINDS:
+            raise ValueError(f"Unknown profile kind '{self.kind}'; choose from {KINDS}")
+        if not self.times or len(self.times) != len(self.values):
+            raise ValueError('A profile needs as many values as times, and at least one')
+        if np.any(np.diff(self.times) <= 0):
+            raise ValueError('Profile times must be increasing')
+
+    def __call__(self, time):
+        """Setpoint at the times (array or scalar)"""
+        if self.kind == 'linear':
+            return np.interp(time, self.times, self.values)
+        index = np.searchsorted(self.times, time, side='right') - 1
+        return np.asarray(self.values)[np.maximum(index, 0)]
+
+
+@dataclasses.dataclass
+class ScheduleStep:
+    """Burner state at one time step
+
+    Attributes:
+    ----------
+    index: int
+        Position of the step in the schedule.
+    time: float
+        Time of the step [s].
+    setpoints: dict
+        Scheduled values at this time.
+    results: dict
+        Stream name -> result dataclass (JetBurnerProperties, PilotBurnerProperties, CoFlowResults, MixingResults).
+    """
+    index: int
+    time: float
+    setpoints: dict
+    results: dict
+
+
+def _fuel_velocity(parameters, phi, fuel, mechanism):
+    # Pilot fuel velocity giving the equivalence ratio at the scheduled air flow (inverse of pilot_equivalence_ratio)
+    pressure, temperature = parameters['pilot_pressure'], parameters['pilot_temperature']
+    mass_flow_air = parameters['pilot_air_velocity'] * parameters['air_hole_area'] * gas_density(
+        AIR, temperature, pressure, mechanism)
+    mass_flow_fuel = phi * mass_flow_air / pilot_stoich_ratio(fuel, mechanism)
+    return mass_flow_fuel / (parameters['fuel_hole_area'] * gas_density(fuel, temperature, pressure, mechanism))
+
+
+def schedule_parameters(nominal, profiles, times, fuel, mechanism=DEFAULT_MECHANISM):
+    """Batch parameters (calculations.vectorized) of the case `nominal` with the profiles applied at the times"""
+    times = np.asarray(times, dtype=float)
+    parameters = {name: np.broadcast_to(value, times.shape) for name, value in nominal.items()}
+    parameters.update({name: profile(times) for name, profile in profiles.items()
+                       if name != 'pilot_equivalence_ratio'})
+    if 'pilot_equivalence_ratio' in profiles:
+        parameters['pilot_fuel_velocity'] = _fuel_velocity(parameters, profiles['pilot_equivalence_ratio'](times),
+                                                           fuel, mechanism)
+    return parameters
+
+
+class _CsvWriter:
+    def __init__(self, path, setpoints, tables):
+        self.file = open(path, 'w', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(['time', *setpoints] + [f'{stream}.{field}' for stream, table in tables.items()
+                                                     for field in table.data.dtype.names])
+
+    def write(self, times, setpoints, tables):
+        columns = [times, *setpoints.values()] + [table.data[field] for table in tables.values()
+                                                  for field in table.data.dtype.names]
+        np.savetxt(self.file, np.column_stack(columns), delimiter=',', fmt='%.17g')
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def run_schedule(case, profiles, times, streams=STREAMS, chunk_size=500, csv_path=None):
+    """Evaluate the burner chain of `case` at every time, yielding one ScheduleStep per time.
+
+    Args:
+        case: sweep.runner.Case giving the geometry, the fuel, the mechanism and the operating values that are not
+            scheduled
+        profiles: {setpoint name: Profile}, names from SETPOINTS
+        times: Increasing time steps [s]
+        streams: Streams to evaluate, see calculations.vectorized.evaluate_batch
+        chunk_size: Steps evaluated per batch call
+        csv_path: File the results are appended to as they are evaluated
+    """
+    unknown = set(profiles) - set(SETPOINTS)
+    if unknown:
+        raise ValueError(f'Unsupported setpoints {sorted(unknown)}; choose from {SETPOINTS}')
+    if 'pilot_equivalence_ratio' in profiles and 'pilot_fuel_velocity' in profiles:
+        raise ValueError("Schedule either 'pilot_equivalence_ratio' or 'pilot_fuel_velocity', not both")
+    fuel = blend_composition(case.fuel)
+    times = np.asarray(times, dtype=float)
+
+    # Geometry (hole statistics) once, property tables once over the whole schedule
+    nominal = {name: values[0] for name, values in uniform_array(case, 1).items()}
+    mechanism = case.mechanism
+    bounds = table_bounds(schedule_parameters(nominal, profiles, times, fuel, mechanism), fuel, mechanism)
+
+    writer = None
+    try:
+        for start in range(0, len(times), chunk_size):
+            chunk = times[start:start + chunk_size]
+            setpoints = {name: profile(chunk) for name, profile in profiles.items()}
+            tables = evaluate_batch(schedule_parameters(nominal, profiles, chunk, fuel, mechanism), streams=streams,
+                                    bounds=bounds, fuel=fuel, mechanism=mechanism)
+            if csv_path:
+                writer = writer or _CsvWriter(csv_path, setpoints, tables)
+                writer.write(chunk, setpoints, tables)
+            for i, time in enumerate(chunk.tolist()):
+                yield ScheduleStep(
+                    index=start + i,
+                    time=time,
+                    setpoints={name: float(values[i]) for name, values in setpoints.items()},
+                    results={stream: table.row(i) for stream, table in tables.items()},
+                )
+    finally:
+        if writer:
+            writer.close()
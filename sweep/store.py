@@ -0,0 +1,212 @@
+"""Append-only on-disk result store for resumable sweeps.
+
+Layout of a store directory:
+    chunks/chunk_000000.npz   result columns of one finished chunk ('<stream>.<field>', plus 'case_hash')
+    index.jsonl               one line per case outcome: {"hash", "status", "chunk", "row", "error"}
+
+A chunk file is written completely (temporary file + rename) before its index lines are appended, so after a crash
+the index only references complete chunks; a torn last index line is ignored. Cases are identified by a hash of their
+geometry, operating point, geometry config, fuel and mechanism, so a restarted sweep skips everything already done
+and only retries failures according to its RetryPolicy.
+"""
+import dataclasses
+import hashlib
+import json
+import os
+
+import numpy as np
+
+from calculations.fuels import blend_composition
+from calculations.gas import MECHANISMS, Mechanism
+from sweep.runner import STREAM_TABLES, DONE, run_sweep
+
+INDEX_FILE = 'index.jsonl'
+CHUNK_DIR = 'chunks'
+
+
+def _mechanism_key(mechanism):
+    # Registry names and the mechanism files they stand for hash alike
+    if isinstance(mechanism, str):
+        mechanism = MECHANISMS.get(mechanism, Mechanism(mechanism))
+    return dataclasses.asdict(mechanism)
+
+
+def case_hash(case):
+    """Stable hash of a Case, independent of object identity and field order"""
+    key = {
+        'geometry': dataclasses.asdict(case.geometry),
+        'operating': dataclasses.asdict(case.operating),
+        'geometry_config': case.geometry_config,
+        'fuel': blend_composition(case.fuel),
+        'mechanism': _mechanism_key(case.mechanism),
+    }
+    return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()[:32]
+
+
+@dataclasses.dataclass
+class RetryPolicy:
+    """When failed cases are evaluated again
+
+    Attributes:
+    ----------
+    max_attempts: int
+        Total number of attempts per case, including the first one.
+    retry_on: tuple
+        Exception type names that are retried (e.g. 'CanteraError'); empty means every failure is retried.
+    """
+    max_attempts: int = 3
+    retry_on: tuple = ()
+
+    def should_retry(self, attempts, error):
+        if attempts >= self.max_attempts:
+            return False
+        if not self.retry_on:
+            return True
+        error_type = (error or '').split(':', 1)[0]
+        return error_type in self.retry_on
+
+
+class ResultStore:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(os.path.join(directory, CHUNK_DIR), exist_ok=True)
+        self.index_path = os.path.join(directory, INDEX_FILE)
+
+        # Latest outcome per case hash and number of failed attempts
+        self.records = {}
+        self.failures = {}
+        self.next_chunk = 0
+        self._read_index()
+
+    def _read_index(self):
+        if not os.path.exists(self.index_path):
+            return
+        chunk_names = set()
+        with open(self.index_path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn write from an interrupted run
+                self._add_record(record)
+                if record.get('chunk'):
+                    chunk_names.add(record['chunk'])
+        if chunk_names:
+            self.next_chunk = max(int(name[len('chunk_'):-len('.npz')]) for name in chunk_names) + 1
+
+    def _add_record(self, record):
+        if record['status'] == 'failed':
+            self.failures[record['hash']] = self.failures.get(record['hash'], 0) + 1
+        # A completed case stays completed
+        if self.records.get(record['hash'], {}).get('status') != 'done':
+            self.records[record['hash']] = record
+
+    def is_done(self, hash_):
+        return self.records.get(hash_, {}).get('status') == 'done'
+
+    def attempts(self, hash_):
+        return self.failures.get(hash_, 0) + self.is_done(hash_)
+
+    def last_error(self, hash_):
+        return self.records.get(hash_, {}).get('error')
+
+    def append_chunk(self, hashes, tables, status, errors):
+        """Persist one chunk of cases.
+
+        Args:
+            hashes: Case hashes of the chunk rows
+            tables: {stream: ResultTable} holding exactly the chunk rows
+            status: Status code per row (sweep.runner.DONE / FAILED)
+            errors: {row: message} for failed rows
+        """
+        name = None
+        if any(code == DONE for code in status):
+            name = f'chunk_{self.next_chunk:06d}.npz'
+            self.next_chunk += 1
+            self._write_chunk(name, hashes, tables)
+
+        records = []
+        for row, (hash_, code) in enumerate(zip(hashes, status)):
+            if code == DONE:
+                records.append({'hash': hash_, 'status': 'done', 'chunk': name, 'row': row})
+            else:
+                records.append({'hash': hash_, 'status': 'failed', 'chunk': None, 'row': None,
+                                'error': errors.get(row)})
+        with open(self.index_path, 'a') as f:
+            f.write(''.join(json.dumps(record) + '\n' for record in records))
+            f.flush()
+            os.fsync(f.fileno())
+        for record in records:
+            self._add_record(record)
+
+    def _write_chunk(self, name, hashes, tables):
+        path = os.path.join(self.directory, CHUNK_DIR, name)
+        columns = {'case_hash': np.array(hashes)}
+        for stream, table in tables.items():
+            for field in table.data.dtype.names:
+                columns[f'{stream}.{field}'] = table.data[field]
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **columns)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def load(self):
+        """Return (hashes, {stream: ResultTable}) for every completed case"""
+        by_chunk = {}
+        for hash_, record in self.records.items():
+            if record['status'] == 'done':
+                by_chunk.setdefault(record['chunk'], []).append((record['row'], hash_))
+
+        hashes = []
+        parts = {stream: [] for stream in STREAM_TABLES}
+        for name in sorted(by_chunk):
+            rows = sorted(by_chunk[name])
+            index = np.array([row for row, _ in rows])
+            hashes += [hash_ for _, hash_ in rows]
+            with np.load(os.path.join(self.directory, CHUNK_DIR, name)) as archive:
+                for stream, table_class in STREAM_TABLES.items():
+                    parts[stream].append(table_class.from_columns(
+                        **{field: archive[f'{stream}.{field}'][index] for field in table_class.fields()}))
+
+        tables = {stream: (STREAM_TABLES[stream].concatenate(chunks) if chunks else STREAM_TABLES[stream].empty(0))
+                  for stream, chunks in parts.items()}
+        return hashes, tables
+
+
+def run_resumable_sweep(cases, directory, workers=None, chunk_size=16, retry_policy=None, log=None):
+    """Run a sweep whose results are checkpointed chunk by chunk in a ResultStore.
+
+    Cases already completed in `directory` are skipped; failed cases are retried while `retry_policy` allows it,
+    both on restart and within this run. Returns the store; use `store.load()` for the results.
+    """
+    retry_policy = retry_policy or RetryPolicy()
+    store = ResultStore(directory)
+
+    # Duplicate cases are evaluated once
+    unique = {}
+    for case in cases:
+        unique.setdefault(case_hash(case), case)
+
+    while True:
+        pending = [(hash_, case) for hash_, case in unique.items()
+                   if not store.is_done(hash_)
+                   and (store.attempts(hash_) == 0
+                        or retry_policy.should_retry(store.attempts(hash_), store.last_error(hash_)))]
+        if not pending:
+            return store
+        if log:
+            log(f'{len(pending)} of {len(unique)} cases pending')
+
+        hashes = [hash_ for hash_, _ in pending]
+
+        def checkpoint(results, start, count):
+            rows = slice(start, start + count)
+            errors = {i - start: message for i, message in results.errors.items() if start <= i < start + count}
+            store.append_chunk(hashes[rows], {stream: results[stream][rows] for stream in STREAM_TABLES},
+                               results.status[rows], errors)
+
+        results = run_sweep([case for _, case in pending], workers=workers, chunk_size=chunk_size,
+                            on_chunk=checkpoint)
+        results.close()
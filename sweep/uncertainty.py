@@ -0,0 +1,156 @@
+"""Monte Carlo uncertainty propagation through the batched burner models.
+
+Measurement and manufacturing errors are described as distributions around the nominal value of a case parameter
+(flow controller accuracy on the velocities, transducer error on the pressures, hole tolerances on the pilot hole
+areas, ...). The samples are pushed through calculations.vectorized in chunks, optionally spread over a process pool,
+and summarized as output percentiles and variance-based (Sobol) sensitivity indices.
+
+Example:
+    result = propagate(
+        Case(),
+        inputs={'pilot_fuel_velocity': Normal(0.01, relative=True),
+                'pilot_air_velocity': Normal(0.01, relative=True),
+                'pilot_pressure': Uniform(0.02e5),
+                'air_hole_area': Normal(0.02, relative=True)},
+        samples=20000)
+    result.print_summary()
+
+Sensitivity indices use the Saltelli scheme, which evaluates samples * (number of inputs + 2) points; the first
+order index is the share of output variance explained by one input alone, the total index includes its interactions.
+"""
+import dataclasses
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from calculations.fuels import blend_composition
+from calculations.vectorized import BATCH_PARAMETERS, evaluate_batch, nominal_parameters, table_bounds
+from utils.distributions import Normal, Uniform
+
+DEFAULT_OUTPUTS = (
+    'pilot.equivalence_ratio',
+    'pilot.flame_power',
+    'pilot.flame_temperature',
+    'jet.flame_power',
+    'mixing.mixed_temp',
+)
+
+
+@dataclasses.dataclass
+class UncertaintyResult:
+    """Samples, output distributions and sensitivity indices of an uncertainty run
+
+    Attributes:
+    ----------
+    samples: dict
+        Input name -> sampled values.
+    outputs: dict
+        Output name -> values at the samples.
+    percentiles: dict
+        Output name -> {percentile: value}.
+    first_order, total_order: dict
+        Output name -> {input name: Sobol index}; empty if sensitivities were not requested.
+    """
+    samples: dict
+    outputs: dict
+    percentiles: dict
+    first_order: dict
+    total_order: dict
+
+    def print_summary(self):
+        for output, values in self.percentiles.items():
+            spread = '  '.join(f'p{p:g}: {value:.5e}' for p, value in values.items())
+            print(f'{output}: {spread}')
+            for name, first in self.first_order.get(output, {}).items():
+                print(f'    {name:24} S1 {first:6.3f}  ST {self.total_order[output][name]:6.3f}')
+
+
+def _evaluate_chunk(nominal, inputs, outputs, bounds, fuel, mechanism):
+    # Worker side: one block of samples, returns an (n, len(outputs)) array
+    streams = tuple(dict.fromkeys(output.split('.', 1)[0] for output in outputs))
+    tables = evaluate_batch({**nominal, **inputs}, streams=streams, bounds=bounds, fuel=fuel,
+                            mechanism=mechanism)
+    return np.column_stack([tables[stream].column(field)
+                            for stream, field in (output.split('.', 1) for output in outputs)])
+
+
+def _evaluate(nominal, inputs, outputs, workers, chunk_size, fuel, mechanism):
+    n = len(next(iter(inputs.values())))
+    bounds = table_bounds({**nominal, **inputs}, fuel, mechanism)
+    chunks = [{name: values[start:start + chunk_size] for name, values in inputs.items()}
+              for start in range(0, n, chunk_size)]
+    if workers == 0:
+        results = [_evaluate_chunk(nominal, chunk, outputs, bounds, fuel, mechanism) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(workers) as pool:
+            results = list(pool.map(_evaluate_chunk, *zip(*[(nominal, chunk, outputs, bounds, fuel, mechanism)
+                                                            for chunk in chunks])))
+    return np.concatenate(results)
+
+
+def propagate(case, inputs, outputs=DEFAULT_OUTPUTS, samples=10000, percentiles=(2.5, 50, 97.5), sensitivity=True,
+              workers=None, chunk_size=20000, seed=None):
+    """Propagate input uncertainties of one case to its outputs.
+
+    Args:
+        case: sweep.runner.Case giving the nominal geometry, operating point, geometry config, fuel and mechanism
+        inputs: {parameter name: Normal / Uniform}; OperatingParams fields, the geometry fields used by the
+            calculators, or 'air_hole_area' / 'fuel_hole_area' for the total pilot hole areas
+        outputs: Output names '<stream>.<field>', e.g. 'mixing.mixed_temp'
+        samples: Number of Monte Carlo samples
+        percentiles: Output percentiles to report
+        sensitivity: Also compute first order and total Sobol indices
+        workers: Worker processes (None: one per CPU, 0: evaluate in this process)
+        chunk_size: Samples evaluated per batch
+        seed: Seed of the random generator, for reproducible runs
+    """
+    unknown = set(inputs) - set(BATCH_PARAMETERS)
+    if unknown:
+        raise ValueError(f'Unsupported uncertain inputs {sorted(unknown)}; choose from {BATCH_PARAMETERS}')
+    names = list(inputs)
+    outputs = list(outputs)
+
+    nominal = nominal_parameters(case.geometry, case.operating, case.geometry_config)
+    rng = np.random.default_rng(seed)
+    A = {name: inputs[name].sample(nominal[name], rng, samples) for name in names}
+    blocks = [A]
+    if sensitivity:
+        B = {name: inputs[name].sample(nominal[name], rng, samples) for name in names}
+        # A with column i taken from B, one block per input
+        blocks += [B] + [{**A, name: B[name]} for name in names]
+
+    stacked = {name: np.concatenate([block[name] for block in blocks]) for name in names}
+    values = _evaluate(nominal, stacked, outputs, workers, chunk_size, blend_composition(case.fuel),
+                       case.mechanism)
+    values = values.reshape(len(blocks), samples, len(outputs))
+
+    f_A = values[0]
+    result = UncertaintyResult(
+        samples=A,
+        outputs={output: f_A[:, k] for k, output in enumerate(outputs)},
+        percentiles={output: dict(zip(percentiles, np.nanpercentile(f_A[:, k], percentiles)))
+                     for k, output in enumerate(outputs)},
+        first_order={},
+        total_order={},
+    )
+
+    if sensitivity:
+        # Centering keeps the estimators accurate for outputs with a large mean relative to their spread
+        centered = values - np.nanmean(values[:2], axis=(0, 1))
+        f_A, f_B = centered[0], centered[1]
+        variance = np.nanvar(np.concatenate([f_A, f_B]), axis=0)
+        for k, output in enumerate(outputs):
+            result.first_order[output] = {}
+            result.total_order[output] = {}
+            for i, name in enumerate(names):
+                f_AB = centered[2 + i][:, k]
+                if variance[k] == 0:
+                    first = total = 0.0
+                else:
+                    # Saltelli (2010) first order and Jansen total effect estimators
+                    first = np.nanmean(f_B[:, k] * (f_AB - f_A[:, k])) / variance[k]
+                    total = 0.5 * np.nanmean((f_A[:, k] - f_AB) ** 2) / variance[k]
+                result.first_order[output][name] = float(first)
+                result.total_order[output][name] = float(total)
+
+    return result
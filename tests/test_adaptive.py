@@ -0,0 +1,18 @@
+"""Adaptive sweeps stay within their evaluation budget."""
+import pytest
+
+from sweep.adaptive import Gradient, adaptive_sweep
+from sweep.runner import Case
+
+
+def test_initial_grid_over_budget():
+    with pytest.raises(ValueError):
+        adaptive_sweep(Case(), ('jet_velocity', 50.0, 150.0), ('jet_temperature', 300.0, 600.0),
+                       [Gradient('jet.reynolds_number')], budget=10, initial=5)
+
+
+def test_refinement_within_budget():
+    result = adaptive_sweep(Case(), ('jet_velocity', 50.0, 150.0), ('jet_temperature', 300.0, 600.0),
+                            [Gradient('jet.reynolds_number', rel_tol=1e-3)], budget=20, initial=3, max_level=2)
+    assert 9 < result.evaluations <= 20
+    assert len(result.x) == result.evaluations
@@ -0,0 +1,12 @@
+"""Headless entry points must not import the heavy dependencies they don't need (see benchmarks.bench)."""
+import pytest
+
+from benchmarks.bench import COLD_START_PROBES, measure_cold_start
+
+
+@pytest.mark.parametrize('probe', list(COLD_START_PROBES))
+def test_no_heavy_imports(probe):
+    _, forbidden = COLD_START_PROBES[probe]
+    _, loaded = measure_cold_start(probe, repeats=1)
+    assert not set(loaded) & set(forbidden), f'{probe} imported {loaded}'
+
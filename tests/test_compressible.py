@@ -0,0 +1,36 @@
+"""Compressible jet: incompressible limit, choking and the Fanno relations."""
+import dataclasses
+
+import numpy as np
+import pytest
+
+from calculations.compressible import CompressibleParams, fanno_length, fanno_mach, jet_flow
+from calculations.jet_burner import JetBurner
+from input_parameters.parameters import GeometryParams, OperatingParams
+
+
+def test_low_mach_matches_incompressible_jet():
+    # At 1 m/s the density drop of the expansion is of order M^2 / 2, a few 1e-6
+    operating = dataclasses.replace(OperatingParams(), jet_velocity=1.0)
+    incompressible = JetBurner(GeometryParams(), operating).calculate_flows()
+    compressible = JetBurner(GeometryParams(), operating, compressible=CompressibleParams()).calculate_flows()
+    assert compressible['mass_flow_total'] == pytest.approx(incompressible['mass_flow_total'], rel=1e-5)
+
+
+@pytest.mark.parametrize('model', [CompressibleParams(), CompressibleParams('fanno', pipe_length=0.2)],
+                         ids=lambda params: params.model)
+def test_choked_mass_flow_is_constant(model):
+    # The 0.2 m pipe of the Fanno model already chokes by friction at 300 m/s
+    flow = jet_flow(0.4, 1e5, 300.0, np.array([300.0, 1000.0, 1500.0, 5000.0]), 1e-5, model)
+    choked = slice(1, None) if model.model == 'isentropic' else slice(None)
+    assert flow['choked'][choked].all()
+    assert flow['mass_flow'][choked] == pytest.approx(np.full_like(flow['mass_flow'][choked], flow['mass_flow'][-1]),
+                                                      rel=1e-9)
+    # Below the choking velocity the mass flow is smaller
+    assert jet_flow(0.4, 1e5, 300.0, 100.0, 1e-5, model)['mass_flow'] < flow['mass_flow'][-1]
+
+
+@pytest.mark.parametrize('gamma', [1.3, 1.4])
+def test_fanno_mach_inverts_fanno_length(gamma):
+    mach = np.linspace(0.05, 0.99, 20)
+    np.testing.assert_allclose(fanno_mach(fanno_length(mach, gamma), gamma), mach, rtol=1e-9)
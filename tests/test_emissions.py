@@ -0,0 +1,31 @@
+"""NOx estimates fill the table they are given, not the persistent default table."""
+import numpy as np
+
+from calculations import emissions
+from calculations.emissions import NOxTable, NOxTableParams, flame_emissions
+from sweep.runner import Case, evaluate_case
+
+PARAMS = NOxTableParams(residence_points=3, max_residence_time=10e-3)
+
+
+def test_passed_table_is_filled(tmp_path, monkeypatch):
+    cache = tmp_path / 'nox_table.npz'
+    monkeypatch.setenv('BURNER_EMISSIONS_CACHE', str(cache))
+    monkeypatch.setattr(emissions, '_default_table', None)
+    case = Case()
+    results = evaluate_case(case)
+    table = NOxTable(PARAMS)
+    estimate = flame_emissions(results['jet'], results['pilot'], case.operating, table=table)
+    assert len(table) > 0
+    assert emissions._default_table is None and not cache.exists()
+    assert np.isfinite(estimate.jet_NO) and estimate.jet_NO > 0
+
+
+def test_table_round_trip(tmp_path):
+    path = str(tmp_path / 'table.npz')
+    table = NOxTable(PARAMS, path)
+    values = table(0.5, 600.0, 1e5, 5e-3)
+    reloaded = NOxTable(PARAMS, path)
+    assert len(reloaded) == len(table)
+    assert reloaded(0.5, 600.0, 1e5, 5e-3)['NO'] == values['NO']
+    assert len(reloaded) == len(table)
@@ -0,0 +1,15 @@
+"""The per-hole pilot flows carry the PilotBurner totals."""
+import pytest
+
+from calculations.flow_network import pilot_flow_distribution
+from calculations.pilot_burner import PilotBurner
+from input_parameters.parameters import GeometryParams, OperatingParams
+
+
+@pytest.mark.parametrize('geometry_config', ['Honeycomb', 'Plate'])
+def test_totals_match_pilot_burner(geometry_config):
+    geometry, operating = GeometryParams(), OperatingParams()
+    flows = pilot_flow_distribution(geometry_config, geometry, operating)
+    pilot = PilotBurner(geometry, operating).get_pilot_burner_properties(geometry_config)
+    assert flows.air.mass_flow.sum() == pytest.approx(pilot.mass_flow_air, rel=1e-9)
+    assert flows.fuel.mass_flow.sum() == pytest.approx(pilot.mass_flow_h2, rel=1e-9)
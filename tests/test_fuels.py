@@ -0,0 +1,20 @@
+"""Pure H2 results are unchanged by the fuel blend support."""
+import pytest
+
+from calculations.fuels import HYDROGEN, h2_blend, stoich_air_fuel_ratio
+from calculations.vectorized import pilot_stoich_ratio
+from sweep.runner import Case, evaluate_case
+
+
+def test_h2_stoichiometric_ratio():
+    # H2 + 0.5 (O2 + 3.76 N2) by mole, as mass of oxidizer per mass of fuel
+    expected = 0.5 * (31.998 + 3.76 * 28.014) / 2.016
+    assert stoich_air_fuel_ratio(HYDROGEN) == pytest.approx(expected, rel=1e-6)
+    assert pilot_stoich_ratio() == pytest.approx(expected, rel=1e-6)
+    assert stoich_air_fuel_ratio(h2_blend('CH4', 0.0)) == stoich_air_fuel_ratio(HYDROGEN)
+
+
+def test_default_case_regression():
+    results = evaluate_case(Case())
+    assert results['pilot'].equivalence_ratio == pytest.approx(0.3626, rel=1e-5)
+    assert results['mixing'].mixed_temp == pytest.approx(400.413, rel=1e-5)
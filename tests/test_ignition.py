@@ -0,0 +1,32 @@
+"""Ignition delays of the jet mixture."""
+import dataclasses
+
+import numpy as np
+
+from calculations import ignition
+from calculations.ignition import IgnitionDelayCache, IgnitionParams, jet_ignition_delays
+from sweep.runner import Case, evaluate_case
+
+PARAMS = IgnitionParams(max_time=0.01)
+
+
+def test_delay_falls_with_temperature():
+    delays = IgnitionDelayCache(PARAMS)(0.5, [1000.0, 1100.0, 1200.0], 1e5, workers=0)
+    assert np.all(np.isfinite(delays))
+    assert np.all(np.diff(delays) < 0)
+
+
+def test_no_ignition_below_threshold():
+    assert IgnitionDelayCache(PARAMS)(0.5, 600.0, 1e5, workers=0) == np.inf
+
+
+def test_passed_cache_is_filled(tmp_path, monkeypatch):
+    path = tmp_path / 'ignition_delays.npz'
+    monkeypatch.setenv('BURNER_IGNITION_CACHE', str(path))
+    monkeypatch.setattr(ignition, '_default_cache', None)
+    case = Case()
+    pilot = dataclasses.replace(evaluate_case(case)['pilot'], flame_temperature=1200.0)
+    cache = IgnitionDelayCache(PARAMS)
+    results = jet_ignition_delays(pilot, case.operating, cache=cache, workers=0)
+    assert len(cache) == 1 and np.isfinite(results.shortest_delay)
+    assert ignition._default_cache is None and not path.exists()
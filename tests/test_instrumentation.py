@@ -0,0 +1,69 @@
+"""Stage timing, event counters and their JSON / Prometheus rendering."""
+import json
+
+import pytest
+
+from utils import instrumentation
+from utils.instrumentation import count, instrumented, stage
+
+
+@pytest.fixture
+def recorder(monkeypatch):
+    monkeypatch.setattr(instrumentation, '_enabled', True)
+    monkeypatch.setattr(instrumentation, '_stats', {})
+    return instrumentation
+
+
+@instrumented('outer')
+def _outer(n):
+    count('events', n)
+    with stage('inner'):
+        count('events')
+        count('other', 2)
+
+
+def test_stage_timing_and_counts(recorder):
+    _outer(3)
+    _outer(4)
+    count('loose')
+    data = recorder.snapshot()
+    assert data['outer']['calls'] == 2 and data['inner']['calls'] == 2
+    assert data['outer']['counters'] == {'events': 7}
+    assert data['inner']['counters'] == {'events': 2, 'other': 4}
+    assert data[instrumentation.GLOBAL_STAGE]['counters'] == {'loose': 1}
+    # Stages nest, so the outer wall time includes the inner one
+    assert data['outer']['wall_time'] >= data['inner']['wall_time'] > 0
+
+
+def test_disabled_is_a_no_op(monkeypatch):
+    monkeypatch.setattr(instrumentation, '_enabled', False)
+    monkeypatch.setattr(instrumentation, '_stats', {})
+    assert stage('inner') is instrumentation._NULL_STAGE
+    _outer(3)
+    assert instrumentation.snapshot() == {}
+
+
+def test_json_and_prometheus(recorder):
+    _outer(3)
+    assert json.loads(recorder.to_json()) == recorder.snapshot()
+
+    lines = recorder.to_prometheus(prefix='test').splitlines()
+    assert 'test_stage_calls_total{stage="outer"} 1' in lines
+    assert 'test_stage_events_total{stage="inner",counter="other"} 2' in lines
+    assert '# TYPE test_stage_wall_seconds_total counter' in lines
+    assert any(line.startswith('test_stage_wall_seconds_total{stage="inner"} ') for line in lines)
+
+
+def test_shapely_operations_counted(recorder):
+    from geometry import plate_generator
+    from geometry.fast_statistics import hole_statistics
+    from input_parameters.parameters import GeometryParams
+
+    air_holes, fuel_holes, _ = plate_generator.get_hole_coordinates()
+    placement = recorder.snapshot()['hole_placement']
+    # At least a buffer and a containment test per placed hole
+    assert placement['counters']['shapely_ops'] >= 2 * (len(air_holes) + len(fuel_holes))
+
+    # The vectorized statistics count their array operations outside any stage; an unusual geometry avoids the cache
+    hole_statistics('Plate', GeometryParams(pilot_hex_cell_size=1.73e-3))
+    assert recorder.snapshot()[instrumentation.GLOBAL_STAGE]['counters']['shapely_ops'] > 0
@@ -0,0 +1,31 @@
+"""Per-hole flow areas of the pilot pattern against the hole statistics of the generators."""
+import math
+
+import numpy as np
+import pytest
+
+from geometry.hole_arrays import hole_arrays
+from geometry.lattice import flow_areas
+from geometry.honeycomb_generator import honeycomb_generator
+from geometry.plate_generator import plate_generator
+from input_parameters.parameters import GeometryParams
+
+
+def test_honeycomb_jet_footprint():
+    geometry = GeometryParams()
+    arrays = hole_arrays('Honeycomb', geometry)
+    air, fuel = flow_areas('Honeycomb', arrays, geometry)
+    statistics = honeycomb_generator(params=geometry)
+    assert np.all(air >= 0)
+    # Only the jet OD over the cell walls separates the two totals
+    jet_od_area = math.pi * (geometry.jet_OD / 2) ** 2
+    assert 0 < air.sum() - statistics['air_hole_area'] < jet_od_area - arrays['jet_areas'][0]
+    assert fuel.sum() == pytest.approx(statistics['fuel_hole_area'])
+
+
+def test_plate_areas_match_statistics():
+    geometry = GeometryParams()
+    air, fuel = flow_areas('Plate', hole_arrays('Plate', geometry), geometry)
+    statistics = plate_generator(params=geometry)
+    assert air.sum() == pytest.approx(statistics['air_hole_area'])
+    assert fuel.sum() == pytest.approx(statistics['fuel_hole_area'])
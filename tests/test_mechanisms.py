@@ -0,0 +1,41 @@
+"""The reduced mechanisms of calculations.gas.MECHANISMS reproduce the gri30 jet flows and flames."""
+import dataclasses
+
+import numpy as np
+import pytest
+
+from calculations.fuels import clear_caches
+from calculations.gas import MECHANISMS
+from calculations.jet_burner import JetBurner
+from input_parameters.parameters import GeometryParams, OperatingParams
+
+# Largest accepted relative deviation from gri30 in flame temperature and density (unburnt and flame)
+TOLERANCE = 0.01
+
+# (jet equivalence ratio, temperature [K], pressure [Pa]) at which the mechanisms are compared
+POINTS = [(phi, temperature, pressure) for phi in (0.3, 0.6, 1.0, 1.5, 2.5)
+          for temperature in (300.0, 600.0) for pressure in (101325.0, 5e5)]
+
+
+def _jet_flame(mechanism, phi, temperature, pressure):
+    # Unburnt and flame density and flame temperature of the jet at one point
+    operating = dataclasses.replace(OperatingParams(), jet_equivalence_ratio=phi, jet_temperature=temperature,
+                                    jet_pressure=pressure)
+    jet = JetBurner(GeometryParams(), operating, mechanism=mechanism)
+    flows = jet.calculate_flows()
+    flame = jet.calculate_flame_properties(flows['mass_flow_h2'])
+    return flows['rho_mix'], flame['flame_density'], flame['flame_temperature']
+
+
+@pytest.fixture(scope='module')
+def reference():
+    clear_caches()
+    return np.array([_jet_flame('gri30', *point) for point in POINTS])
+
+
+@pytest.mark.parametrize('mechanism', [name for name in MECHANISMS if name != 'gri30'])
+def test_mechanism_matches_gri30(mechanism, reference):
+    values = np.array([_jet_flame(mechanism, *point) for point in POINTS])
+    deviation = np.abs(values / reference - 1).max(axis=0)
+    assert deviation[:2].max() < TOLERANCE, f'density deviates by {deviation[:2].max():.2e}'
+    assert deviation[2] < TOLERANCE, f'flame temperature deviates by {deviation[2]:.2e}'
@@ -0,0 +1,34 @@
+"""Supply pressure drops: laminar limit of the passage law and growth with the flow velocities."""
+import numpy as np
+import pytest
+
+from calculations.pressure_drop import batch_pressure_drops, friction_factor, parallel_holes, pilot_holes
+from calculations.vectorized import nominal_parameters
+from input_parameters.parameters import GeometryParams, OperatingParams
+
+
+def test_friction_factor_laminar_limit():
+    reynolds = np.array([10.0, 100.0, 500.0, 1000.0])
+    assert friction_factor(reynolds) == pytest.approx(64.0 / reynolds, rel=1e-6)
+
+
+def test_long_tube_is_hagen_poiseuille():
+    # L/D = 1000 at Re ~ 7: wall friction dwarfs the entrance and exit losses
+    density, viscosity, diameter, length, velocity = 1.2, 1.8e-5, 1e-3, 1.0, 0.1
+    area = np.pi / 4 * diameter ** 2
+    drop, velocities = parallel_holes(density * velocity * area, [area], [diameter], length, density, viscosity)
+    assert drop == pytest.approx(32.0 * viscosity * length * velocity / diameter ** 2, rel=1e-3)
+    assert np.ravel(velocities) == pytest.approx([velocity])
+
+
+@pytest.mark.parametrize('geometry_config', ['Honeycomb', 'Plate'])
+def test_drops_grow_with_velocity(geometry_config):
+    geometry = GeometryParams()
+    parameters = dict(nominal_parameters(geometry, OperatingParams(), geometry_config))
+    scale = np.linspace(0.1, 3.0, 30)
+    for name in ('pilot_air_velocity', 'pilot_fuel_velocity', 'coflow_velocity'):
+        parameters[name] = parameters[name] * scale
+    drops = batch_pressure_drops(parameters, holes=pilot_holes(geometry_config, geometry))
+    for name in ('air_pressure_drop', 'fuel_pressure_drop', 'coflow_pressure_drop'):
+        assert np.all(drops[name] > 0)
+        assert np.all(np.diff(drops[name]) > 0), name
@@ -0,0 +1,47 @@
+"""Radial profiles: Poiseuille limits and consistency of the plug profile with the bulk calculators."""
+import pytest
+
+from calculations.n2_co_flow import CoFlow
+from calculations.radial_profiles import GRIDS, ProfileParams, coflow_profiles, radial_profiles
+from input_parameters.parameters import GeometryParams, OperatingParams
+
+
+@pytest.mark.parametrize('grid', GRIDS)
+def test_poiseuille_pipe_coefficients(grid):
+    # Constant density: momentum coefficient 4/3, kinetic energy coefficient 2, peak velocity twice the bulk
+    profiles = radial_profiles(0.0, 5e-3, 10.0, 1.2, 1.8e-5, 300.0, ProfileParams('laminar', points=2001, grid=grid))
+    assert profiles.momentum_coefficient[0] == pytest.approx(4.0 / 3.0, rel=1e-5)
+    assert profiles.energy_coefficient[0] == pytest.approx(2.0, rel=1e-5)
+    assert profiles.max_velocity[0] == pytest.approx(2.0 * profiles.bulk_velocity[0], rel=1e-5)
+
+
+def test_plug_coflow_matches_coflow():
+    geometry, operating = GeometryParams(), OperatingParams()
+    profiles = coflow_profiles(geometry.coflow_ID, geometry.coflow_OD, operating.coflow_pressure,
+                               operating.coflow_temperature, operating.coflow_velocity, ProfileParams('plug'))
+    coflow = CoFlow(geometry, operating).calculate_flows()
+    assert profiles.mass_flow[0] == pytest.approx(coflow.mass_flow, rel=1e-10)
+    assert profiles.reynolds_number[0] == pytest.approx(coflow.Re, rel=1e-10)
+    assert profiles.momentum_coefficient[0] == pytest.approx(1.0)
+    assert profiles.energy_coefficient[0] == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize('shape', ['laminar', 'turbulent'])
+def test_wall_temperature_keeps_coflow_mass_flow(shape):
+    geometry, operating = GeometryParams(), OperatingParams()
+    coflow = CoFlow(geometry, operating)
+    profiles = coflow.radial_profile(ProfileParams(shape, wall_temperature=600.0))
+    assert profiles.mass_flow[0] == pytest.approx(coflow.calculate_flows().mass_flow, rel=1e-10)
+    assert profiles.temperature[0, -1] == pytest.approx(600.0)
+
+
+@pytest.mark.parametrize('owner, function', [('jet_burner', 'jet_profiles'), ('n2_co_flow', 'coflow_profiles')])
+def test_radial_profile_passes_mechanism(monkeypatch, owner, function):
+    from calculations import radial_profiles as module
+    from calculations.jet_burner import JetBurner
+
+    seen = {}
+    monkeypatch.setattr(module, function, lambda *args, **kwargs: seen.update(kwargs))
+    calculator = JetBurner if owner == 'jet_burner' else CoFlow
+    calculator(GeometryParams(), OperatingParams(), mechanism='h2o2').radial_profile()
+    assert seen['mechanism'] == 'h2o2'
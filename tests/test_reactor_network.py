@@ -0,0 +1,56 @@
+"""Mixing zone reactor network: instant mixing limit, warm starts and the sweep driver."""
+import dataclasses
+
+import numpy as np
+import pytest
+
+from calculations.burner_array import array_parameters
+from calculations.reactor_network import (MixingZone, MixingZoneParams, batch_inlet_streams, inlet_streams,
+                                          mixing_zone_sweep)
+from sweep.runner import Case, evaluate_case
+
+PRESSURE = 1e5
+AREA = 1e-2
+
+
+def _streams(case):
+    results = evaluate_case(case)
+    return inlet_streams(results['jet'], results['pilot'], results['coflow'], case.operating), results
+
+
+def _leaner_case():
+    operating = Case().operating
+    return Case(operating=dataclasses.replace(operating, jet_equivalence_ratio=0.8 * operating.jet_equivalence_ratio))
+
+
+def test_vanishing_residence_time_gives_mixed_temperature():
+    streams, results = _streams(Case())
+    params = MixingZoneParams(psr_residence_time=1e-8, pfr_residence_time=1e-8, pfr_points=2)
+    result = MixingZone(params=params).solve(streams, PRESSURE, AREA)
+    assert result.mixed_temperature == pytest.approx(results['mixing'].mixed_temp, rel=1e-9)
+    assert result.psr_temperature == pytest.approx(result.mixed_temperature, rel=1e-6)
+    assert result.temperature[-1] == pytest.approx(result.mixed_temperature, rel=1e-6)
+
+
+def test_warm_start_matches_cold_solve():
+    streams, _ = _streams(Case())
+    leaner, _ = _streams(_leaner_case())
+    zone = MixingZone()
+    zone.solve(streams, PRESSURE, AREA)
+    warm = zone.solve(leaner, PRESSURE, AREA)
+    cold = MixingZone().solve(leaner, PRESSURE, AREA)
+    assert warm.psr_temperature == pytest.approx(cold.psr_temperature, rel=1e-6)
+    np.testing.assert_allclose(warm.temperature, cold.temperature, rtol=1e-6)
+    np.testing.assert_allclose(warm.species('NO'), cold.species('NO'), rtol=1e-4)
+
+
+def test_sweep_matches_solve_per_case():
+    cases = [Case(), _leaner_case()]
+    results = mixing_zone_sweep(cases, workers=0)
+    parameters = array_parameters(cases)
+    areas = np.pi / 4 * parameters['coflow_OD'] ** 2
+    for result, streams, pressure, area in zip(results, batch_inlet_streams(parameters), parameters['jet_pressure'],
+                                               areas):
+        expected = MixingZone().solve(streams, pressure, area)
+        assert result.psr_temperature == pytest.approx(expected.psr_temperature, rel=1e-6)
+        np.testing.assert_allclose(result.distance, expected.distance, rtol=1e-6)
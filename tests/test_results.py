@@ -0,0 +1,33 @@
+"""Rows of a ResultTable come back with the types of their dataclass fields."""
+import dataclasses
+
+import numpy as np
+
+from calculations.results import JetBurnerTable, ResultTable
+from sweep.runner import Case, evaluate_case
+
+
+@dataclasses.dataclass
+class _Row:
+    value: float
+    count: int
+    flag: bool
+
+
+class _Table(ResultTable):
+    row_class = _Row
+
+
+def test_row_field_types():
+    table = _Table.from_columns(value=[1.5, 2.0], count=[3, np.nan], flag=[1.0, 0.0])
+    row = table[0]
+    assert type(row.value) is float and type(row.count) is int and type(row.flag) is bool
+    assert (row.count, row.flag) == (3, True)
+    assert np.isnan(table[1].count) and table[1].flag is False
+
+
+def test_jet_row_round_trip():
+    jet = evaluate_case(Case())['jet']
+    row = JetBurnerTable.from_rows([jet])[0]
+    assert row.choked is jet.choked
+    assert row.mass_flow_total == jet.mass_flow_total
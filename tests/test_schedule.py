@@ -0,0 +1,43 @@
+"""Every step of an operating schedule reproduces the scalar calculators at its setpoints."""
+import dataclasses
+
+import numpy as np
+import pytest
+
+from sweep.runner import Case, evaluate_case
+from sweep.schedule import Profile, run_schedule
+
+# Batched results come from interpolated property tables
+TOLERANCE = 1e-4
+
+
+def _assert_matches(results, expected):
+    for stream, reference in expected.items():
+        for field in dataclasses.fields(reference):
+            value, target = getattr(results[stream], field.name), getattr(reference, field.name)
+            if isinstance(target, bool):
+                assert value == target, f'{stream}.{field.name}'
+            elif isinstance(target, float):
+                assert value == pytest.approx(target, rel=TOLERANCE, nan_ok=True), f'{stream}.{field.name}'
+
+
+def test_steps_match_scalar_calculators():
+    case = Case()
+    op = case.operating
+    profiles = {
+        'jet_velocity': Profile([0.0, 1.0], [op.jet_velocity, 2.0 * op.jet_velocity]),
+        'pilot_air_velocity': Profile([0.0, 1.0], [op.pilot_air_velocity, 1.5 * op.pilot_air_velocity],
+                                      kind='step'),
+        'coflow_velocity': Profile([0.0, 1.0], [op.coflow_velocity, 0.5 * op.coflow_velocity]),
+    }
+    steps = list(run_schedule(case, profiles, np.linspace(0.0, 1.5, 4), chunk_size=3))
+    assert [step.index for step in steps] == [0, 1, 2, 3]
+    for step in steps:
+        expected = evaluate_case(dataclasses.replace(case, operating=dataclasses.replace(op, **step.setpoints)))
+        _assert_matches(step.results, expected)
+
+
+def test_pilot_equivalence_ratio_setpoint():
+    profiles = {'pilot_equivalence_ratio': Profile([0.0, 1.0], [0.8, 0.4])}
+    for step in run_schedule(Case(), profiles, np.linspace(0.0, 1.0, 5), streams=('pilot',)):
+        assert step.results['pilot'].equivalence_ratio == pytest.approx(step.setpoints['pilot_equivalence_ratio'])
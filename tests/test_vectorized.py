@@ -0,0 +1,31 @@
+"""Batch evaluation on the property tables against the scalar calculators."""
+import dataclasses
+
+import numpy as np
+import pytest
+
+from calculations.vectorized import evaluate_batch, nominal_parameters
+from input_parameters.parameters import GeometryParams, OperatingParams
+from sweep.runner import Case, evaluate_case
+
+# (jet equivalence ratio, stream temperatures [K]); the first and last are table nodes, the middle one is between
+POINTS = [(0.3, 280.0), (0.52, 347.0), (0.7, 420.0)]
+
+
+def test_batch_matches_scalar_calculators():
+    geometry, operating = GeometryParams(), OperatingParams()
+    cases = [dataclasses.replace(operating, jet_equivalence_ratio=phi, jet_temperature=T, pilot_temperature=T,
+                                 coflow_temperature=T) for phi, T in POINTS]
+    nominal = nominal_parameters(geometry, operating)
+    parameters = {name: np.array([dataclasses.asdict(case).get(name, nominal[name]) for case in cases])
+                  for name in nominal}
+    batch = evaluate_batch(parameters, streams=('jet', 'coflow'))
+    for i, case in enumerate(cases):
+        scalar = evaluate_case(Case(geometry, case))
+        # Exact at the nodes, within the accuracy stated in calculations.property_tables in between
+        on_node = i != 1
+        jet, coflow = batch['jet'][i], batch['coflow'][i]
+        assert jet.lewis_number == pytest.approx(scalar['jet'].lewis_number, rel=1e-12 if on_node else 2e-4)
+        assert jet.flame_temperature == pytest.approx(scalar['jet'].flame_temperature, rel=1e-12 if on_node else 5e-5)
+        assert coflow.dynamic_viscosity == pytest.approx(scalar['coflow'].dynamic_viscosity,
+                                                         rel=1e-12 if on_node else 5e-5)
@@ -0,0 +1,27 @@
+"""Error distributions around nominal values, shared by the uncertainty and tolerance analyses.
+
+`sample(nominal, rng, size)` draws `size` (an int or a shape) values of nominal + error from a NumPy Generator.
+"""
+import dataclasses
+
+
+@dataclasses.dataclass(frozen=True)
+class Normal:
+    """Normally distributed error with standard deviation `std`, absolute or relative to the nominal value"""
+    std: float
+    relative: bool = False
+
+    def sample(self, nominal, rng, size):
+        scale = self.std * abs(nominal) if self.relative else self.std
+        return nominal + scale * rng.standard_normal(size)
+
+
+@dataclasses.dataclass(frozen=True)
+class Uniform:
+    """Uniformly distributed error within +-`half_width`, absolute or relative to the nominal value"""
+    half_width: float
+    relative: bool = False
+
+    def sample(self, nominal, rng, size):
+        scale = self.half_width * abs(nominal) if self.relative else self.half_width
+        return nominal + scale * rng.uniform(-1.0, 1.0, size)
@@ -0,0 +1,188 @@
+"""Per-stage timing and counters for the burner toolchain.
+
+Stages (grid generation, hole placement, statistics, the calculators, mixing and DXF export) record wall time and
+call counts; events inside a stage (Cantera Solution constructions, equilibrium calls, Shapely predicates, overlays,
+buffers and distances) are attributed to the innermost active stage. Stages nest, so wall times are inclusive.
+
+Instrumentation is disabled by default and every hook returns immediately in that case. Enable it with `enable()` or
+by setting the environment variable BURNER_INSTRUMENTATION=1 before import.
+
+Example:
+    from utils import instrumentation
+    instrumentation.enable()
+    ...run calculations...
+    print(instrumentation.to_json())
+"""
+import json
+import os
+import threading
+import time
+from functools import wraps
+
+_enabled = os.environ.get('BURNER_INSTRUMENTATION', '') not in ('', '0')
+_lock = threading.Lock()
+_local = threading.local()
+_stats = {}
+
+# Counters recorded outside any stage are attributed to this pseudo stage
+GLOBAL_STAGE = '<global>'
+
+
+class StageStats:
+    """Accumulated wall time, call count and event counters of one stage"""
+
+    __slots__ = ('wall_time', 'calls', 'counters')
+
+    def __init__(self):
+        self.wall_time = 0.0
+        self.calls = 0
+        self.counters = {}
+
+    def as_dict(self):
+        return {'wall_time': self.wall_time, 'calls': self.calls, 'counters': dict(self.counters)}
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Drop all recorded statistics"""
+    with _lock:
+        _stats.clear()
+
+
+def _stage_stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _get_stats(name):
+    stats = _stats.get(name)
+    if stats is None:
+        stats = _stats[name] = StageStats()
+    return stats
+
+
+class _Stage:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        _stage_stack().append(self.name)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        elapsed = time.perf_counter() - self.start
+        _stage_stack().pop()
+        with _lock:
+            stats = _get_stats(self.name)
+            stats.wall_time += elapsed
+            stats.calls += 1
+        return False
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+def stage(name):
+    """Context manager timing the enclosed block as one call of stage `name`"""
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name)
+
+
+def instrumented(name):
+    """Decorator timing every call of the wrapped function as stage `name`"""
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def count(counter, n=1):
+    """Add `n` events of type `counter` to the innermost active stage"""
+    if not _enabled:
+        return
+    stack = _stage_stack()
+    name = stack[-1] if stack else GLOBAL_STAGE
+    with _lock:
+        counters = _get_stats(name).counters
+        counters[counter] = counters.get(counter, 0) + n
+
+
+def snapshot():
+    """Return the recorded statistics as {stage: {'wall_time', 'calls', 'counters'}}"""
+    with _lock:
+        return {name: stats.as_dict() for name, stats in _stats.items()}
+
+
+def to_json(indent=2):
+    return json.dumps(snapshot(), indent=indent, sort_keys=True)
+
+
+def _escape_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def to_prometheus(prefix='burner'):
+    """Render the recorded statistics in the Prometheus text exposition format"""
+    data = snapshot()
+    lines = [
+        f'# HELP {prefix}_stage_wall_seconds_total Wall time spent in a stage, including nested stages.',
+        f'# TYPE {prefix}_stage_wall_seconds_total counter',
+    ]
+    for name in sorted(data):
+        lines.append(f'{prefix}_stage_wall_seconds_total{{stage="{_escape_label(name)}"}} {data[name]["wall_time"]:.9g}')
+
+    lines += [
+        f'# HELP {prefix}_stage_calls_total Number of times a stage was entered.',
+        f'# TYPE {prefix}_stage_calls_total counter',
+    ]
+    for name in sorted(data):
+        lines.append(f'{prefix}_stage_calls_total{{stage="{_escape_label(name)}"}} {data[name]["calls"]}')
+
+    lines += [
+        f'# HELP {prefix}_stage_events_total Events (Cantera objects, equilibrium calls, Shapely operations) per stage.',
+        f'# TYPE {prefix}_stage_events_total counter',
+    ]
+    for name in sorted(data):
+        for counter, value in sorted(data[name]['counters'].items()):
+            lines.append(f'{prefix}_stage_events_total{{stage="{_escape_label(name)}",'
+                         f'counter="{_escape_label(counter)}"}} {value}')
+
+    return '\n'.join(lines) + '\n'
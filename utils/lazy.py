@@ -0,0 +1,47 @@
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Module placeholder that imports the real module on first attribute access.
+
+    After loading, the real module's namespace is copied into the placeholder so later lookups are plain attribute
+    reads; names added to the real module afterwards (e.g. submodules imported later) are still resolved through it.
+    """
+
+    def __init__(self, name):
+        super().__init__(name)
+        self.__dict__['_lazy_loaded'] = False
+
+    def _load(self):
+        module = importlib.import_module(self.__name__)
+        self.__dict__.update(module.__dict__)
+        self.__dict__['_lazy_loaded'] = True
+        return module
+
+    def __getattr__(self, attr):
+        if self.__dict__['_lazy_loaded']:
+            return getattr(sys.modules[self.__name__], attr)
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        if not self.__dict__['_lazy_loaded']:
+            self._load()
+        return list(self.__dict__)
+
+
+def lazy_import(name):
+    """Return `name` as a module that is imported on first use.
+
+    If the module has already been imported, the real module is returned directly.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+def is_loaded(name):
+    """True if module `name` has actually been imported in this process"""
+    return name in sys.modules
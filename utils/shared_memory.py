@@ -0,0 +1,167 @@
+"""Shared memory transport for NumPy arrays and result tables.
+
+A producer allocates (or copies) arrays into `multiprocessing.shared_memory` blocks and hands out small picklable
+descriptors; consumers attach to the block by name and get NumPy views on it without copying. Several arrays can be
+packed into one block (`SharedArrays`), and result tables from `calculations.results` can be shared as a whole.
+
+Lifetime: exactly one process owns a block and must `unlink()` it when every consumer is done; everybody else only
+`close()`s their mapping. Ownership can be handed over with the descriptor (a worker allocates, the parent attaches
+with `owner=True`). Producers and consumers are expected to belong to one process tree (e.g. a pool and its parent)
+sharing a single resource tracker; call `start_resource_tracker()` before creating a pool whose workers allocate
+blocks. A mapping cannot be closed while views on it are still referenced.
+"""
+import dataclasses
+import importlib
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+# Offsets of packed arrays are aligned to cache lines
+_ALIGNMENT = 64
+
+
+def start_resource_tracker():
+    """Start the resource tracker in this process so that worker processes created afterwards share it.
+
+    Otherwise a worker allocating a block starts its own tracker, which reports the block as leaked (and tries to
+    remove it again) when the worker exits, even if the parent has taken ownership and unlinked it.
+    """
+    resource_tracker.ensure_running()
+
+
+def _open_block(name=None, size=0):
+    return shared_memory.SharedMemory(name=name, create=name is None, size=size)
+
+
+@dataclasses.dataclass(frozen=True)
+class ArrayDescriptor:
+    """Location and layout of one array inside a shared memory block"""
+    dtype: object
+    shape: tuple
+    offset: int = 0
+
+
+@dataclasses.dataclass(frozen=True)
+class SharedArraysDescriptor:
+    """Picklable handle to a block holding one or more named arrays"""
+    block_name: str
+    arrays: dict
+
+
+class SharedArrays:
+    """Named NumPy arrays living in one shared memory block"""
+
+    def __init__(self, block, descriptor, owner):
+        self.block = block
+        self.descriptor = descriptor
+        self.owner = owner
+        self.arrays = {
+            name: np.ndarray(spec.shape, dtype=np.dtype(spec.dtype), buffer=block.buf, offset=spec.offset)
+            for name, spec in descriptor.arrays.items()
+        }
+
+    @classmethod
+    def allocate(cls, layout):
+        """Create a block for arrays given as {name: (shape, dtype)}; the caller owns the block"""
+        specs = {}
+        offset = 0
+        for name, (shape, dtype) in layout.items():
+            dtype = np.dtype(dtype)
+            shape = tuple(int(n) for n in shape) if np.iterable(shape) else (int(shape),)
+            specs[name] = ArrayDescriptor(dtype=dtype.descr if dtype.names else dtype.str, shape=shape, offset=offset)
+            nbytes = int(np.prod(shape, dtype=np.int64)) * dtype.itemsize
+            offset += -(-nbytes // _ALIGNMENT) * _ALIGNMENT
+        block = _open_block(size=max(offset, 1))
+        return cls(block, SharedArraysDescriptor(block.name, specs), owner=True)
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Copy `arrays` ({name: ndarray}) into a new block; the caller owns the block"""
+        arrays = {name: np.ascontiguousarray(array) for name, array in arrays.items()}
+        shared = cls.allocate({name: (array.shape, array.dtype) for name, array in arrays.items()})
+        for name, array in arrays.items():
+            shared.arrays[name][...] = array
+        return shared
+
+    @classmethod
+    def attach(cls, descriptor, owner=False):
+        """Map an existing block without copying; `owner=True` takes over responsibility for unlinking it"""
+        return cls(_open_block(descriptor.block_name), descriptor, owner=owner)
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+    def __contains__(self, name):
+        return name in self.arrays
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        if self.owner:
+            self.unlink()
+        return False
+
+    def close(self):
+        """Release this process' mapping; views on the arrays must not be used afterwards"""
+        self.arrays = {}
+        self.block.close()
+
+    def unlink(self):
+        """Free the block; only the owner should call this"""
+        self.block.unlink()
+
+
+@dataclasses.dataclass(frozen=True)
+class SharedTableDescriptor:
+    """Picklable handle to a result table in shared memory"""
+    table_class: str
+    arrays: SharedArraysDescriptor
+
+
+def _table_class(path):
+    module, _, name = path.rpartition('.')
+    return getattr(importlib.import_module(module), name)
+
+
+class SharedTable:
+    """A `calculations.results.ResultTable` whose buffer lives in shared memory"""
+
+    def __init__(self, shared, table_class):
+        self.shared = shared
+        self.table = table_class(shared['data'])
+        self.descriptor = SharedTableDescriptor(f'{table_class.__module__}.{table_class.__qualname__}',
+                                                shared.descriptor)
+
+    @classmethod
+    def allocate(cls, table_class, n):
+        """Shared table of `n` cases filled with NaN; the caller owns the block"""
+        shared = SharedArrays.allocate({'data': ((n,), table_class.dtype())})
+        for name in table_class.fields():
+            shared['data'][name] = np.nan
+        return cls(shared, table_class)
+
+    @classmethod
+    def from_table(cls, table):
+        return cls(SharedArrays.from_arrays({'data': table.data}), type(table))
+
+    @classmethod
+    def attach(cls, descriptor, owner=False):
+        return cls(SharedArrays.attach(descriptor.arrays, owner), _table_class(descriptor.table_class))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        if self.shared.owner:
+            self.unlink()
+        return False
+
+    def close(self):
+        self.table = None
+        self.shared.close()
+
+    def unlink(self):
+        self.shared.unlink()